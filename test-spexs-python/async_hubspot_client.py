@@ -0,0 +1,206 @@
+"""
+asyncio counterpart of HubSpotClient for extraction-heavy workloads.
+
+Talks to the CRM v3 REST endpoints directly over one pooled httpx.AsyncClient,
+so pages of several object types, batch creates and batch archives can be in
+flight at the same time, at most `max_concurrency` of them. Every request is
+admitted by the process-wide request scheduler, so it shares the burst, search
+and daily limits (and the 429/5xx retries) of the threads using HubSpotClient,
+and goes through the active cassette, if any. `base_url`, or HUBSPOT_BASE_URL,
+can point it at a local fake HubSpot server.
+"""
+import asyncio
+import json
+import logging
+import time
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+from cassettes import get_cassette
+from config import config
+from hubspot_schema import BATCH_SIZE, OBJECT_PROPERTIES, ROW_REJECTION_STATUSES, Page, to_record
+from request_scheduler import get_scheduler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.hubapi.com"
+
+
+class HubSpotHTTPError(Exception):
+    """A HubSpot error response; `status` and `headers` drive the scheduler's retries like an SDK ApiException"""
+
+    def __init__(self, response):
+        super().__init__(f"HubSpot returned {response.status_code} for {response.request.method} "
+                         f"{response.request.url.path}: {response.text[:200]}")
+        self.status = response.status_code
+        self.headers = response.headers
+
+
+class AsyncHubSpotClient:
+
+    def __init__(self, access_token=None, base_url=None, max_concurrency=None, timeout=30.0):
+        if not HTTPX_AVAILABLE:
+            raise ImportError("httpx not available")
+
+        self.scheduler = get_scheduler()
+        self.cassette = get_cassette()
+        if self.cassette is not None and self.cassette.mode == 'replay':
+            # Replays never reach HubSpot, so they run without a key
+            access_token = access_token or config.hubspot_key or 'cassette-replay'
+        self.max_concurrency = max_concurrency or config.hubspot_max_workers
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.http = httpx.AsyncClient(
+            base_url=base_url or config.hubspot_base_url or DEFAULT_BASE_URL,
+            headers={"Authorization": f"Bearer {access_token or config.hubspot_api_key}"},
+            limits=httpx.Limits(max_connections=self.max_concurrency,
+                                max_keepalive_connections=self.max_concurrency),
+            timeout=timeout
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        await self.http.aclose()
+
+    async def _request(self, operation, method, path, params=None, payload=None, search=False):
+        """Decoded JSON body of one call, admitted and retried by the request scheduler"""
+
+        async def send():
+            request = self.http.build_request(method, path, params=params, json=payload)
+            async with self.semaphore:
+                if self.cassette is None:
+                    response = await self.http.send(request)
+                else:
+                    async def live(conditions):
+                        request.headers.update(conditions)
+                        return await self.http.send(request)
+
+                    response = await self.cassette.respond_async(request, live)
+            if response.status_code >= 400:
+                raise HubSpotHTTPError(response)
+            return response.content
+
+        body = await self.scheduler.call_async(send, operation=operation, search=search)
+        return json.loads(body) if body else None
+
+    async def iter_pages(self, object_type, properties=None, page_size=100, after=None):
+        """Async generator yielding one Page of flattened records per page of `object_type`.
+
+        Each page's resume position is {'after': <cursor of the next page>}, as in HubSpotClient.
+        """
+        properties = OBJECT_PROPERTIES.get(object_type, []) if properties is None else properties
+        params = {"limit": page_size}
+        if properties:
+            params["properties"] = ",".join(properties)
+
+        fetched = 0
+        while True:
+            if after:
+                params["after"] = after
+            body = await self._request("get_page", "GET", f"/crm/v3/objects/{object_type}", params=params)
+            records = [to_record(obj["id"], obj.get("properties") or {}, properties)
+                       for obj in body.get("results", [])]
+            fetched += len(records)
+            after = ((body.get("paging") or {}).get("next") or {}).get("after")
+            if records:
+                yield Page(records, {'after': after})
+            if not after:
+                break
+
+        logger.info(f"Retrieved {fetched} existing {object_type}")
+
+    async def get_all(self, object_type, properties=None, page_size=100):
+        records = []
+        async for page in self.iter_pages(object_type, properties=properties, page_size=page_size):
+            records.extend(page)
+        return records
+
+    async def get_many(self, *object_types, page_size=100):
+        """Walk several object types concurrently; returns {object_type: records}"""
+        results = await asyncio.gather(
+            *(self.get_all(object_type, page_size=page_size) for object_type in object_types))
+        return dict(zip(object_types, results))
+
+    async def _create_chunk(self, object_type, start, chunk):
+        """Created id (or None) per row of `chunk`; a chunk rejected as a whole is retried in halves"""
+        end = start + len(chunk)
+        ids = [None] * len(chunk)
+        try:
+            body = await self._request("create", "POST", f"/crm/v3/objects/{object_type}/batch/create", payload={
+                "inputs": [
+                    {"properties": properties, "objectWriteTraceId": str(start + offset), "associations": []}
+                    for offset, properties in enumerate(chunk)
+                ]
+            }) or {}
+        except HubSpotHTTPError as e:
+            if e.status in ROW_REJECTION_STATUSES and len(chunk) > 1:
+                logger.warning(f"HubSpot rejected {object_type} {start + 1}-{end} ({e.status}), "
+                               f"retrying them in halves")
+                middle = len(chunk) // 2
+                halves = await asyncio.gather(self._create_chunk(object_type, start, chunk[:middle]),
+                                              self._create_chunk(object_type, start + middle, chunk[middle:]))
+                return halves[0] + halves[1]
+            logger.error(f"Error creating {object_type} {start + 1}-{end}: {e}")
+            return ids
+        except Exception as e:
+            logger.error(f"Error creating {object_type} {start + 1}-{end}: {e}")
+            return ids
+
+        for result in body.get("results", []):
+            trace_id = result.get("objectWriteTraceId")
+            if trace_id is not None and str(trace_id).isdigit() and start <= int(trace_id) < end:
+                ids[int(trace_id) - start] = result["id"]
+
+        for error in body.get("errors", []):
+            logger.warning(f"Error creating {object_type}: {error.get('message')}")
+        return ids
+
+    async def batch_create(self, object_type, rows, batch_size=BATCH_SIZE):
+        """Create one object per property dict; returns ids aligned with `rows` (None on failure)"""
+        starts = range(0, len(rows), batch_size)
+        chunks = await asyncio.gather(
+            *(self._create_chunk(object_type, start, rows[start:start + batch_size]) for start in starts))
+        created_ids = [object_id for chunk in chunks for object_id in chunk]
+
+        created = sum(1 for object_id in created_ids if object_id)
+        logger.info(f"Created {created}/{len(rows)} {object_type}")
+        return created_ids
+
+    async def batch_archive(self, object_type, ids, batch_size=BATCH_SIZE):
+        """Archive the given ids in chunks of `batch_size`; returns how many were archived"""
+        chunks = [ids[start:start + batch_size] for start in range(0, len(ids), batch_size)]
+        responses = await asyncio.gather(
+            *(self._request("archive", "POST", f"/crm/v3/objects/{object_type}/batch/archive",
+                            payload={"inputs": [{"id": object_id} for object_id in chunk]})
+              for chunk in chunks),
+            return_exceptions=True)
+
+        archived = 0
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, Exception):
+                logger.error(f"Error archiving {len(chunk)} {object_type}: {response}")
+            else:
+                archived += len(chunk)
+        return archived
+
+    async def archive_all(self, object_type, batch_size=BATCH_SIZE):
+        """Archive every object of `object_type`, archiving each page while the next one is fetched"""
+        started = time.monotonic()
+        tasks = []
+        async for page in self.iter_pages(object_type, properties=[], page_size=batch_size):
+            tasks.append(asyncio.create_task(
+                self.batch_archive(object_type, [record['id'] for record in page], batch_size)))
+
+        archived = sum(await asyncio.gather(*tasks))
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"Archived {archived} {object_type} in {elapsed:.1f}s ({archived / elapsed if elapsed else 0:.1f}/s)")
+        return archived
@@ -0,0 +1,276 @@
+"""
+End-to-end benchmark of the mainProcess stages against the fake HubSpot
+server and a local mongod.
+
+Stages: get_existing_* extraction (contacts also recorded to a cassette and
+replayed from it), the DataFrame transforms, upsert_*_to_mongo (first load
+and an unchanged re-run), the three summary aggregations and a full leads
+sync run sequentially and pipelined (main --pipeline), and a full refresh of
+leads and deals run one type after the other and with --type all.
+Each stage reports records/sec and p50/p99 latency per call (page, upsert
+batch or aggregation). Results are written as JSON, tagged with the current
+commit, and can be compared with a previous run:
+
+    uv run python -m benchmarks.bench_pipeline --contacts 20000 --deals 20000 --output bench.json
+    uv run python -m benchmarks.bench_pipeline --baseline bench.json
+
+The benchmark drops and recreates its own database (hubspot_benchmark by default).
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.fake_hubspot import FakeHubSpotServer, make_store
+
+PROTECTED_DATABASES = {'hubspot_data', 'admin', 'local', 'config'}
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of `values`"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def stage_result(records, seconds, latencies):
+    return {
+        'records': records,
+        'seconds': round(seconds, 4),
+        'records_per_sec': round(records / seconds, 1) if seconds else None,
+        'calls': len(latencies),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+    }
+
+
+def timed_calls(items, fn):
+    """Run fn(item) for every item; returns (results, total seconds, per-call latencies)"""
+    results, latencies = [], []
+    started = time.perf_counter()
+    for item in items:
+        call_started = time.perf_counter()
+        results.append(fn(item))
+        latencies.append(time.perf_counter() - call_started)
+    return results, time.perf_counter() - started, latencies
+
+
+def timed_pages(pages):
+    """Drain a page iterator, timing each page fetch"""
+    collected, latencies = [], []
+    started = last = time.perf_counter()
+    for page in pages:
+        now = time.perf_counter()
+        latencies.append(now - last)
+        collected.append(page)
+        last = time.perf_counter()
+    return collected, time.perf_counter() - started, latencies
+
+
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def check_mongo(uri):
+    from pymongo import MongoClient
+
+    client = MongoClient(uri, serverSelectionTimeoutMS=3000)
+    try:
+        client.admin.command('ping')
+    except Exception as e:
+        raise SystemExit(f"A local mongod is required at {uri}: {e}")
+    finally:
+        client.close()
+
+
+def sync_leads(mainProcess, queue_size):
+    """Extract, transform and load every lead the way main() does; returns (records, per-page load latencies)"""
+    chunks = mainProcess.iter_leads_dataframes(page_size=100, queue_size=queue_size)
+    if queue_size:
+        chunks = mainProcess.prefetch(chunks, queue_size)
+    records, latencies = 0, []
+    for frame in chunks:
+        started = time.perf_counter()
+        mainProcess.upsert_leads_to_mongo(frame)
+        latencies.append(time.perf_counter() - started)
+        records += len(frame)
+    return records, latencies
+
+
+def full_refresh(mainProcess, sync_type):
+    """Run main() for `sync_type` (leads, deals or all) with its summaries; returns the wall time"""
+    sys.argv = ['mainProcess.py', '--type', sync_type]
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        mainProcess.main()
+    return time.perf_counter() - started
+
+
+def run_stages(args, server):
+    # Project modules read their settings at import time, so configure them first
+    os.environ['HUBSPOT_BASE_URL'] = server.base_url
+    os.environ['MONGO_URI'] = args.mongo_uri
+    os.environ['MONGO_DB_NAME'] = args.database
+    os.environ['HUBSPOT_REQUESTS_PER_10S'] = str(args.requests_per_10s)
+    os.environ.setdefault('HUBSPOT_KEY', 'benchmark-token')
+    os.environ['CHECKPOINT_DIR'] = tempfile.mkdtemp(prefix='bench-checkpoints-')
+
+    import mainProcess
+    from benchmarks.datasets import LEAD_STATUS_MAPPING
+    from cassettes import configure_cassette
+    from hubspot_client import HubSpotClient
+    from mongo_connection import mongo_manager
+
+    stages = {}
+    quiet = contextlib.redirect_stdout(io.StringIO())
+
+    with mongo_manager:
+        mongo_manager.client.drop_database(args.database)
+        db = mongo_manager.database
+        mainProcess.mongo_schema.ensure_indexes(db)
+        db.lead_status.insert_many([{'lead_status': status, 'id': status_id}
+                                    for status, status_id in LEAD_STATUS_MAPPING.items()])
+
+        client = HubSpotClient()
+        contact_pages, seconds, latencies = timed_pages(client.iter_existing_contacts(page_size=args.page_size))
+        stages['get_existing_contacts'] = stage_result(sum(map(len, contact_pages)), seconds, latencies)
+        deal_pages, seconds, latencies = timed_pages(client.iter_existing_deals(page_size=args.page_size))
+        stages['get_existing_deals'] = stage_result(sum(map(len, deal_pages)), seconds, latencies)
+
+        cassette_path = os.path.join(tempfile.mkdtemp(prefix='bench-cassettes-'), 'benchmark.json.gz')
+        for mode in ('record', 'replay'):
+            configure_cassette(mode, path=cassette_path)
+            pages, seconds, latencies = timed_pages(HubSpotClient().iter_existing_contacts(page_size=args.page_size))
+            stages[f'get_existing_contacts.{mode}'] = stage_result(sum(map(len, pages)), seconds, latencies)
+        configure_cassette(None)
+
+        mapping = mainProcess.get_lead_status_mapping()
+        lead_frames, seconds, latencies = timed_calls(
+            contact_pages, lambda page: mainProcess.transform_leads_dataframe(mainProcess.pd.DataFrame(page), mapping))
+        stages['transform_leads'] = stage_result(sum(map(len, lead_frames)), seconds, latencies)
+        deal_frames, seconds, latencies = timed_calls(
+            deal_pages, lambda page: mainProcess.transform_deals_dataframe(mainProcess.pd.DataFrame(page)))
+        stages['transform_deals'] = stage_result(sum(map(len, deal_frames)), seconds, latencies)
+
+        for label in ('load', 'unchanged'):
+            with quiet:
+                _, seconds, latencies = timed_calls(lead_frames, mainProcess.upsert_leads_to_mongo)
+            stages[f'upsert_leads_to_mongo.{label}'] = stage_result(sum(map(len, lead_frames)), seconds, latencies)
+            with quiet:
+                _, seconds, latencies = timed_calls(deal_frames, mainProcess.upsert_deals_to_mongo)
+            stages[f'upsert_deals_to_mongo.{label}'] = stage_result(sum(map(len, deal_frames)), seconds, latencies)
+
+        summaries = {
+            'upsert_lead_status_summary': (mainProcess.upsert_lead_status_summary, db.leads),
+            'upsert_deals_summary': (mainProcess.upsert_deals_summary, db.deals),
+            'upsert_deals_close_summary': (mainProcess.upsert_deals_close_summary, db.deals),
+        }
+        for name, (summary, source) in summaries.items():
+            with quiet:
+                _, seconds, latencies = timed_calls(range(args.repeat), lambda _: summary())
+            stages[name] = stage_result(source.estimated_document_count() * args.repeat, seconds, latencies)
+
+        for label, queue_size in (('sequential', 0), ('pipelined', args.queue_size)):
+            db.leads.drop()
+            mainProcess.mongo_schema.ensure_indexes(db)
+            started = time.perf_counter()
+            with quiet:
+                records, latencies = sync_leads(mainProcess, queue_size)
+            stages[f'sync_leads.{label}'] = stage_result(records, time.perf_counter() - started, latencies)
+
+    # main() opens and closes the shared Mongo pool itself, so these come last
+    records = args.contacts + args.deals
+    separate = [full_refresh(mainProcess, sync_type) for sync_type in ('leads', 'deals')]
+    stages['full_refresh.sequential'] = stage_result(records, sum(separate), separate)
+    seconds = full_refresh(mainProcess, 'all')
+    stages['full_refresh.all'] = stage_result(records, seconds, [seconds])
+
+    return stages
+
+
+def print_report(stages, baseline=None):
+    header = f"{'stage':<34} {'records/s':>12} {'p50 ms':>10} {'p99 ms':>10}"
+    if baseline:
+        header += f" {'Δ records/s':>12} {'Δ p99':>9}"
+    print(header)
+    for name, result in stages.items():
+        line = (f"{name:<34} {result['records_per_sec'] or 0:>12,.0f} "
+                f"{result['p50_ms'] or 0:>10.2f} {result['p99_ms'] or 0:>10.2f}")
+        previous = (baseline or {}).get(name)
+        if previous:
+            def change(new, old):
+                return f"{(new - old) / old * 100:+.1f}%" if new and old else 'n/a'
+            line += (f" {change(result['records_per_sec'], previous.get('records_per_sec')):>12}"
+                     f" {change(result['p99_ms'], previous.get('p99_ms')):>9}")
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end pipeline benchmark')
+    parser.add_argument('--contacts', type=int, default=10000)
+    parser.add_argument('--deals', type=int, default=10000)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Latency added to every fake API call')
+    parser.add_argument('--max-page-size', type=int, default=100)
+    parser.add_argument('--rate-limit-every', type=int, default=0,
+                        help='Answer every Nth API call with 429 (0 disables)')
+    parser.add_argument('--requests-per-10s', type=int, default=100000,
+                        help='Client-side rate limit; high by default so the pipeline, not the limiter, is measured')
+    parser.add_argument('--queue-size', type=int, default=2, help='Pages buffered per stage in the pipelined sync')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs of each summary aggregation')
+    parser.add_argument('--mongo-uri', default=os.getenv('BENCH_MONGO_URI', 'mongodb://localhost:27017/'))
+    parser.add_argument('--database', default='hubspot_benchmark')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', help='JSON results of a previous run to compare against')
+    args = parser.parse_args()
+
+    if args.database in PROTECTED_DATABASES:
+        raise SystemExit(f"Refusing to drop '{args.database}'; pick a dedicated benchmark database")
+    check_mongo(args.mongo_uri)
+
+    server = FakeHubSpotServer(make_store(args.contacts, args.deals, args.seed), latency_ms=args.latency_ms,
+                               max_page_size=args.max_page_size, rate_limit_every=args.rate_limit_every)
+    with server:
+        stages = run_stages(args, server)
+
+    results = {
+        'commit': current_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'parameters': {name: value for name, value in vars(args).items()
+                       if name not in ('output', 'baseline', 'mongo_uri')},
+        'api_requests': server.requests,
+        'api_rate_limited': server.rate_limited,
+        'stages': stages,
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file).get('stages')
+    print_report(stages, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Startup budget for the CLI entry points.
+
+Runs each command in a fresh interpreter `--runs` times and compares the
+median wall time, minus that of a bare interpreter, with `--budget-ms`.
+It also checks that importing mainProcess and main, or running either with
+--help, loads none of the heavy libraries (dotenv included: the
+configuration is only read once the arguments are parsed), which are only
+imported once a command actually needs them.
+Exits with an error when a command is over budget or a heavy import is back,
+so it can gate changes that would slow down short-lived cron invocations:
+
+    uv run python -m benchmarks.bench_startup --budget-ms 150
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDS = {
+    'python -c pass': ['-c', 'pass'],
+    'mainProcess.py --help': ['mainProcess.py', '--help'],
+    'main.py --help': ['main.py', '--help'],
+    'import mainProcess': ['-c', 'import mainProcess'],
+    'mainProcess.py --type bogus': ['mainProcess.py', '--type', 'bogus'],
+}
+BASELINE = 'python -c pass'
+
+HEAVY_MODULES = ('pandas', 'numpy', 'polars', 'pyarrow', 'pymongo', 'bson', 'hubspot', 'dotenv')
+
+
+def time_command(arguments, runs):
+    """Wall time of each of `runs` fresh-interpreter runs of `arguments`"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *arguments], cwd=PROJECT_DIR, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=False)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def heavy_imports(modules=('mainProcess', 'main')):
+    """Heavy modules loaded by importing `modules` in a fresh interpreter"""
+    script = (f"import json, sys\n"
+              f"import {', '.join(modules)}\n"
+              f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))")
+    result = subprocess.run([sys.executable, '-c', script], cwd=PROJECT_DIR, capture_output=True,
+                            text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def cli_imports(script, *arguments):
+    """Heavy modules loaded by running `script` with `arguments` in a fresh interpreter"""
+    code = (f"import json, runpy, sys\n"
+            f"sys.argv = {[script, *arguments]!r}\n"
+            f"try:\n"
+            f"    runpy.run_path({script!r}, run_name='__main__')\n"
+            f"except SystemExit:\n"
+            f"    pass\n"
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))")
+    result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_DIR, capture_output=True,
+                            text=True, check=True)
+    # The last line follows the usage text
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the startup time of the CLI entry points')
+    parser.add_argument('--runs', type=int, default=7, help='Runs per command; the median is compared')
+    parser.add_argument('--budget-ms', type=float, default=150.0,
+                        help='Allowed median startup time on top of a bare interpreter')
+    args = parser.parse_args()
+
+    medians = {name: statistics.median(time_command(arguments, args.runs)) for name, arguments in COMMANDS.items()}
+    baseline = medians[BASELINE]
+
+    failures = []
+    print(f"{'command':<30} {'median ms':>10} {'overhead ms':>12}")
+    for name, median in medians.items():
+        overhead = median - baseline
+        over = name != BASELINE and overhead * 1000 > args.budget_ms
+        print(f"{name:<30} {median * 1000:>10.1f} {overhead * 1000:>12.1f}{'  OVER BUDGET' if over else ''}")
+        if over:
+            failures.append(f"{name} takes {overhead * 1000:.0f} ms over a bare interpreter "
+                            f"(budget {args.budget_ms:.0f} ms)")
+
+    loaded = heavy_imports()
+    if loaded:
+        failures.append(f"importing mainProcess/main loads {', '.join(loaded)}")
+    else:
+        print("\nImporting mainProcess and main loads no heavy libraries")
+    for script in ('mainProcess.py', 'main.py'):
+        loaded = cli_imports(script, '--help')
+        if loaded:
+            failures.append(f"{script} --help loads {', '.join(loaded)}")
+        else:
+            print(f"{script} --help loads no heavy libraries")
+
+    if failures:
+        raise SystemExit("Startup budget exceeded:\n  - " + "\n  - ".join(failures))
+    print(f"All entry points start within {args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
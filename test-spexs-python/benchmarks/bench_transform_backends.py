@@ -0,0 +1,85 @@
+"""
+Rows/sec of the lead and deal transforms, pandas vs the polars lazy backend.
+
+Both paths start from raw HubSpot-shaped records and end with the
+Mongo-ready dicts handed to bulk_upsert_records. The transform (frame in,
+frame out) and the conversion to records are timed separately, since
+building Python dicts dominates both backends. The outputs are then checked
+for parity (same records and content hashes); tests/test_transform_backends.py
+checks the same on small edge-case pages. No MongoDB is needed.
+
+    uv run python -m benchmarks.bench_transform_backends --rows 1000000
+"""
+import argparse
+import time
+
+import pandas as pd
+
+import polars_transforms
+from benchmarks.datasets import LEAD_STATUS_MAPPING, make_contacts, make_deals
+from mainProcess import (content_hash, dataframe_to_records,
+                         transform_deals_dataframe, transform_leads_dataframe)
+
+
+def pandas_leads(rows):
+    return transform_leads_dataframe(pd.DataFrame(rows), LEAD_STATUS_MAPPING), dataframe_to_records
+
+
+def polars_leads(rows):
+    return polars_transforms.leads_frame(rows, LEAD_STATUS_MAPPING), polars_transforms.frame_to_records
+
+
+def pandas_deals(rows):
+    return (transform_deals_dataframe(pd.DataFrame(rows)),
+            lambda df: dataframe_to_records(df, numeric_columns=['amount']))
+
+
+def polars_deals(rows):
+    return polars_transforms.deals_frame(rows), polars_transforms.frame_to_records
+
+
+def check_parity(name, expected, actual):
+    if len(expected) != len(actual):
+        raise SystemExit(f"{name}: pandas produced {len(expected)} records, polars {len(actual)}")
+    for index, (left, right) in enumerate(zip(expected, actual)):
+        if left != right or content_hash(left) != content_hash(right):
+            raise SystemExit(f"{name}: record {index} differs\n  pandas: {left}\n  polars: {right}")
+    print(f"  parity       ok ({len(expected):,} records)")
+
+
+def measure(label, fn, rows):
+    started = time.perf_counter()
+    frame, to_records = fn(rows)
+    transformed = time.perf_counter()
+    records = to_records(frame)
+    finished = time.perf_counter()
+
+    rate = len(rows) / (finished - started)
+    print(f"  {label:<12} transform {transformed - started:6.2f}s  records {finished - transformed:6.2f}s  "
+          f"{rate:12,.0f} rows/sec")
+    return rate, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the pandas and polars transform backends')
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    if not polars_transforms.POLARS_AVAILABLE:
+        raise SystemExit("polars is not installed")
+
+    datasets = {
+        'leads': (make_contacts(args.rows), pandas_leads, polars_leads),
+        'deals': (make_deals(args.rows), pandas_deals, polars_deals),
+    }
+
+    for name, (rows, pandas_fn, polars_fn) in datasets.items():
+        print(f"{name} ({len(rows):,} rows):")
+        before, expected = measure("pandas", pandas_fn, rows)
+        after, actual = measure("polars", polars_fn, rows)
+        print(f"  speedup      {after / before:8.1f}x")
+        check_parity(name, expected, actual)
+
+
+if __name__ == "__main__":
+    main()
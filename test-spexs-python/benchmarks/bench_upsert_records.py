@@ -0,0 +1,70 @@
+"""
+Rows/sec of the DataFrame -> UpdateOne conversion used by the upsert functions.
+
+Compares the previous iterrows() implementation with the vectorized
+dataframe_to_records/bulk operation path. No MongoDB is needed.
+
+    uv run python -m benchmarks.bench_upsert_records --rows 200000
+"""
+import argparse
+import time
+
+import pandas as pd
+from pymongo.operations import UpdateOne
+
+from benchmarks.datasets import LEAD_STATUS_MAPPING, make_contacts, make_deals
+from mainProcess import (UPSERT_CHUNK_SIZE, dataframe_to_records,
+                         transform_deals_dataframe, transform_leads_dataframe)
+
+
+def legacy_operations(df, numeric_amount):
+    operations = []
+    for _, row in df.iterrows():
+        data = row.to_dict()
+        data = {k: (None if pd.isna(v) else v) for k, v in data.items()}
+        if numeric_amount and 'amount' in data and data['amount'] is not None:
+            try:
+                data['amount'] = float(data['amount'])
+            except (ValueError, TypeError):
+                data['amount'] = None
+        operations.append(UpdateOne({"id": data["id"]}, {"$set": data}, upsert=True))
+    return operations
+
+
+def vectorized_operations(df, numeric_amount):
+    records = dataframe_to_records(df, numeric_columns=['amount'] if numeric_amount else ())
+    chunks = []
+    for start in range(0, len(records), UPSERT_CHUNK_SIZE):
+        chunks.append([UpdateOne({"id": record["id"]}, {"$set": record}, upsert=True)
+                       for record in records[start:start + UPSERT_CHUNK_SIZE]])
+    return chunks
+
+
+def measure(label, fn, df, numeric_amount):
+    started = time.perf_counter()
+    fn(df, numeric_amount)
+    elapsed = time.perf_counter() - started
+    rate = len(df) / elapsed
+    print(f"  {label:<12} {elapsed:8.2f}s  {rate:12,.0f} rows/sec")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark DataFrame to bulk upsert conversion')
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    frames = {
+        'leads': (transform_leads_dataframe(pd.DataFrame(make_contacts(args.rows)), LEAD_STATUS_MAPPING), False),
+        'deals': (transform_deals_dataframe(pd.DataFrame(make_deals(args.rows))), True),
+    }
+
+    for name, (df, numeric_amount) in frames.items():
+        print(f"{name} ({len(df):,} rows):")
+        before = measure("iterrows", legacy_operations, df, numeric_amount)
+        after = measure("vectorized", vectorized_operations, df, numeric_amount)
+        print(f"  speedup      {after / before:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Synthetic HubSpot-shaped records for the benchmarks
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+LEAD_STATUSES = ["NEW", "OPEN", "IN_PROGRESS", "OPEN_DEAL", "UNQUALIFIED",
+                 "ATTEMPTED_TO_CONTACT", "CONNECTED", "BAD_TIMING", None]
+DEAL_STAGES = ["appointmentscheduled", "qualifiedtobuy", "presentationscheduled",
+               "decisionmakerboughtin", "contractsent", "closedwon", "closedlost"]
+
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _iso(moment):
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.') + f"{moment.microsecond // 1000:03d}Z"
+
+
+def make_contacts(count, seed=7):
+    rng = random.Random(seed)
+    contacts = []
+    for i in range(count):
+        contacts.append({
+            'id': str(100000 + i),
+            'email': f"contact{i}@example.com",
+            'firstname': rng.choice(["Ana", "Carlos", "María", None]),
+            'lastname': rng.choice(["García", "López", "Pérez", None]),
+            'hs_lead_status': rng.choice(LEAD_STATUSES),
+            'lastmodifieddate': _iso(_EPOCH + timedelta(seconds=i))
+        })
+    return contacts
+
+
+def make_deals(count, seed=7):
+    rng = random.Random(seed)
+    deals = []
+    for i in range(count):
+        close = _EPOCH + timedelta(days=rng.randint(0, 700))
+        deals.append({
+            'id': str(200000 + i),
+            'dealname': f"Deal {i}",
+            'amount': rng.choice([str(rng.randint(1000, 90000)), "", None, "n/a"]),
+            'dealstage': rng.choice(DEAL_STAGES),
+            'pipeline': "default",
+            'closedate': rng.choice([close.strftime('%Y-%m-%d'), None]),
+            'dealtype': rng.choice(["newbusiness", "existingbusiness"]),
+            'description': "Synthetic benchmark deal",
+            'createdate': _iso(_EPOCH + timedelta(minutes=i)),
+            'hs_lastmodifieddate': _iso(_EPOCH + timedelta(seconds=i))
+        })
+    return deals
+
+
+LEAD_STATUS_MAPPING = {status: index for index, status in enumerate(LEAD_STATUSES[:-1], 1)}
@@ -0,0 +1,404 @@
+"""
+Local stand-in for the HubSpot CRM endpoints the project uses.
+
+Serves list (cursor paging), search, batch create and batch archive for
+contacts, deals and companies, plus the v4 batch associate/read association
+endpoints, from in-memory records, with configurable
+per-request latency, a page-size cap and 429 injection. Like HubSpot, a
+batch create holding a contact email that already exists is rejected as a
+whole with a 409. Point the clients at it with HUBSPOT_BASE_URL (or the
+base_url/host arguments).
+
+    uv run python -m benchmarks.fake_hubspot --contacts 50000 --deals 50000 --latency-ms 20
+"""
+import argparse
+import bisect
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.datasets import make_contacts, make_deals
+from hubspot_schema import SEARCH_PAGE_SIZE, to_epoch_ms
+
+OBJECT_TYPES = ('contacts', 'deals', 'companies')
+
+_OBJECT_PATH = re.compile(r'^/crm/v3/objects/(\w+)(/search|/batch/create|/batch/archive)?/?$')
+_ASSOCIATION_PATH = re.compile(r'^/crm/v4/associations/(\w+)/(\w+)/batch/(associate/default|read)/?$')
+
+# HubSpot-defined type ids of the default (unlabeled) associations
+DEFAULT_ASSOCIATION_TYPES = {
+    ('deals', 'contacts'): 3,
+    ('deals', 'companies'): 341,
+    ('contacts', 'companies'): 279,
+}
+
+# Associated objects returned per object and page by the batch read endpoint
+ASSOCIATIONS_PAGE_SIZE = 500
+
+
+def _now_iso():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+def _comparable(value):
+    """Dates compare as epoch ms, numbers as floats, everything else as strings"""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return float(to_epoch_ms(value))
+    except (TypeError, ValueError):
+        return str(value)
+
+
+_OPERATORS = {
+    'EQ': lambda a, b: a == b,
+    'NEQ': lambda a, b: a != b,
+    'GT': lambda a, b: a > b,
+    'GTE': lambda a, b: a >= b,
+    'LT': lambda a, b: a < b,
+    'LTE': lambda a, b: a <= b,
+}
+
+
+def _matches(properties, filter_groups):
+    if not filter_groups:
+        return True
+    for group in filter_groups:
+        matched = True
+        for condition in group.get('filters', []):
+            value = _comparable(properties.get(condition.get('propertyName')))
+            operator = condition.get('operator', 'EQ')
+            if operator == 'HAS_PROPERTY':
+                matched = value is not None
+            elif operator == 'NOT_HAS_PROPERTY':
+                matched = value is None
+            else:
+                target = _comparable(condition.get('value'))
+                try:
+                    matched = value is not None and _OPERATORS[operator](value, target)
+                except TypeError:
+                    matched = False
+            if not matched:
+                break
+        if matched:
+            return True
+    return False
+
+
+class FakeHubSpotStore:
+    """In-memory objects keyed by type, with HubSpot-style string ids"""
+
+    def __init__(self, contacts=(), deals=(), companies=()):
+        self.lock = threading.Lock()
+        self.objects = {object_type: {} for object_type in OBJECT_TYPES}
+        # (from type, to type) -> from id -> set of to ids
+        self.associations = {}
+        self._ordered_ids = {}
+        # Contact email -> id; HubSpot keeps contact emails unique
+        self.emails = {}
+        self.next_id = 1
+        for object_type, records in (('contacts', contacts), ('deals', deals), ('companies', companies)):
+            for record in records:
+                properties = {k: v for k, v in record.items() if k != 'id'}
+                self._insert(object_type, properties, record.get('id'))
+
+    def _insert(self, object_type, properties, object_id=None):
+        if object_id is None:
+            object_id = str(self.next_id)
+        if str(object_id).isdigit():
+            self.next_id = max(self.next_id, int(object_id) + 1)
+        self._ordered_ids.pop(object_type, None)
+        now = _now_iso()
+        # Like HubSpot, every object carries its id as the searchable hs_object_id property
+        properties = dict(properties, hs_object_id=str(object_id))
+        obj = {'id': str(object_id), 'properties': properties, 'createdAt': now,
+               'updatedAt': now, 'archived': False}
+        self.objects[object_type][str(object_id)] = obj
+        if object_type == 'contacts' and properties.get('email'):
+            self.emails[properties['email']] = str(object_id)
+        return obj
+
+    def page(self, object_type, limit, after, properties):
+        """One list page; like HubSpot, `after` is an opaque cursor (here the last id returned)"""
+        with self.lock:
+            ordered = self._ordered_ids.get(object_type)
+            if ordered is None:
+                ordered = self._ordered_ids[object_type] = sorted(int(i) for i in self.objects[object_type])
+            start = bisect.bisect_right(ordered, int(after)) if after else 0
+            ids = ordered[start:start + limit]
+            chunk = [self.objects[object_type][str(object_id)] for object_id in ids]
+            has_more = start + limit < len(ordered)
+        body = {'results': [self._project(obj, properties) for obj in chunk]}
+        if has_more:
+            body['paging'] = {'next': {'after': chunk[-1]['id']}}
+        return body
+
+    def search(self, object_type, request, max_page_size):
+        with self.lock:
+            objects = list(self.objects[object_type].values())
+        matched = [obj for obj in objects if _matches(obj['properties'], request.get('filterGroups'))]
+
+        sorts = request.get('sorts') or [{'propertyName': 'hs_object_id', 'direction': 'ASCENDING'}]
+        sort = sorts[0]
+        name = sort['propertyName'] if isinstance(sort, dict) else sort
+        descending = isinstance(sort, dict) and sort.get('direction') == 'DESCENDING'
+
+        def sort_key(obj):
+            value = int(obj['id']) if name == 'hs_object_id' else _comparable(obj['properties'].get(name))
+            return (value is None, value if isinstance(value, float) else 0, str(value), int(obj['id']))
+        matched.sort(key=sort_key, reverse=descending)
+
+        start = int(request.get('after') or 0)
+        if start >= 10000:
+            return 400, {'status': 'error', 'message': 'Search results are capped at 10000'}
+        limit = min(int(request.get('limit') or 10), max_page_size)
+        chunk = matched[start:start + limit]
+        body = {'total': len(matched),
+                'results': [self._project(obj, request.get('properties')) for obj in chunk]}
+        if start + limit < len(matched):
+            body['paging'] = {'next': {'after': str(start + limit)}}
+        return 200, body
+
+    def batch_create(self, object_type, inputs):
+        """(status, body) of a batch create; one duplicate contact email rejects the whole batch"""
+        started = _now_iso()
+        results = []
+        with self.lock:
+            if object_type == 'contacts':
+                seen = set()
+                for item in inputs:
+                    email = (item.get('properties') or {}).get('email')
+                    if email and (email in self.emails or email in seen):
+                        existing = self.emails.get(email, '')
+                        return 409, {'status': 'error', 'category': 'CONFLICT',
+                                     'message': f'Contact already exists. Existing ID: {existing}'}
+                    seen.add(email)
+            for item in inputs:
+                obj = self._insert(object_type, item.get('properties') or {})
+                result = dict(obj)
+                if item.get('objectWriteTraceId') is not None:
+                    result['objectWriteTraceId'] = item['objectWriteTraceId']
+                results.append(result)
+        return 201, {'status': 'COMPLETE', 'results': results, 'startedAt': started, 'completedAt': _now_iso()}
+
+    def batch_archive(self, object_type, inputs):
+        with self.lock:
+            for item in inputs:
+                obj = self.objects[object_type].pop(str(item.get('id')), None)
+                if obj is not None and object_type == 'contacts':
+                    self.emails.pop(obj['properties'].get('email'), None)
+            self._ordered_ids.pop(object_type, None)
+
+    def associate(self, from_type, to_type, pairs):
+        """Store default associations for (from id, to id) pairs, in both directions like HubSpot"""
+        with self.lock:
+            for from_id, to_id in pairs:
+                self.associations.setdefault((from_type, to_type), {}).setdefault(str(from_id), set()).add(str(to_id))
+                self.associations.setdefault((to_type, from_type), {}).setdefault(str(to_id), set()).add(str(from_id))
+
+    def associate_default(self, from_type, to_type, inputs):
+        started = _now_iso()
+        pairs = [(item['from']['id'], item['to']['id']) for item in inputs]
+        self.associate(from_type, to_type, pairs)
+        spec = {'associationCategory': 'HUBSPOT_DEFINED',
+                'associationTypeId': DEFAULT_ASSOCIATION_TYPES.get((from_type, to_type), 1)}
+        results = [{'from': {'id': str(from_id)}, 'to': {'id': str(to_id)}, 'associationSpec': spec}
+                   for from_id, to_id in pairs]
+        return {'status': 'COMPLETE', 'results': results, 'startedAt': started, 'completedAt': _now_iso()}
+
+    def read_associations(self, from_type, to_type, inputs):
+        """Batch read; objects without associations are left out of the results"""
+        started = _now_iso()
+        type_id = DEFAULT_ASSOCIATION_TYPES.get((from_type, to_type)) or \
+            DEFAULT_ASSOCIATION_TYPES.get((to_type, from_type), 1)
+        results = []
+        with self.lock:
+            edges = self.associations.get((from_type, to_type), {})
+            for item in inputs:
+                from_id = str(item.get('id'))
+                targets = sorted(edges.get(from_id, ()), key=int)
+                start = int(item.get('after') or 0)
+                chunk = targets[start:start + ASSOCIATIONS_PAGE_SIZE]
+                if not chunk:
+                    continue
+                result = {'from': {'id': from_id}, 'to': [
+                    {'toObjectId': int(to_id),
+                     'associationTypes': [{'category': 'HUBSPOT_DEFINED', 'typeId': type_id, 'label': None}]}
+                    for to_id in chunk
+                ]}
+                if start + ASSOCIATIONS_PAGE_SIZE < len(targets):
+                    result['paging'] = {'next': {'after': str(start + ASSOCIATIONS_PAGE_SIZE)}}
+                results.append(result)
+        return {'status': 'COMPLETE', 'results': results, 'startedAt': started, 'completedAt': _now_iso()}
+
+    @staticmethod
+    def _project(obj, properties):
+        if properties:
+            names = properties.split(',') if isinstance(properties, str) else properties
+            obj = dict(obj, properties={name: obj['properties'].get(name) for name in names})
+        return obj
+
+
+class FakeHubSpotServer:
+    """Threaded HTTP server over a FakeHubSpotStore; usable as a context manager"""
+
+    def __init__(self, store=None, latency_ms=0.0, max_page_size=100, rate_limit_every=0,
+                 retry_after=1, host='127.0.0.1', port=0, max_search_page_size=SEARCH_PAGE_SIZE):
+        self.store = store or FakeHubSpotStore()
+        self.latency = latency_ms / 1000
+        self.max_page_size = max_page_size
+        self.max_search_page_size = max_search_page_size
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.requests = 0
+        self.rate_limited = 0
+        self._counter_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-hubspot", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _admit(self):
+        """Count the request and decide whether it gets an injected 429"""
+        with self._counter_lock:
+            self.requests += 1
+            if self.rate_limit_every and self.requests % self.rate_limit_every == 0:
+                self.rate_limited += 1
+                return False
+        return True
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body=None, headers=None):
+                payload = b'' if body is None else json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                if payload:
+                    self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _read_json(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                return json.loads(self.rfile.read(length) or b'{}') if length else {}
+
+            def _route(self, method):
+                url = urlparse(self.path)
+                match = _OBJECT_PATH.match(url.path)
+                association = _ASSOCIATION_PATH.match(url.path)
+                body = self._read_json() if method == 'POST' else {}
+
+                if server.latency:
+                    time.sleep(server.latency)
+                if not server._admit():
+                    return self._send(429, {'status': 'error', 'category': 'RATE_LIMITS',
+                                            'message': 'Injected rate limit'},
+                                      {'Retry-After': str(server.retry_after)})  # whole seconds, as HTTP requires
+                if association and method == 'POST':
+                    from_type, to_type, action = association.groups()
+                    if from_type not in OBJECT_TYPES or to_type not in OBJECT_TYPES:
+                        return self._send(404, {'status': 'error', 'message': f'No route for {url.path}'})
+                    if action == 'read':
+                        return self._send(200, server.store.read_associations(
+                            from_type, to_type, body.get('inputs', [])))
+                    return self._send(200, server.store.associate_default(
+                        from_type, to_type, body.get('inputs', [])))
+                if not match or match.group(1) not in OBJECT_TYPES:
+                    return self._send(404, {'status': 'error', 'message': f'No route for {url.path}'})
+
+                object_type, action = match.group(1), match.group(2)
+                store = server.store
+                if method == 'GET' and action is None:
+                    query = parse_qs(url.query)
+                    limit = min(int(query.get('limit', ['10'])[0]), server.max_page_size)
+                    properties = ','.join(query.get('properties', [])) or None
+                    return self._send(200, store.page(object_type, limit, query.get('after', [None])[0], properties))
+                if method == 'POST' and action == '/search':
+                    return self._send(*store.search(object_type, body, server.max_search_page_size))
+                if method == 'POST' and action == '/batch/create':
+                    return self._send(*store.batch_create(object_type, body.get('inputs', [])))
+                if method == 'POST' and action == '/batch/archive':
+                    store.batch_archive(object_type, body.get('inputs', []))
+                    return self._send(204)
+                return self._send(405, {'status': 'error', 'message': f'{method} not supported on {url.path}'})
+
+            def do_GET(self):
+                self._route('GET')
+
+            def do_POST(self):
+                self._route('POST')
+
+        return Handler
+
+
+def make_store(contacts=0, deals=0, seed=7):
+    """Store preloaded with the synthetic benchmark datasets"""
+    return FakeHubSpotStore(contacts=make_contacts(contacts, seed=seed), deals=make_deals(deals, seed=seed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local fake HubSpot API')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--contacts', type=int, default=10000)
+    parser.add_argument('--deals', type=int, default=10000)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--max-page-size', type=int, default=100)
+    parser.add_argument('--rate-limit-every', type=int, default=0,
+                        help='Answer every Nth request with 429 (0 disables)')
+    parser.add_argument('--retry-after', type=int, default=1,
+                        help='Seconds sent in the Retry-After header of injected 429s')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    server = FakeHubSpotServer(make_store(args.contacts, args.deals, args.seed),
+                               latency_ms=args.latency_ms, max_page_size=args.max_page_size,
+                               rate_limit_every=args.rate_limit_every, retry_after=args.retry_after,
+                               port=args.port)
+    print(f"Fake HubSpot listening on {server.base_url} "
+          f"({args.contacts} contacts, {args.deals} deals)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
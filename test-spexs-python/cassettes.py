@@ -0,0 +1,306 @@
+"""
+Record/replay of HubSpot API traffic at the HTTP transport level.
+
+When a cassette is active (HUBSPOT_CASSETTE_MODE or --cassette), every SDK
+API client built by HubSpotClient sends its requests through a
+CassettePoolManager instead of straight to urllib3, and AsyncHubSpotClient
+sends its httpx requests through Cassette.respond_async(). Requests are keyed on
+method, path, query and JSON body (never headers, so the access token is not
+stored); responses are kept in memory and saved as one gzipped JSON file,
+<HUBSPOT_CASSETTE_DIR>/<HUBSPOT_CASSETTE_NAME>.json.gz:
+
+- record: call HubSpot for every request and store the response
+- replay: answer from the cassette only; a request it does not hold fails
+- auto:   answer from the cassette, calling HubSpot (and recording) on a miss
+
+429 and 5xx responses are never stored, so a replay cannot loop on retries.
+With a max age (HUBSPOT_CASSETTE_MAX_AGE seconds) auto mode refreshes older
+entries, conditionally (If-None-Match / If-Modified-Since) when the stored
+response had an ETag or Last-Modified header; a 304 keeps the stored body.
+"""
+import atexit
+import base64
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+from config import config
+from run_metrics import metrics
+
+CASSETTE_MODES = ('record', 'replay', 'auto')
+
+CASSETTE_VERSION = 1
+
+# New entries between saves, so a crashed recording keeps most of its work
+SAVE_EVERY = 200
+
+# Transient responses; replaying them would only replay the retries
+_UNRECORDED_STATUSES = {429, 500, 502, 503, 504}
+
+# Describe the stored (already decoded) body wrongly, or carry session state
+_DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'set-cookie'}
+
+
+class CassetteMissError(LookupError):
+    """A replay-only cassette has no response for a request"""
+
+
+def request_key(method, url, fields=None, body=None):
+    """(key, request) for one HTTP request: the key is a digest of method, path, sorted query and body"""
+    parsed = urlsplit(url)
+    query = parse_qsl(parsed.query, keep_blank_values=True)
+    if fields:
+        query.extend(fields.items() if isinstance(fields, dict) else fields)
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', 'replace')
+    if isinstance(body, str):
+        try:
+            body = json.loads(body)
+        except ValueError:
+            pass
+
+    request = {
+        'method': method.upper(),
+        'path': parsed.path,
+        'query': sorted([str(name), str(value)] for name, value in query),
+        'body': body,
+    }
+    canonical = json.dumps(request, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest(), request
+
+
+def _header(headers, name):
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _stored(status, reason, headers, data):
+    stored = {
+        'status': status,
+        'reason': reason,
+        'headers': {name: value for name, value in headers.items() if name.lower() not in _DROPPED_HEADERS},
+    }
+    try:
+        stored['body'] = data.decode('utf-8')
+    except UnicodeDecodeError:
+        stored['body_base64'] = base64.b64encode(data).decode('ascii')
+    return stored
+
+
+def _stored_body(stored):
+    if 'body' in stored:
+        return stored['body'].encode('utf-8')
+    return base64.b64decode(stored['body_base64'])
+
+
+def _stored_response(response):
+    return _stored(response.status, response.reason, response.headers, response.data or b'')
+
+
+def _replayed_response(stored):
+    import urllib3
+
+    return urllib3.HTTPResponse(body=io.BytesIO(_stored_body(stored)), headers=stored['headers'],
+                                status=stored['status'], reason=stored['reason'], preload_content=True,
+                                decode_content=False)
+
+
+def _stored_httpx_response(response):
+    return _stored(response.status_code, response.reason_phrase, response.headers, response.content)
+
+
+def _replayed_httpx_response(stored, request):
+    import httpx
+
+    return httpx.Response(stored['status'], headers=stored['headers'], content=_stored_body(stored),
+                          request=request)
+
+
+class Cassette:
+
+    def __init__(self, path, mode='auto', max_age=None):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}, expected one of {', '.join(CASSETTE_MODES)}")
+        self.path = path
+        self.mode = mode
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = self._read()
+        self._unsaved = 0
+
+    def _read(self):
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as file:
+                document = json.load(file)
+        except FileNotFoundError:
+            if self.mode == 'replay':
+                raise CassetteMissError(f"Cassette {self.path} does not exist; record it first")
+            return {}
+        if document.get('version') != CASSETTE_VERSION:
+            raise ValueError(f"Cassette {self.path} has version {document.get('version')}, "
+                             f"expected {CASSETTE_VERSION}")
+        return document['entries']
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _expired(self, entry):
+        return self.max_age is not None and time.time() - entry['recorded_at'] > self.max_age
+
+    def _store(self, key, request, response):
+        with self._lock:
+            self._entries[key] = {'request': request, 'response': response, 'recorded_at': time.time()}
+            self._unsaved += 1
+            save = self._unsaved >= SAVE_EVERY
+        if save:
+            self.save()
+
+    def _plan(self, method, url, fields, body):
+        """(key, request, entry, conditions) for one request; conditions is None when `entry` answers it"""
+        key, request = request_key(method, url, fields, body)
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if self.mode == 'replay':
+            if entry is None:
+                raise CassetteMissError(
+                    f"No recorded response for {request['method']} {request['path']} in {self.path}")
+            metrics.count('cassette_requests_total', result='hit')
+            return key, request, entry, None
+        if self.mode == 'auto' and entry is not None and not self._expired(entry):
+            metrics.count('cassette_requests_total', result='hit')
+            return key, request, entry, None
+
+        conditions = {}
+        if entry is not None and self.mode == 'auto':
+            etag = _header(entry['response']['headers'], 'etag')
+            last_modified = _header(entry['response']['headers'], 'last-modified')
+            if etag:
+                conditions['If-None-Match'] = etag
+            if last_modified:
+                conditions['If-Modified-Since'] = last_modified
+        return key, request, entry, conditions
+
+    def _settle(self, key, request, entry, conditions, status, stored):
+        """Record a live response (`stored()` builds its stored form); returns the stored response
+        to answer with instead when HubSpot confirmed the recorded one with a 304"""
+        if status == 304 and conditions:
+            self._store(key, request, entry['response'])
+            metrics.count('cassette_requests_total', result='not_modified')
+            return entry['response']
+        if status not in _UNRECORDED_STATUSES:
+            self._store(key, request, stored())
+            metrics.count('cassette_requests_total', result='refreshed' if entry is not None else 'recorded')
+        return None
+
+    def respond(self, method, url, fields, body, send):
+        """The response to one urllib3 request, from the cassette or from `send(extra_headers)`"""
+        key, request, entry, conditions = self._plan(method, url, fields, body)
+        if conditions is None:
+            return _replayed_response(entry['response'])
+        response = send(conditions)
+        confirmed = self._settle(key, request, entry, conditions, response.status,
+                                 lambda: _stored_response(response))
+        return response if confirmed is None else _replayed_response(confirmed)
+
+    async def respond_async(self, request, send):
+        """The response to one httpx request, from the cassette or from `await send(extra_headers)`"""
+        key, stored_request, entry, conditions = self._plan(
+            request.method, str(request.url), None, request.content)
+        if conditions is None:
+            return _replayed_httpx_response(entry['response'], request)
+        response = await send(conditions)
+        await response.aread()
+        confirmed = self._settle(key, stored_request, entry, conditions, response.status_code,
+                                 lambda: _stored_httpx_response(response))
+        return response if confirmed is None else _replayed_httpx_response(confirmed, request)
+
+    def save(self):
+        """Write the cassette if anything was recorded since the last save"""
+        with self._lock:
+            if not self._unsaved:
+                return
+            payload = json.dumps({'version': CASSETTE_VERSION, 'entries': self._entries},
+                                 separators=(',', ':'))
+            self._unsaved = 0
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with gzip.open(temporary, 'wt', encoding='utf-8', compresslevel=6) as file:
+            file.write(payload)
+        os.replace(temporary, self.path)
+
+    def api_factory(self, api_client_package, api_name, configuration):
+        """HubSpot(api_factory=...) hook: build the SDK API as usual, then route it through this cassette"""
+        from hubspot.discovery.discovery_base import DiscoveryBase
+
+        api = DiscoveryBase._default_api_factory(api_client_package, api_name, configuration)
+        rest_client = api.api_client.rest_client
+        rest_client.pool_manager = CassettePoolManager(self, rest_client.pool_manager)
+        return api
+
+
+class CassettePoolManager:
+    """Stands in for the urllib3 PoolManager of one SDK REST client"""
+
+    def __init__(self, cassette, pool_manager):
+        self.cassette = cassette
+        self.pool_manager = pool_manager
+
+    def request(self, method, url, fields=None, body=None, headers=None, **kwargs):
+        def send(conditions):
+            return self.pool_manager.request(method, url, fields=fields, body=body,
+                                             headers={**(headers or {}), **conditions}, **kwargs)
+
+        return self.cassette.respond(method, url, fields, body, send)
+
+    def __getattr__(self, name):
+        return getattr(self.pool_manager, name)
+
+
+_cassette = None
+_cassette_configured = False
+_cassette_lock = threading.Lock()
+
+
+def cassette_path(name=None, directory=None):
+    return os.path.join(directory or config.hubspot_cassette_dir,
+                        f"{name or config.hubspot_cassette_name}.json.gz")
+
+
+def get_cassette():
+    """Process-wide Cassette set up from HUBSPOT_CASSETTE_MODE, or None when record/replay is off"""
+    global _cassette, _cassette_configured
+    with _cassette_lock:
+        if not _cassette_configured:
+            _cassette_configured = True
+            if config.hubspot_cassette_mode:
+                _cassette = Cassette(cassette_path(), mode=config.hubspot_cassette_mode,
+                                     max_age=config.hubspot_cassette_max_age)
+                atexit.register(_cassette.save)
+        return _cassette
+
+
+def configure_cassette(mode, path=None, max_age=None):
+    """Replace the process-wide cassette; a None mode turns record/replay off.
+
+    Only HubSpotClients and AsyncHubSpotClients created afterwards use it.
+    """
+    global _cassette, _cassette_configured
+    with _cassette_lock:
+        if _cassette is not None:
+            _cassette.save()
+        _cassette = None
+        if mode:
+            _cassette = Cassette(path or cassette_path(), mode=mode,
+                                 max_age=config.hubspot_cassette_max_age if max_age is None else max_age)
+            atexit.register(_cassette.save)
+        _cassette_configured = True
+        return _cassette
@@ -0,0 +1,59 @@
+"""
+Durable progress checkpoints for long syncs and seed loads.
+
+A checkpoint is a small JSON document in CHECKPOINT_DIR, rewritten
+atomically (and fsynced) after every committed unit of work: a loaded page,
+a finished partition or a created batch. A run started with --resume reads
+it back and continues after the last committed unit; a run that finishes
+cleanly deletes it.
+"""
+import json
+import os
+from datetime import datetime, timezone
+
+from config import config
+
+
+class Checkpoint:
+
+    def __init__(self, name, directory=None):
+        self.name = name
+        self.path = os.path.join(directory or config.checkpoint_dir, f"{name}.json")
+        self.state = self._read()
+
+    def _read(self):
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable checkpoint {self.path}: {e}")
+            return {}
+
+    def __bool__(self):
+        return bool(self.state)
+
+    def get(self, key, default=None):
+        return self.state.get(key, default)
+
+    def save(self, **fields):
+        """Merge `fields` into the checkpoint and persist it before returning"""
+        self.state.update(fields)
+        self.state['updated_at'] = datetime.now(timezone.utc).isoformat()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(self.state, file, default=str)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
+
+    def clear(self):
+        """Forget the checkpoint once its run has finished"""
+        self.state = {}
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -1,13 +1,23 @@
 """
 Configuration module for loading environment variables
+
+The .env file is read and Config is built on first use (get_config() or any
+attribute of `config`), not at import, so entry points that exit early
+(--help, argument errors) never pay for it.
 """
 import os
-from dotenv import load_dotenv
+import threading
+
+
+def load_environment():
+    """Load .env.<ENVIRONMENT> (development by default) into os.environ"""
+    from dotenv import load_dotenv
+
+    environment = os.getenv('ENVIRONMENT')
+    if not environment:
+        environment = 'development'
+    load_dotenv(f'.env.{environment}')
 
-environment = os.getenv('ENVIRONMENT')
-if not environment:
-    environment = 'development'
-load_dotenv(f'.env.{environment}')
 
 class Config:
 
@@ -15,12 +25,31 @@ class Config:
         self.hubspot_key = os.getenv('HUBSPOT_KEY')
         self.mongo_uri = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
         self.mongo_db_name = os.getenv('MONGO_DB_NAME', 'hubspot_data')
-        
-        if not self.hubspot_key:
-            raise ValueError("HUBSPOT_KEY not found in environment variables")
+        self.mongo_max_pool_size = int(os.getenv('MONGO_MAX_POOL_SIZE', '100'))
+        self.hubspot_base_url = os.getenv('HUBSPOT_BASE_URL')
+        self.hubspot_requests_per_10s = int(os.getenv('HUBSPOT_REQUESTS_PER_10S', '100'))
+        self.hubspot_daily_limit = int(os.getenv('HUBSPOT_DAILY_LIMIT', '250000'))
+        self.hubspot_max_workers = int(os.getenv('HUBSPOT_MAX_WORKERS', '8'))
+        self.hubspot_max_retries = int(os.getenv('HUBSPOT_MAX_RETRIES', '5'))
+        self.snapshot_dir = os.getenv('SNAPSHOT_DIR')
+        self.reference_cache_ttl = int(os.getenv('REFERENCE_CACHE_TTL', '300'))
+        self.checkpoint_dir = os.getenv('CHECKPOINT_DIR', '.checkpoints')
+        self.extract_workers = int(os.getenv('EXTRACT_WORKERS', '1'))
+        self.pipeline_queue_size = int(os.getenv('PIPELINE_QUEUE_SIZE', '2'))
+        self.sync_associations = os.getenv('SYNC_ASSOCIATIONS', 'false').lower() in ('1', 'true', 'yes')
+        self.hubspot_cassette_mode = os.getenv('HUBSPOT_CASSETTE_MODE') or None
+        self.hubspot_cassette_dir = os.getenv('HUBSPOT_CASSETTE_DIR', 'cassettes')
+        self.hubspot_cassette_name = os.getenv('HUBSPOT_CASSETTE_NAME', 'hubspot')
+        max_age = os.getenv('HUBSPOT_CASSETTE_MAX_AGE')
+        self.hubspot_cassette_max_age = float(max_age) if max_age else None
+        self.metrics_json = os.getenv('METRICS_JSON')
+        self.metrics_textfile = os.getenv('METRICS_TEXTFILE')
     
     @property
     def hubspot_api_key(self):
+        # Checked on use, so commands that never call HubSpot run without the key
+        if not self.hubspot_key:
+            raise ValueError("HUBSPOT_KEY not found in environment variables")
         return self.hubspot_key
     
     @property
@@ -31,4 +60,26 @@ class Config:
     def mongodb_database(self):
         return self.mongo_db_name
 
-config = Config()
\ No newline at end of file
+
+_config = None
+_config_lock = threading.Lock()
+
+
+def get_config():
+    """Process-wide Config, built from the environment (and .env file) on first use"""
+    global _config
+    with _config_lock:
+        if _config is None:
+            load_environment()
+            _config = Config()
+        return _config
+
+
+class _LazyConfig:
+    """Stands in for the process-wide Config until an attribute is first read"""
+
+    def __getattr__(self, name):
+        return getattr(get_config(), name)
+
+
+config = _LazyConfig()
@@ -1,15 +1,30 @@
-import json
 import logging
 import os
 import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
 from typing import Optional
 
 try:
     from hubspot import HubSpot
     from hubspot.crm.contacts import SimplePublicObjectInputForCreate as ContactInput
+    from hubspot.crm.contacts import PublicObjectSearchRequest as SearchRequest
+    from hubspot.crm.contacts import BatchInputSimplePublicObjectBatchInputForCreate as ContactBatchInput
+    from hubspot.crm.contacts import SimplePublicObjectBatchInputForCreate as ContactBatchItem
+    from hubspot.crm.deals import BatchInputSimplePublicObjectBatchInputForCreate as DealBatchInput
+    from hubspot.crm.deals import SimplePublicObjectBatchInputForCreate as DealBatchItem
+    from hubspot.crm.objects import BatchInputSimplePublicObjectId as BatchIdsInput
+    from hubspot.crm.objects import SimplePublicObjectId as ObjectIdInput
     from hubspot.crm.companies import SimplePublicObjectInputForCreate as CompanyInput
     from hubspot.crm.deals import SimplePublicObjectInputForCreate as DealInput
-    from hubspot.crm.associations import BatchInputPublicAssociation, PublicAssociation
+    from hubspot.crm.associations.v4 import BatchInputPublicDefaultAssociationMultiPost as AssociationBatchInput
+    from hubspot.crm.associations.v4 import PublicDefaultAssociationMultiPost as AssociationInput
+    from hubspot.crm.associations.v4 import BatchInputPublicFetchAssociationsBatchRequest as AssociationReadBatchInput
+    from hubspot.crm.associations.v4 import PublicFetchAssociationsBatchRequest as AssociationReadInput
+    from hubspot.crm.associations.v4 import PublicObjectId
     HUBSPOT_AVAILABLE = True
 
 
@@ -20,20 +35,57 @@ except ImportError:
     class ContactInput:
         pass
 
+    class SearchRequest:
+        pass
+
+    class ContactBatchInput:
+        pass
+
+    class ContactBatchItem:
+        pass
+
+    class DealBatchInput:
+        pass
+
+    class DealBatchItem:
+        pass
+
+    class BatchIdsInput:
+        pass
+
+    class ObjectIdInput:
+        pass
+
     class CompanyInput:
         pass
 
     class DealInput:
         pass
 
-    class BatchInputPublicAssociation:
+    class AssociationBatchInput:
         pass
 
-    class PublicAssociation:
+    class AssociationInput:
+        pass
+
+    class AssociationReadBatchInput:
+        pass
+
+    class AssociationReadInput:
+        pass
+
+    class PublicObjectId:
         pass
     HUBSPOT_AVAILABLE = False
 
+from cassettes import get_cassette
+from checkpoints import Checkpoint
 from config import config
+from hubspot_schema import (ASSOCIATION_BATCH_SIZE, BATCH_SIZE, COMPANY_PROPERTIES, CONTACT_PROPERTIES,
+                            DEAL_PROPERTIES, ROW_REJECTION_STATUSES, SEARCH_PAGE_SIZE, SEARCH_RESULT_CAP, Page,
+                            to_epoch_ms, to_record)
+from json_stream import iter_batches, iter_json_records
+from request_scheduler import get_scheduler
 
 if not HUBSPOT_AVAILABLE:
     raise ImportError(
@@ -44,30 +96,47 @@ logger = logging.getLogger(__name__)
 
 class HubSpotClient:
     def __init__(self):
-        self.client = HubSpot(access_token=config.hubspot_api_key)
+        options = {'host': config.hubspot_base_url} if config.hubspot_base_url else {}
+        access_token = None
+        cassette = get_cassette()
+        if cassette is not None:
+            options['api_factory'] = cassette.api_factory
+            if cassette.mode == 'replay':
+                # Replays never reach HubSpot, so they run without a key
+                access_token = config.hubspot_key or 'cassette-replay'
+        self.client = HubSpot(access_token=access_token or config.hubspot_api_key, **options)
+        self.scheduler = get_scheduler()
         logger.info("HubSpot client initialized successfully")
 
+    @staticmethod
+    def _contact_properties(email, first_name="", last_name="", phone="", company="",
+                            jobtitle="", is_lead=True, hs_lead_status="NEW"):
+        properties = {
+            "email": email,
+            "firstname": first_name,
+            "lastname": last_name,
+            "phone": phone,
+            "company": company,
+            "jobtitle": jobtitle
+        }
+        if is_lead:
+            properties["lifecyclestage"] = "lead"
+            properties["hs_lead_status"] = hs_lead_status
+
+        return {k: v for k, v in properties.items() if v}
+
     def create_contact(self, email: str, first_name: str = "", last_name: str = "",
                        phone: str = "", company: str = "", jobtitle: str = "",
                        is_lead: bool = True, hs_lead_status: str = "NEW") -> Optional[str]:
 
         try:
-            properties = {
-                "email": email,
-                "firstname": first_name,
-                "lastname": last_name,
-                "phone": phone,
-                "company": company,
-                "jobtitle": jobtitle
-            }
-            if is_lead:
-                properties["lifecyclestage"] = "lead"
-                properties["hs_lead_status"] = hs_lead_status
-
-            properties = {k: v for k, v in properties.items() if v}
+            properties = self._contact_properties(
+                email, first_name, last_name, phone, company, jobtitle,
+                is_lead=is_lead, hs_lead_status=hs_lead_status)
 
             contact_input = ContactInput(properties=properties)
-            response = self.client.crm.contacts.basic_api.create(
+            response = self.scheduler.call(
+                self.client.crm.contacts.basic_api.create,
                 simple_public_object_input_for_create=contact_input
             )
 
@@ -94,32 +163,39 @@ class HubSpotClient:
             properties.update(kwargs)
 
             company_input = CompanyInput(properties=properties)
-            response = self.client.crm.companies.basic_api.create(
+            response = self.scheduler.call(
+                self.client.crm.companies.basic_api.create,
                 simple_public_object_input_for_create=company_input
             )
 
             logger.info(f"Company created successfully: {response.id}")
-            return response
+            return response.id
 
         except Exception as e:
             logger.error(f"Error creating company: {str(e)}")
             raise
 
-    def create_deal(self, deal_name, amount=None, stage="appointmentscheduled", contact_id=None, company_id=None, **kwargs):
+    @staticmethod
+    def _deal_properties(deal_name, amount=None, stage="appointmentscheduled", **kwargs):
+        properties = {
+            "dealname": deal_name,
+            "dealstage": stage
+        }
 
-        try:
-            properties = {
-                "dealname": deal_name,
-                "dealstage": stage
-            }
+        if amount:
+            properties["amount"] = str(amount)
 
-            if amount:
-                properties["amount"] = str(amount)
+        properties.update(kwargs)
+        return properties
 
-            properties.update(kwargs)
+    def create_deal(self, deal_name, amount=None, stage="appointmentscheduled", contact_id=None, company_id=None, **kwargs):
+
+        try:
+            properties = self._deal_properties(deal_name, amount, stage, **kwargs)
 
             deal_input = DealInput(properties=properties)
-            response = self.client.crm.deals.basic_api.create(
+            response = self.scheduler.call(
+                self.client.crm.deals.basic_api.create,
                 simple_public_object_input_for_create=deal_input
             )
 
@@ -136,41 +212,211 @@ class HubSpotClient:
             logger.error(f"Error creating deal: {str(e)}")
             raise
 
+    def _stream_batch_create(self, batch_api, item_cls, batch_input_cls, items, object_name="objects",
+                             batch_size=BATCH_SIZE):
+        """Create objects from an iterable of (properties, payload) pairs through batch_api.create.
+
+        Yields (payload, created id or None) for every input, in input order.
+        Chunks are submitted to the scheduler as the input is read, with at most
+        two chunks per worker in flight, so the input can be a stream of any
+        length. Each input carries its row index as objectWriteTraceId so results
+        and errors can be mapped back to the input rows. A chunk HubSpot rejects
+        as a whole (one invalid or duplicate row fails all of them) is split in
+        halves and retried, so only the rejected rows end up without an id.
+        """
+        max_in_flight = 2 * self.scheduler.max_workers
+        pending = deque()
+
+        def submit(inputs):
+            return self.scheduler.submit(
+                batch_api.create,
+                batch_input_simple_public_object_batch_input_for_create=batch_input_cls(inputs=inputs)
+            )
+
+        def created_ids(start, inputs, future):
+            """The created id (or None) of each input; a batch rejected as a whole is retried in halves"""
+            end = start + len(inputs)
+            ids = [None] * len(inputs)
+            try:
+                response = future.result()
+            except Exception as e:
+                status = getattr(e, 'status', None)
+                if status in ROW_REJECTION_STATUSES and len(inputs) > 1:
+                    # Halving until the bad rows are alone keeps the other rows of the batch
+                    logger.warning(f"HubSpot rejected {object_name} {start + 1}-{end} ({status}), "
+                                   f"retrying them in halves")
+                    middle = len(inputs) // 2
+                    halves = [(start, inputs[:middle]), (start + middle, inputs[middle:])]
+                    futures = [submit(half) for _, half in halves]
+                    return [object_id for (half_start, half), half_future in zip(halves, futures)
+                            for object_id in created_ids(half_start, half, half_future)]
+                logger.error(f"Error creating {object_name} {start + 1}-{end}: {str(e)}")
+                return ids
+
+            unmapped = []
+            for result in response.results or []:
+                trace_id = getattr(result, 'object_write_trace_id', None)
+                if trace_id is not None and trace_id.isdigit() and start <= int(trace_id) < end:
+                    ids[int(trace_id) - start] = result.id
+                else:
+                    unmapped.append(result.id)
+
+            # Without trace ids the API gives no per-row mapping; fall back to input order
+            free_slots = [i for i, object_id in enumerate(ids) if object_id is None]
+            for index, object_id in zip(free_slots, unmapped):
+                ids[index] = object_id
+
+            for error in getattr(response, 'errors', None) or []:
+                failed_rows = (error.context or {}).get('objectWriteTraceId', [])
+                failed_rows = [str(int(r) + 1) if str(r).isdigit() else str(r) for r in failed_rows]
+                rows_info = f" (rows {', '.join(failed_rows)})" if failed_rows else ""
+                logger.warning(f"Error creating {object_name}{rows_info}: {error.message}")
+            return ids
+
+        def resolve(start, chunk, inputs, future):
+            ids = created_ids(start, inputs, future)
+            created = sum(1 for object_id in ids if object_id)
+            logger.info(f"Batch {start + 1}-{start + len(chunk)}: {created}/{len(chunk)} {object_name} created")
+            return zip((payload for _, payload in chunk), ids)
+
+        start = 0
+        try:
+            for chunk in iter_batches(items, batch_size):
+                inputs = [
+                    item_cls(properties=properties, object_write_trace_id=str(start + offset), associations=[])
+                    for offset, (properties, _) in enumerate(chunk)
+                ]
+                pending.append((start, chunk, inputs, submit(inputs)))
+                start += len(chunk)
+
+                # Hand back finished chunks right away so callers can checkpoint them early
+                while pending and (len(pending) >= max_in_flight or pending[0][3].done()):
+                    yield from resolve(*pending.popleft())
+        except GeneratorExit:
+            raise
+        except BaseException:
+            # The input failed (or was interrupted): report the chunks already sent before re-raising,
+            # so callers record them instead of creating them again
+            while pending:
+                yield from resolve(*pending.popleft())
+            raise
+
+        while pending:
+            yield from resolve(*pending.popleft())
+
+    def _batch_create(self, batch_api, item_cls, batch_input_cls, rows, object_name="objects",
+                      batch_size=BATCH_SIZE):
+        """Create one object per property dict; returns the created ids aligned with `rows` (None on failure)"""
+        return [object_id for _, object_id in self._stream_batch_create(
+            batch_api, item_cls, batch_input_cls, ((properties, None) for properties in rows),
+            object_name=object_name, batch_size=batch_size)]
+
+    def associate_batch(self, from_type, to_type, pairs, batch_size=ASSOCIATION_BATCH_SIZE):
+        """Create the default association for every (from id, to id) pair, `batch_size` pairs per call.
+
+        Returns the number of pairs associated; failures are logged, not raised.
+        """
+        batch_api = self.client.crm.associations.v4.batch_api
+        pairs = [(str(from_id), str(to_id)) for from_id, to_id in pairs if from_id and to_id]
+        futures = [
+            (len(chunk), self.scheduler.submit(
+                batch_api.create_default, from_type, to_type,
+                batch_input_public_default_association_multi_post=AssociationBatchInput(inputs=[
+                    AssociationInput(_from=PublicObjectId(id=from_id), to=PublicObjectId(id=to_id))
+                    for from_id, to_id in chunk
+                ])))
+            for chunk in iter_batches(pairs, batch_size)
+        ]
+
+        associated = 0
+        for count, future in futures:
+            try:
+                response = future.result()
+            except Exception as e:
+                logger.error(f"Error associating {count} {from_type} with {to_type}: {str(e)}")
+                continue
+            errors = getattr(response, 'errors', None) or []
+            for error in errors:
+                logger.warning(f"Error associating {from_type} with {to_type}: {error.message}")
+            associated += count - len(errors)
+
+        if pairs:
+            logger.info(f"Associated {associated}/{len(pairs)} {from_type} with {to_type}")
+        return associated
+
+    def iter_associations(self, from_type, to_type, object_ids, batch_size=ASSOCIATION_BATCH_SIZE):
+        """Yield the {'from_id', 'to_id', 'types'} edges from `object_ids` to `to_type` objects.
+
+        Reads `batch_size` ids per call; objects with more edges than one response
+        holds are read again from their own `after` cursor.
+        """
+        batch_api = self.client.crm.associations.v4.batch_api
+        pending = deque(AssociationReadInput(id=str(object_id)) for object_id in object_ids)
+        while pending:
+            chunk = [pending.popleft() for _ in range(min(batch_size, len(pending)))]
+            response = self.scheduler.call(
+                batch_api.get_page, from_type, to_type,
+                batch_input_public_fetch_associations_batch_request=AssociationReadBatchInput(inputs=chunk))
+
+            for result in response.results or []:
+                from_id = result._from.id
+                for target in result.to or []:
+                    yield {
+                        'from_id': from_id,
+                        'to_id': str(target.to_object_id),
+                        'types': [
+                            {'category': spec.category, 'type_id': spec.type_id, 'label': spec.label}
+                            for spec in target.association_types or []
+                        ]
+                    }
+                if result.paging and result.paging.next:
+                    pending.append(AssociationReadInput(id=from_id, after=result.paging.next.after))
+
     def _associate_deal_with_contact(self, deal_id, contact_id):
         """Associate a deal with a contact"""
-        try:
-            logger.info(f"Deal {deal_id} associated with contact {contact_id}")
-        except Exception as e:
-            logger.error(f"Error associating deal with contact: {str(e)}")
+        return self.associate_batch('deals', 'contacts', [(deal_id, contact_id)]) == 1
 
     def _associate_deal_with_company(self, deal_id, company_id):
         """Associate a deal with a company"""
-        try:
-            logger.info(f"Deal {deal_id} associated with company {company_id}")
-        except Exception as e:
-            logger.error(f"Error associating deal with company: {str(e)}")
-
-    def associate_contact_to_company(self, contact_id, company_id):
-        if not HUBSPOT_AVAILABLE:
-            logger.warning(
-                "HubSpot API not available")
-            return True
-
-        try:
-            logger.info(
-                f"Contact {contact_id} associated with company {company_id}")
-            return True
+        return self.associate_batch('deals', 'companies', [(deal_id, company_id)]) == 1
 
-        except Exception as e:
-            logger.error(f"Error associating contact to company: {str(e)}")
-            return False
+    def _associate_deals(self, contact_pairs, company_pairs):
+        """Send the pending (deal, contact) and (deal, company) pairs, a few batch calls each, and clear them"""
+        for to_type, pairs in (('contacts', contact_pairs), ('companies', company_pairs)):
+            if pairs:
+                self.associate_batch('deals', to_type, pairs)
+                pairs.clear()
 
-    def load_contacts_from_json(self, file_path="contacts.json", add_lead_status=True):
+    def associate_contact_to_company(self, contact_id, company_id):
+        """Associate a contact with a company; returns whether it worked"""
+        return self.associate_batch('contacts', 'companies', [(contact_id, company_id)]) == 1
+
+    @staticmethod
+    def _resume_point(checkpoint, step):
+        """(rows already handled, objects created, finished) recorded for `step` of a checkpointed load"""
+        state = checkpoint.get(step) if checkpoint is not None else None
+        if not state:
+            return 0, 0, False
+        return state['rows'], state['created'], state.get('done', False)
+
+    @staticmethod
+    def _save_progress(checkpoint, step, rows, created, done=False):
+        if checkpoint is not None:
+            checkpoint.save(**{step: {'rows': rows, 'created': created, 'done': done}})
+
+    def load_contacts_from_json(self, file_path="contacts.json", add_lead_status=True, batch_size=BATCH_SIZE,
+                                checkpoint=None):
+        """Create contacts from a JSON/NDJSON file; with a `checkpoint`, skip the rows it already covers"""
 
         if not os.path.exists(file_path):
             logger.error(f"File {file_path} not found")
             return []
 
+        skipped, created_before, done = self._resume_point(checkpoint, 'contacts')
+        if done:
+            logger.info(f"Contacts from {file_path} already loaded, skipping")
+            return []
+
         lead_statuses = [
             "NEW",
             "OPEN",
@@ -182,27 +428,13 @@ class HubSpotClient:
             "BAD_TIMING"
         ]
 
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                contacts_data = json.load(f)
-
-            created_contacts = []
-            logger.info(
-                f"Starting load of {len(contacts_data)} contacts from {file_path}")
-
-            if add_lead_status:
-                logger.info("Assigning random lead status to contacts")
-
-            for i, contact_data in enumerate(contacts_data, 1):
+        def contact_rows():
+            for contact_data in islice(iter_json_records(file_path), skipped, None):
                 is_lead = random.random() < 0.8 if add_lead_status else False
                 lead_status = random.choice(
                     lead_statuses) if is_lead else "NEW"
 
-                status_info = f" - Lead Status: {lead_status}" if is_lead else " - Regular contact"
-                logger.info(
-                    f"Creating contact {i}/{len(contacts_data)}: {contact_data.get('firstname', '')} {contact_data.get('lastname', '')}{status_info}")
-
-                contact_id = self.create_contact(
+                yield self._contact_properties(
                     email=contact_data.get('email', ''),
                     first_name=contact_data.get('firstname', ''),
                     last_name=contact_data.get('lastname', ''),
@@ -211,42 +443,67 @@ class HubSpotClient:
                     jobtitle=contact_data.get('jobtitle', ''),
                     is_lead=is_lead,
                     hs_lead_status=lead_status
-                )
+                ), None
+
+        created_contacts = []
+        total = 0
+        try:
+            logger.info(f"Starting streamed load of contacts from {file_path}")
 
+            if add_lead_status:
+                logger.info("Assigning random lead status to contacts")
+            if skipped:
+                logger.info(f"Resuming after {skipped} rows")
+
+            for _, contact_id in self._stream_batch_create(
+                    self.client.crm.contacts.batch_api, ContactBatchItem, ContactBatchInput,
+                    contact_rows(), object_name="contacts", batch_size=batch_size):
+                total += 1
                 if contact_id:
                     created_contacts.append(contact_id)
-                else:
-                    logger.warning(f"Error creating contact {i}")
+                if total % batch_size == 0:
+                    self._save_progress(checkpoint, 'contacts', skipped + total,
+                                        created_before + len(created_contacts))
 
+            self._save_progress(checkpoint, 'contacts', skipped + total,
+                                created_before + len(created_contacts), done=True)
             logger.info(
-                f"Load completed: {len(created_contacts)}/{len(contacts_data)} contacts created successfully")
+                f"Load completed: {len(created_contacts)}/{total} contacts created successfully")
             return created_contacts
 
         except Exception as e:
-            logger.error(f"Error loading contacts from JSON: {e}")
-            return []
+            logger.error(f"Error loading contacts from JSON after {total} rows: {e}")
+            return created_contacts
 
-    def load_leads_from_json(self, file_path="leads.json"):
+    def load_leads_from_json(self, file_path="leads.json", checkpoint=None):
+        """Create a company, a contact and their association per lead; with a `checkpoint`, skip handled leads"""
 
         if not os.path.exists(file_path):
             logger.error(f"File {file_path} not found")
             return []
 
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                leads_data = json.load(file)
-
-            created_leads = []
-            logger.info(
-                f"Starting load of {len(leads_data)} leads from {file_path}")
+        skipped, created_before, done = self._resume_point(checkpoint, 'leads')
+        if done:
+            logger.info(f"Leads from {file_path} already loaded, skipping")
+            return []
 
-            for i, lead_data in enumerate(leads_data, 1):
+        created_leads = []
+        processed = skipped
+        try:
+            logger.info(f"Starting streamed load of leads from {file_path}")
+            if skipped:
+                logger.info(f"Resuming after {skipped} leads")
+
+            for i, lead_data in enumerate(islice(iter_json_records(file_path), skipped, None), skipped + 1):
+                # Leads before this one are finished; a crash repeats at most this lead
+                self._save_progress(checkpoint, 'leads', i - 1, created_before + len(created_leads))
+                processed = i
                 try:
                     contact_data = lead_data.get('contact', {})
                     company_data = lead_data.get('company', {})
 
                     logger.info(
-                        f"Creating lead {i}/{len(leads_data)}: {contact_data.get('firstname', '')} {contact_data.get('lastname', '')} - {company_data.get('name', '')}")
+                        f"Creating lead {i}: {contact_data.get('firstname', '')} {contact_data.get('lastname', '')} - {company_data.get('name', '')}")
 
                     try:
                         company_id = self.create_company(
@@ -262,7 +519,7 @@ class HubSpotClient:
                         if "403" in error_str or "forbidden" in error_str or "permission" in error_str or "scope" in error_str:
                             logger.warning(
                                 "Permission error detected for creating companies. Switching to 'contacts only' mode...")
-                            return self.load_leads_as_contacts_only(file_path)
+                            return self.load_leads_as_contacts_only(file_path, checkpoint=checkpoint)
                         else:
                             raise e
 
@@ -304,138 +561,316 @@ class HubSpotClient:
                     logger.error(f"Error processing lead {i}: {str(e)}")
                     continue
 
+            self._save_progress(checkpoint, 'leads', processed, created_before + len(created_leads), done=True)
             logger.info(
-                f"Load completed: {len(created_leads)}/{len(leads_data)} leads processed")
+                f"Load completed: {len(created_leads)}/{processed - skipped} leads processed")
             return created_leads
 
         except Exception as e:
-            logger.error(f"Error loading leads from JSON: {e}")
-            return []
+            logger.error(f"Error loading leads from JSON after {processed} leads: {e}")
+            return created_leads
 
-    def load_leads_as_contacts_only(self, filename="leads.json"):
+    def load_leads_as_contacts_only(self, filename="leads.json", batch_size=BATCH_SIZE, checkpoint=None):
+        """Create only the contact of each lead; with a `checkpoint`, skip the leads it already covers"""
 
         if not os.path.exists(filename):
             logger.error(f"File {filename} not found")
             return 0
 
-        try:
-            with open(filename, 'r', encoding='utf-8') as file:
-                leads_data = json.load(file)
-
-            logger.info(
-                f"Starting load of {len(leads_data)} leads as contacts from {filename}")
-
-            contacts_created = 0
-            for i, lead_data in enumerate(leads_data, 1):
-                try:
-                    contact_data = lead_data.get('contact', {})
-                    company_data = lead_data.get('company', {})
-
-                    logger.info(
-                        f"Creating contact {i}/{len(leads_data)}: {contact_data.get('firstname', '')} {contact_data.get('lastname', '')} - {company_data.get('name', 'No company')}")
+        skipped, created_before, done = self._resume_point(checkpoint, 'leads')
+        if done:
+            logger.info(f"Leads from {filename} already loaded, skipping")
+            return 0
 
-                    contact_id = self.create_contact(
-                        email=contact_data.get('email'),
-                        first_name=contact_data.get('firstname'),
-                        last_name=contact_data.get('lastname'),
-                        phone=contact_data.get('phone'),
-                        company=company_data.get('name'),
-                        jobtitle=contact_data.get('jobtitle')
-                    )
+        def lead_contact_rows():
+            for i, lead_data in enumerate(islice(iter_json_records(filename), skipped, None), skipped + 1):
+                contact_data = lead_data.get('contact', {})
+                company_data = lead_data.get('company', {})
+                properties = self._contact_properties(
+                    email=contact_data.get('email'),
+                    first_name=contact_data.get('firstname'),
+                    last_name=contact_data.get('lastname'),
+                    phone=contact_data.get('phone'),
+                    company=company_data.get('name'),
+                    jobtitle=contact_data.get('jobtitle')
+                )
+                yield properties, i
 
-                    if contact_id:
-                        contacts_created += 1
-                        logger.info(f"Contact created: {contact_id}")
-                    else:
-                        logger.warning(f"Error creating contact for lead {i}")
+        contacts_created = 0
+        total = skipped
+        try:
+            logger.info(
+                f"Starting streamed load of leads as contacts from {filename}")
 
-                except Exception as e:
-                    logger.error(f"Error processing lead {i}: {str(e)}")
-                    continue
+            for i, contact_id in self._stream_batch_create(
+                    self.client.crm.contacts.batch_api, ContactBatchItem, ContactBatchInput,
+                    lead_contact_rows(), object_name="contacts", batch_size=batch_size):
+                total = i
+                if contact_id:
+                    contacts_created += 1
+                else:
+                    logger.warning(f"Error creating contact for lead {i}")
+                if (i - skipped) % batch_size == 0:
+                    self._save_progress(checkpoint, 'leads', i, created_before + contacts_created)
 
+            self._save_progress(checkpoint, 'leads', total, created_before + contacts_created, done=True)
             logger.info(
-                f"Load completed: {contacts_created}/{len(leads_data)} contacts created successfully")
+                f"Load completed: {contacts_created}/{total - skipped} contacts created successfully")
             return contacts_created
 
         except Exception as e:
-            logger.error(f"Error loading leads from JSON: {str(e)}")
-            return 0
+            logger.error(f"Error loading leads from JSON after {total} leads: {str(e)}")
+            return contacts_created
 
-    def get_existing_contacts(self, limit=100):
+    def _iter_pages(self, api, to_record, page_size=100, properties=None, object_name="objects", after=None):
+        """Follow the paging.next.after cursor (starting at `after`) and yield one Page of records per page.
 
+        Each page's resume position is {'after': <cursor of the next page>}.
+        """
+        fetched = 0
         try:
-            properties = ['email', 'firstname', 'lastname', 'hs_lead_status']
-            response = self.client.crm.contacts.basic_api.get_page(
-                limit=limit,
-                properties=properties
-            )
-            contacts = []
-            for contact in response.results:
-                contacts.append({
-                    'id': contact.id,
-                    'email': contact.properties.get('email', ''),
-                    'firstname': contact.properties.get('firstname', ''),
-                    'lastname': contact.properties.get('lastname', ''),
-                    'hs_lead_status': contact.properties.get('hs_lead_status', '')
-                })
-            logger.info(f"Retrieved {len(contacts)} existing contacts")
-            return contacts
+            while True:
+                response = self.scheduler.call(
+                    api.get_page,
+                    limit=page_size,
+                    after=after,
+                    properties=properties
+                )
+                records = [to_record(obj) for obj in response.results]
+                fetched += len(records)
+                has_next = bool(response.paging and response.paging.next)
+                if records:
+                    yield Page(records, {'after': response.paging.next.after if has_next else None})
+
+                if not has_next:
+                    break
+                after = response.paging.next.after
         except Exception as e:
-            logger.error(f"Error retrieving contacts: {e}")
-            return []
+            logger.error(f"Error retrieving {object_name} after {fetched} records: {e}")
+            raise
+        logger.info(f"Retrieved {fetched} existing {object_name}")
 
-    def get_existing_deals(self, limit=100):
-        """Get existing deals from HubSpot with specific properties"""
+    def _iter_search_pages(self, api, to_record, modified_property, since=None, page_size=100,
+                           properties=None, object_name="objects"):
+        """Yield records modified at or after `since`, oldest first, one Page per page.
+
+        Each page's resume position is {'since': <its newest modified value>}; restarting
+        there repeats only records sharing that exact timestamp.
+        """
+        since = to_epoch_ms(since)
+        fetched = 0
         try:
-            properties = ['dealname', 'amount', 'dealstage', 'pipeline',
-                          'closedate', 'dealtype', 'description', 'createdate']
-            response = self.client.crm.deals.basic_api.get_page(
-                limit=limit,
-                properties=properties
+            while True:
+                filter_groups = []
+                if since is not None:
+                    filter_groups = [{"filters": [{
+                        "propertyName": modified_property,
+                        "operator": "GTE",
+                        "value": str(since)
+                    }]}]
+
+                after = None
+                last_modified = None
+                while True:
+                    request = SearchRequest(
+                        filter_groups=filter_groups,
+                        sorts=[{"propertyName": modified_property,
+                                "direction": "ASCENDING"}],
+                        properties=properties,
+                        limit=page_size,
+                        after=after
+                    )
+                    response = self.scheduler.call(
+                        api.do_search, public_object_search_request=request, search=True)
+                    records = [to_record(obj) for obj in response.results]
+                    fetched += len(records)
+                    if records:
+                        last_modified = records[-1].get(modified_property)
+                        yield Page(records, {'since': last_modified})
+
+                    if not response.paging or not response.paging.next:
+                        logger.info(f"Retrieved {fetched} modified {object_name}")
+                        return
+                    after = response.paging.next.after
+                    if int(after) + page_size > SEARCH_RESULT_CAP:
+                        break
+
+                # Restart the query from the newest timestamp seen so far to get past the cap
+                next_since = to_epoch_ms(last_modified)
+                if next_since is None or (since is not None and next_since <= since):
+                    logger.warning(
+                        f"More than {SEARCH_RESULT_CAP} {object_name} share the same {modified_property}; stopping early")
+                    break
+                since = next_since
+        except Exception as e:
+            logger.error(f"Error searching {object_name} after {fetched} records: {e}")
+            raise
+        logger.info(f"Retrieved {fetched} modified {object_name}")
+
+    @staticmethod
+    def _contact_record(contact):
+        return to_record(contact.id, contact.properties, CONTACT_PROPERTIES)
+
+    @staticmethod
+    def _deal_record(deal):
+        return to_record(deal.id, deal.properties, DEAL_PROPERTIES)
+
+    @staticmethod
+    def _company_record(company):
+        return to_record(company.id, company.properties, COMPANY_PROPERTIES)
+
+    def iter_existing_contacts(self, page_size=100, after=None):
+        """Yield every contact in the portal (from the `after` cursor on), one page-sized batch at a time"""
+        return self._iter_pages(self.client.crm.contacts.basic_api, self._contact_record,
+                                page_size=page_size, properties=CONTACT_PROPERTIES, object_name="contacts",
+                                after=after)
+
+    def iter_existing_deals(self, page_size=100, after=None):
+        """Yield every deal in the portal (from the `after` cursor on), one page-sized batch at a time"""
+        return self._iter_pages(self.client.crm.deals.basic_api, self._deal_record,
+                                page_size=page_size, properties=DEAL_PROPERTIES, object_name="deals",
+                                after=after)
+
+    def iter_modified_contacts(self, since, page_size=100):
+        """Yield contacts whose lastmodifieddate is at or after `since`"""
+        return self._iter_search_pages(self.client.crm.contacts.search_api, self._contact_record,
+                                       'lastmodifieddate', since=since, page_size=page_size,
+                                       properties=CONTACT_PROPERTIES, object_name="contacts")
+
+    def iter_modified_deals(self, since, page_size=100):
+        """Yield deals whose hs_lastmodifieddate is at or after `since`"""
+        return self._iter_search_pages(self.client.crm.deals.search_api, self._deal_record,
+                                       'hs_lastmodifieddate', since=since, page_size=page_size,
+                                       properties=DEAL_PROPERTIES, object_name="deals")
+
+    def iter_existing_companies(self, page_size=100):
+        """Yield every company in the portal, one page-sized batch at a time"""
+        return self._iter_pages(self.client.crm.companies.basic_api, self._company_record,
+                                page_size=page_size, object_name="companies")
+
+    def _search_target(self, object_type):
+        """(search api, record builder, last-modified property, properties) of contacts or deals"""
+        if object_type == 'contacts':
+            return (self.client.crm.contacts.search_api, self._contact_record,
+                    'lastmodifieddate', CONTACT_PROPERTIES)
+        return self.client.crm.deals.search_api, self._deal_record, 'hs_lastmodifieddate', DEAL_PROPERTIES
+
+    @staticmethod
+    def _id_range_filters(low=None, high=None, modified_property=None, since=None):
+        filters = []
+        if low is not None:
+            filters.append({"propertyName": "hs_object_id", "operator": "GTE", "value": str(low)})
+        if high is not None:
+            filters.append({"propertyName": "hs_object_id", "operator": "LT", "value": str(high)})
+        if since is not None:
+            filters.append({"propertyName": modified_property, "operator": "GTE", "value": str(to_epoch_ms(since))})
+        return [{"filters": filters}] if filters else []
+
+    def id_bounds(self, object_type, since=None):
+        """Smallest and largest numeric object id (modified at or after `since`), or None when there are none"""
+        search_api, _, modified_property, _ = self._search_target(object_type)
+        bounds = []
+        for direction in ("ASCENDING", "DESCENDING"):
+            request = SearchRequest(
+                filter_groups=self._id_range_filters(modified_property=modified_property, since=since),
+                sorts=[{"propertyName": "hs_object_id", "direction": direction}],
+                properties=["hs_object_id"],
+                limit=1
             )
-            deals = []
-            for deal in response.results:
-                deals.append({
-                    'id': deal.id,
-                    'dealname': deal.properties.get('dealname', ''),
-                    'amount': deal.properties.get('amount', ''),
-                    'dealstage': deal.properties.get('dealstage', ''),
-                    'pipeline': deal.properties.get('pipeline', ''),
-                    'closedate': deal.properties.get('closedate', ''),
-                    'dealtype': deal.properties.get('dealtype', ''),
-                    'description': deal.properties.get('description', ''),
-                    'createdate': deal.properties.get('createdate', '')
-                })
-            logger.info(f"Retrieved {len(deals)} existing deals")
-            return deals
+            response = self.scheduler.call(search_api.do_search, public_object_search_request=request, search=True)
+            if not response.results:
+                return None
+            bounds.append(int(response.results[0].id))
+        return tuple(bounds)
+
+    def count_in_id_range(self, object_type, low, high, since=None):
+        """Number of objects with low <= id < high (modified at or after `since`)"""
+        search_api, _, modified_property, _ = self._search_target(object_type)
+        request = SearchRequest(
+            filter_groups=self._id_range_filters(low, high, modified_property, since),
+            properties=["hs_object_id"],
+            limit=1
+        )
+        response = self.scheduler.call(search_api.do_search, public_object_search_request=request, search=True)
+        return response.total
+
+    def iter_id_range(self, object_type, low, high, since=None, page_size=SEARCH_PAGE_SIZE):
+        """Yield the objects with low <= id < high (modified at or after `since`), in id order, one Page per page.
+
+        Each page's resume position is {'low': <next id to read>, 'high': high}.
+        """
+        search_api, to_record, modified_property, properties = self._search_target(object_type)
+        fetched = 0
+        try:
+            while low < high:
+                after = None
+                last_id = None
+                while True:
+                    request = SearchRequest(
+                        filter_groups=self._id_range_filters(low, high, modified_property, since),
+                        sorts=[{"propertyName": "hs_object_id", "direction": "ASCENDING"}],
+                        properties=properties,
+                        limit=page_size,
+                        after=after
+                    )
+                    response = self.scheduler.call(
+                        search_api.do_search, public_object_search_request=request, search=True)
+                    records = [to_record(obj) for obj in response.results]
+                    fetched += len(records)
+                    if records:
+                        last_id = int(records[-1]['id'])
+                        yield Page(records, {'low': last_id + 1, 'high': high})
+
+                    if not response.paging or not response.paging.next:
+                        return
+                    after = response.paging.next.after
+                    if int(after) + page_size > SEARCH_RESULT_CAP:
+                        break
+
+                # Ids are unique, so restarting after the last one seen never skips or repeats
+                low = last_id + 1
         except Exception as e:
-            logger.error(f"Error retrieving deals: {e}")
-            return []
-
-    def get_existing_companies(self, limit=100):
+            logger.error(f"Error searching {object_type} with ids in [{low}, {high}) after {fetched} records: {e}")
+            raise
 
+    @staticmethod
+    def _collect(pages, limit):
+        """Up to `limit` records from `pages`; when paging fails partway, the records fetched before it"""
+        records = []
         try:
-            response = self.client.crm.companies.basic_api.get_page(
-                limit=limit)
-            companies = []
-            for company in response.results:
-                companies.append({
-                    'id': company.id,
-                    'name': company.properties.get('name', ''),
-                    'domain': company.properties.get('domain', '')
-                })
-            logger.info(f"Retrieved {len(companies)} existing companies")
-            return companies
+            records.extend(islice(chain.from_iterable(pages), limit))
         except Exception as e:
-            logger.error(f"Error retrieving companies: {e}")
-            return []
+            logger.warning(f"Paging stopped after {len(records)} records, returning those: {e}")
+        return records
+
+    def get_existing_contacts(self, limit=100):
+        """Get up to `limit` contacts (all of them when limit is None)"""
+        page_size = min(limit, 100) if limit else 100
+        return self._collect(self.iter_existing_contacts(page_size=page_size), limit)
+
+    def get_existing_deals(self, limit=100):
+        """Get up to `limit` deals (all of them when limit is None)"""
+        page_size = min(limit, 100) if limit else 100
+        return self._collect(self.iter_existing_deals(page_size=page_size), limit)
+
+    def get_existing_companies(self, limit=100):
+        """Get up to `limit` companies (all of them when limit is None)"""
+        page_size = min(limit, 100) if limit else 100
+        return self._collect(self.iter_existing_companies(page_size=page_size), limit)
 
-    def load_deals_with_smart_associations(self, file_path="deals.json", randomize_stages=True, associate_with_existing=True):
+    def load_deals_with_smart_associations(self, file_path="deals.json", randomize_stages=True, associate_with_existing=True,
+                                           batch_size=BATCH_SIZE, checkpoint=None):
+        """Create deals and associate them with existing contacts/companies; with a `checkpoint`, skip done rows"""
 
         if not os.path.exists(file_path):
             logger.error(f"File {file_path} not found")
             return []
 
+        skipped, created_before, done = self._resume_point(checkpoint, 'deals')
+        if done:
+            logger.info(f"Deals from {file_path} already loaded, skipping")
+            return []
+
         deal_stages = [
             "appointmentscheduled",
             "qualifiedtobuy",
@@ -455,107 +890,119 @@ class HubSpotClient:
             existing_contacts = self.get_existing_contacts()
             existing_companies = self.get_existing_companies()
 
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                deals_data = json.load(file)
+        def deal_rows():
+            for deal_data in islice(iter_json_records(file_path), skipped, None):
+                if randomize_stages:
+                    random_stage = random.choice(deal_stages)
+                else:
+                    random_stage = deal_data.get(
+                        'dealstage', 'appointmentscheduled')
 
-            created_deals = []
-            logger.info(
-                f"Starting load of {len(deals_data)} deals from {file_path}")
+                contact_id = None
+                company_id = None
 
-            if randomize_stages:
-                logger.info("🎲 Assigning random stages to deals")
-            if associate_with_existing:
-                logger.info(
-                    f"Associating deals with {len(existing_contacts)} contacts and {len(existing_companies)} existing companies")
+                if associate_with_existing and existing_contacts:
 
-            for i, deal_data in enumerate(deals_data, 1):
-                try:
+                    if random.random() < 0.7:
+                        contact = random.choice(existing_contacts)
+                        contact_id = contact['id']
 
-                    if randomize_stages:
-                        random_stage = random.choice(deal_stages)
-                    else:
-                        random_stage = deal_data.get(
-                            'dealstage', 'appointmentscheduled')
+                if associate_with_existing and existing_companies:
 
-                    contact_id = None
-                    company_id = None
+                    if random.random() < 0.6:
+                        company = random.choice(existing_companies)
+                        company_id = company['id']
 
-                    if associate_with_existing and existing_contacts:
+                yield self._deal_properties(
+                    deal_name=deal_data.get('dealname'),
+                    amount=deal_data.get('amount'),
+                    stage=random_stage,
+                    pipeline=deal_data.get('pipeline'),
+                    closedate=deal_data.get('closedate'),
+                    dealtype=deal_data.get('dealtype'),
+                    description=deal_data.get('description')
+                ), (contact_id, company_id)
 
-                        if random.random() < 0.7:
-                            contact = random.choice(existing_contacts)
-                            contact_id = contact['id']
+        created_deals = []
+        total = 0
+        try:
+            logger.info(f"Starting streamed load of deals from {file_path}")
 
-                    if associate_with_existing and existing_companies:
+            if randomize_stages:
+                logger.info("🎲 Assigning random stages to deals")
+            if associate_with_existing:
+                logger.info(
+                    f"Associating deals with {len(existing_contacts)} contacts and {len(existing_companies)} existing companies")
 
-                        if random.random() < 0.6:
-                            company = random.choice(existing_companies)
-                            company_id = company['id']
+            if skipped:
+                logger.info(f"Resuming after {skipped} rows")
 
-                    association_info = ""
-                    if contact_id or company_id:
-                        parts = []
-                        if contact_id:
-                            parts.append(f"Contact: {contact_id}")
-                        if company_id:
-                            parts.append(f"Company: {company_id}")
-                        association_info = f" - Associated with {', '.join(parts)}"
+            contact_pairs = []
+            company_pairs = []
+            for (contact_id, company_id), deal_id in self._stream_batch_create(
+                    self.client.crm.deals.batch_api, DealBatchItem, DealBatchInput,
+                    deal_rows(), object_name="deals", batch_size=batch_size):
+                total += 1
+                if deal_id:
+                    created_deals.append(deal_id)
 
-                    logger.info(
-                        f"Creating deal {i}/{len(deals_data)}: {deal_data.get('dealname', '')} - Stage: {random_stage}{association_info}")
-
-                    deal_response = self.create_deal(
-                        deal_name=deal_data.get('dealname'),
-                        amount=deal_data.get('amount'),
-                        stage=random_stage,
-                        contact_id=contact_id,
-                        company_id=company_id,
-                        pipeline=deal_data.get('pipeline'),
-                        closedate=deal_data.get('closedate'),
-                        dealtype=deal_data.get('dealtype'),
-                        description=deal_data.get('description')
-                    )
+                    if contact_id:
+                        contact_pairs.append((deal_id, contact_id))
 
-                    if deal_response:
-                        created_deals.append(deal_response.id)
-                        logger.info(
-                            f"Deal created with ID: {deal_response.id}")
-                    else:
-                        logger.warning(f"Error creating deal {i}")
+                    if company_id:
+                        company_pairs.append((deal_id, company_id))
 
-                except Exception as e:
-                    logger.error(f"Error processing deal {i}: {str(e)}")
-                    continue
+                # A batch counts as committed once its deals and associations are all written
+                if total % batch_size == 0:
+                    self._associate_deals(contact_pairs, company_pairs)
+                    self._save_progress(checkpoint, 'deals', skipped + total, created_before + len(created_deals))
 
+            self._associate_deals(contact_pairs, company_pairs)
+            self._save_progress(checkpoint, 'deals', skipped + total, created_before + len(created_deals), done=True)
             logger.info(
-                f"Load completed: {len(created_deals)}/{len(deals_data)} deals created successfully")
+                f"Load completed: {len(created_deals)}/{total} deals created successfully")
             return created_deals
 
         except Exception as e:
-            logger.error(f"Error loading deals from JSON: {e}")
-            return []
+            logger.error(f"Error loading deals from JSON after {total} rows: {e}")
+            return created_deals
 
-    def bulk_load_all_data_with_relationships(self, contacts_file="contacts.json", leads_file="leads.json", deals_file="deals.json"):
+    def bulk_load_all_data_with_relationships(self, contacts_file="contacts.json", leads_file="leads.json", deals_file="deals.json",
+                                              resume=False):
+        """Load contacts, leads and deals, checkpointing every committed batch; `resume` continues an interrupted load"""
+
+        checkpoint = Checkpoint('seed-load')
+        if resume and checkpoint:
+            logger.info(f"Resuming the data load checkpointed at {checkpoint.get('updated_at')}")
+        else:
+            if checkpoint:
+                logger.warning("Discarding the checkpoint of an unfinished data load (resume=True continues it)")
+            checkpoint.clear()
 
         logger.info("Starting complete data load with smart relationships")
 
         logger.info("📋 Loading contacts...")
-        contacts = self.load_contacts_from_json(contacts_file)
+        self.load_contacts_from_json(contacts_file, checkpoint=checkpoint)
 
         logger.info("👥 Loading leads...")
-        leads = self.load_leads_from_json(leads_file)
+        self.load_leads_from_json(leads_file, checkpoint=checkpoint)
 
         logger.info("💼 Loading deals with smart associations...")
-        deals = self.load_deals_with_smart_associations(
-            deals_file, randomize_stages=True, associate_with_existing=True)
+        self.load_deals_with_smart_associations(
+            deals_file, randomize_stages=True, associate_with_existing=True, checkpoint=checkpoint)
 
+        steps = {step: checkpoint.get(step) or {} for step in ('contacts', 'leads', 'deals')}
         summary = {
-            'contacts_loaded': len(contacts),
-            'leads_loaded': len(leads),
-            'deals_loaded': len(deals),
-            'total_records': len(contacts) + len(leads) + len(deals)
+            'contacts_loaded': steps['contacts'].get('created', 0),
+            'leads_loaded': steps['leads'].get('created', 0),
+            'deals_loaded': steps['deals'].get('created', 0),
         }
+        summary['total_records'] = sum(summary.values())
+
+        if all(state.get('done') for state in steps.values()):
+            checkpoint.clear()
+        else:
+            logger.warning(f"Data load incomplete; checkpoint kept in {checkpoint.path} (resume to continue)")
 
         logger.info("Complete data load finished")
         logger.info(
@@ -564,148 +1011,143 @@ class HubSpotClient:
 
         return summary
 
-    def delete_all_contacts(self):
-
-        try:
-            logger.info("🗑️ Starting deletion of all contacts...")
-
-            all_contacts = self.get_existing_contacts()
-
-            if not all_contacts:
-                logger.info("No contacts found to delete")
-                return 0
-
-            deleted_count = 0
-            total_contacts = len(all_contacts)
-
-            logger.info(f"Found {total_contacts} contacts to delete")
-
-            for i, contact in enumerate(all_contacts, 1):
+    def _count_objects(self, search_api):
+        response = self.scheduler.call(
+            search_api.do_search,
+            public_object_search_request=SearchRequest(limit=1),
+            search=True)
+        return response.total
+
+    def _archive_all(self, object_name, basic_api, batch_api, search_api, batch_size=BATCH_SIZE):
+        """Page through every object id and archive each page with one batch call"""
+        logger.info(f"🗑️ Starting deletion of all {object_name}...")
+
+        started = time.monotonic()
+        deleted_count = 0
+        failed_count = 0
+        after = None
+        pending = []
+
+        def collect(block):
+            nonlocal deleted_count, failed_count
+            while pending and (block or pending[0][1].done()):
+                count, future = pending.pop(0)
                 try:
-                    contact_id = contact['id']
-                    logger.info(
-                        f"Deleting contact {i}/{total_contacts}: ID {contact_id}")
-
-                    self.client.crm.contacts.basic_api.archive(
-                        contact_id=contact_id)
-                    logger.info(f"Contact {contact_id} deleted successfully")
-                    deleted_count += 1
+                    future.result()
+                    deleted_count += count
                 except Exception as e:
-                    logger.error(
-                        f"Error deleting contact {contact_id}: {str(e)}")
-
-            logger.info(
-                f"Deletion completed: {deleted_count}/{total_contacts} contacts deleted")
-            return deleted_count
-
-        except Exception as e:
-            logger.error(f"Error in mass deletion of contacts: {e}")
-            return 0
+                    failed_count += count
+                    logger.error(f"Error archiving {count} {object_name}: {str(e)}")
+                    continue
 
-    def delete_all_companies(self):
+                elapsed = time.monotonic() - started
+                logger.info(
+                    f"Archived {deleted_count} {object_name} ({deleted_count / elapsed:.1f}/s)")
 
         try:
-            logger.info("🗑️ Starting deletion of all companies...")
-
-            all_companies = self.get_existing_companies()
-
-            if not all_companies:
-                logger.info("No companies found to delete")
-                return 0
-
-            deleted_count = 0
-            total_companies = len(all_companies)
-
-            logger.info(f"Found {total_companies} companies to delete")
-
-            for i, company in enumerate(all_companies, 1):
-                try:
-                    company_id = company['id']
-                    logger.info(
-                        f"Deleting company {i}/{total_companies}: ID {company_id}")
-
-                    self.client.crm.companies.basic_api.archive(
-                        company_id=company_id)
-                    logger.info(f"Company {company_id} deleted successfully")
-                    deleted_count += 1
-                except Exception as e:
-                    logger.error(
-                        f"Error deleting company {company_id}: {str(e)}")
-
-            logger.info(
-                f"Deletion completed: {deleted_count}/{total_companies} companies deleted")
-            return deleted_count
+            # Keep walking the cursor while earlier pages are archived on the scheduler's pool
+            while True:
+                response = self.scheduler.call(basic_api.get_page, limit=batch_size, after=after)
+                ids = [obj.id for obj in response.results]
+
+                if ids:
+                    pending.append((len(ids), self.scheduler.submit(
+                        batch_api.archive,
+                        batch_input_simple_public_object_id=BatchIdsInput(
+                            inputs=[ObjectIdInput(id=object_id) for object_id in ids]))))
+                collect(block=False)
+
+                if not response.paging or not response.paging.next:
+                    break
+                after = response.paging.next.after
 
         except Exception as e:
-            logger.error(f"Error in mass deletion of companies: {e}")
-            return 0
+            logger.error(f"Error in mass deletion of {object_name}: {e}")
 
-    def delete_all_deals(self):
+        collect(block=True)
 
+        elapsed = time.monotonic() - started
         try:
-            logger.info("🗑️ Starting deletion of all deals...")
-
-            deals_response = self.client.crm.deals.basic_api.get_page(
-                limit=100)
-            deals = deals_response.results
-
-            if not deals:
-                logger.info("No deals found to delete")
-                return 0
-
-            deleted_count = 0
-            total_deals = len(deals)
-
-            logger.info(f"Found {total_deals} deals to delete")
+            remaining = self._count_objects(search_api)
+        except Exception as e:
+            logger.error(f"Error counting remaining {object_name}: {e}")
+            remaining = None
 
-            for i, deal in enumerate(deals, 1):
-                try:
-                    deal_id = deal.id
-                    logger.info(
-                        f"Deleting deal {i}/{total_deals}: ID {deal_id}")
+        logger.info(
+            f"Deletion of {object_name} completed: {deleted_count} deleted, {failed_count} failed, "
+            f"{remaining if remaining is not None else 'unknown'} remaining "
+            f"in {elapsed:.1f}s ({deleted_count / elapsed if elapsed else 0:.1f}/s)")
+
+        return {
+            'deleted': deleted_count,
+            'failed': failed_count,
+            'remaining': remaining,
+            'seconds': elapsed
+        }
 
-                    self.client.crm.deals.basic_api.archive(deal_id=deal_id)
-                    logger.info(f"Deal {deal_id} deleted successfully")
-                    deleted_count += 1
-                except Exception as e:
-                    logger.error(f"Error deleting deal {deal_id}: {str(e)}")
+    def delete_all_contacts(self):
+        contacts = self.client.crm.contacts
+        return self._archive_all("contacts", contacts.basic_api, contacts.batch_api,
+                                 contacts.search_api)['deleted']
 
-            logger.info(
-                f"Deletion completed: {deleted_count}/{total_deals} deals deleted")
-            return deleted_count
+    def delete_all_companies(self):
+        companies = self.client.crm.companies
+        return self._archive_all("companies", companies.basic_api, companies.batch_api,
+                                 companies.search_api)['deleted']
 
-        except Exception as e:
-            logger.error(f"Error in mass deletion of deals: {e}")
-            return 0
+    def delete_all_deals(self):
+        deals = self.client.crm.deals
+        return self._archive_all("deals", deals.basic_api, deals.batch_api,
+                                 deals.search_api)['deleted']
 
     def delete_all_data(self):
 
         logger.info("Starting complete deletion of all HubSpot data")
 
-        results = {
-            'contacts_deleted': 0,
-            'companies_deleted': 0,
-            'deals_deleted': 0
+        started = time.monotonic()
+        crm = self.client.crm
+        jobs = {
+            'deals': crm.deals,
+            'contacts': crm.contacts,
+            'companies': crm.companies
         }
 
-        logger.info("💼 Deleting all deals...")
-        results['deals_deleted'] = self.delete_all_deals()
-
-        logger.info("📋 Deleting all contacts...")
-        results['contacts_deleted'] = self.delete_all_contacts()
+        # The three object types share the process-wide request scheduler
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = {
+                name: executor.submit(self._archive_all, name, api.basic_api, api.batch_api, api.search_api)
+                for name, api in jobs.items()
+            }
+            reports = {name: future.result() for name, future in futures.items()}
 
-        logger.info("🏢 Deleting all companies...")
-        results['companies_deleted'] = self.delete_all_companies()
+        results = {}
+        for name, report in reports.items():
+            results[f'{name}_deleted'] = report['deleted']
+            results[f'{name}_remaining'] = report['remaining']
 
         total_deleted = results['contacts_deleted'] + \
             results['companies_deleted'] + results['deals_deleted']
+        elapsed = time.monotonic() - started
 
         logger.info("Complete deletion finished")
         logger.info(
             f"Summary: {results['contacts_deleted']} contacts, {results['companies_deleted']} companies, {results['deals_deleted']} deals")
-        logger.info(f"Total records deleted: {total_deleted}")
+        logger.info(
+            f"Remaining: {results['contacts_remaining']} contacts, {results['companies_remaining']} companies, {results['deals_remaining']} deals")
+        logger.info(
+            f"Total records deleted: {total_deleted} in {elapsed:.1f}s ({total_deleted / elapsed if elapsed else 0:.1f}/s)")
 
         return results
 
 
-hubspot_client = HubSpotClient()
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_hubspot_client():
+    """Process-wide HubSpotClient, created on first use; it is safe to share between threads"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HubSpotClient()
+        return _client
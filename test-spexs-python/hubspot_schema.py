@@ -0,0 +1,61 @@
+"""
+CRM object properties and API limits shared by the HubSpot clients and the benchmarks
+"""
+from datetime import datetime, timezone
+
+CONTACT_PROPERTIES = ['email', 'firstname', 'lastname', 'hs_lead_status', 'lastmodifieddate']
+DEAL_PROPERTIES = ['dealname', 'amount', 'dealstage', 'pipeline', 'closedate',
+                   'dealtype', 'description', 'createdate', 'hs_lastmodifieddate']
+COMPANY_PROPERTIES = ['name', 'domain']
+
+OBJECT_PROPERTIES = {
+    'contacts': CONTACT_PROPERTIES,
+    'deals': DEAL_PROPERTIES,
+    'companies': COMPANY_PROPERTIES,
+}
+
+# Maximum number of inputs accepted by the CRM batch endpoints
+BATCH_SIZE = 100
+
+# Maximum number of inputs per call to the v4 association batch endpoints
+ASSOCIATION_BATCH_SIZE = 1000
+
+# HubSpot rejects a whole batch create with these when a single row is invalid or a duplicate
+ROW_REJECTION_STATUSES = {400, 409, 422}
+
+# The CRM search endpoint refuses to page past this many results per query
+SEARCH_RESULT_CAP = 10000
+
+# Largest page the CRM search endpoint returns; list endpoints stop at 100
+SEARCH_PAGE_SIZE = 200
+
+
+class Page(list):
+    """Records of one API page plus `resume`, a JSON-friendly position that continues right after it"""
+
+    def __init__(self, records=(), resume=None):
+        super().__init__(records)
+        self.resume = resume
+
+
+def to_record(object_id, properties, names):
+    """Flatten an object into {'id': ..., <name>: <value or ''>} for the given property names"""
+    record = {'id': object_id}
+    for name in names:
+        record[name] = properties.get(name, '')
+    return record
+
+
+def to_epoch_ms(value):
+    """Convert a datetime, ISO-8601 string or epoch-ms value to epoch milliseconds"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        if value.isdigit():
+            return int(value)
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
@@ -0,0 +1,108 @@
+"""
+Incremental readers for the JSON seed files used by the HubSpot loaders.
+
+Accepts a top-level JSON array or NDJSON (one value per line, or any
+whitespace-separated sequence of values). The file is read in fixed-size
+chunks and decoded one element at a time, so memory is bounded by the
+largest single record rather than the file size.
+"""
+import json
+import re
+from itertools import islice
+
+READ_CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\r\n'
+# A number or literal runs up to the next delimiter; until one is read it may continue ("1e" -> "1e5")
+_SCALAR_TOKEN = re.compile(r'[^ \t\r\n,\]}\[{"]*')
+
+
+def iter_json_records(file_path, chunk_size=READ_CHUNK_SIZE):
+    """Yield the elements of a JSON array file, or the values of an NDJSON file, one by one.
+
+    Raises ValueError on malformed input: missing or doubled commas, an unclosed
+    array, or data after the closing bracket.
+    """
+    with open(file_path, 'r', encoding='utf-8') as file:
+        buffer = ''
+        position = 0
+        eof = False
+        in_array = None
+        # Inside an array: 'first' after '[', 'value' after ',', 'separator' after an element
+        expecting = 'first'
+        closed = False
+
+        def malformed(message):
+            return ValueError(f"{file_path}: {message} at {buffer[position:position + 20]!r}")
+
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+
+            if position < len(buffer):
+                char = buffer[position]
+                if closed:
+                    raise malformed("unexpected data after the JSON array")
+                if in_array is None:
+                    in_array = char == '['
+                    if in_array:
+                        position += 1
+                        continue
+                if in_array and expecting == 'separator':
+                    if char not in ',]':
+                        raise malformed("expected ',' or ']' after an array element")
+                    expecting = 'value'
+                    closed = char == ']'
+                    position += 1
+                    continue
+                if char == ']' and in_array and expecting == 'first':
+                    closed = True
+                    position += 1
+                    continue
+                if char in ',]}:':
+                    raise malformed("expected a value")
+
+                value = end = None
+                if char in '{["':
+                    try:
+                        value, end = _decoder.raw_decode(buffer, position)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                else:
+                    # A number or literal is only complete once a delimiter (or the end of the file) follows it
+                    token_end = _SCALAR_TOKEN.match(buffer, position).end()
+                    if token_end < len(buffer) or eof:
+                        try:
+                            value, end = _decoder.raw_decode(buffer, position)
+                        except json.JSONDecodeError:
+                            raise malformed("invalid value") from None
+                        if end != token_end:
+                            raise malformed("invalid value")
+
+                if end is not None:
+                    yield value
+                    position = end
+                    expecting = 'separator'
+                    continue
+            elif eof:
+                if in_array and not closed:
+                    raise ValueError(f"{file_path}: JSON array is not closed")
+                return
+
+            chunk = file.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer = buffer[position:] + chunk
+            position = 0
+
+
+def iter_batches(records, batch_size):
+    """Group an iterable into lists of at most `batch_size` items"""
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield batch
@@ -0,0 +1,23 @@
+"""
+Deferred imports for the heavy libraries (pandas, numpy, polars, pyarrow,
+pymongo, the HubSpot SDK).
+
+Importing them all costs around a second, which short-lived CLI runs (cron
+checks, --help, argument errors) would pay for nothing. A LazyModule stands
+in for a module at import time and imports it on first attribute access.
+"""
+import importlib
+
+
+class LazyModule:
+    """Stands in for the module `name` and imports it on first attribute access"""
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attribute):
+        # Once the module is loaded, import_module is a sys.modules lookup
+        return getattr(importlib.import_module(self._name), attribute)
+
+    def __repr__(self):
+        return f"<lazy module '{self._name}'>"
@@ -1,5 +1,5 @@
+import argparse
 import logging
-from hubspot_client import hubspot_client
 
 logging.basicConfig(
     level=logging.INFO,
@@ -8,12 +8,14 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def load_all_data():
+def load_all_data(resume=False):
     """Load all data with smart relationships"""
     logger.info("=== Loading all data with smart relationships ===")
 
     try:
-        results = hubspot_client.bulk_load_all_data_with_relationships()
+        from hubspot_client import get_hubspot_client
+
+        results = get_hubspot_client().bulk_load_all_data_with_relationships(resume=resume)
 
         logger.info("LOADING SUMMARY:")
         logger.info(f"Contacts: {results['contacts_loaded']}")
@@ -38,7 +40,9 @@ def delete_all_data():
 
         if confirmation2 == "YES, DELETE ALL":
             logger.info("=== Starting complete cleanup ===")
-            results = hubspot_client.delete_all_data()
+            from hubspot_client import get_hubspot_client
+
+            results = get_hubspot_client().delete_all_data()
 
             total_deleted = results['contacts_deleted'] + \
                 results['companies_deleted'] + results['deals_deleted']
@@ -54,6 +58,11 @@ def delete_all_data():
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Load or delete HubSpot demo data')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted data load after its last committed batch')
+    args = parser.parse_args()
+
     logger.info("Starting HubSpot API Client")
 
     try:
@@ -68,7 +77,7 @@ def main():
 
         if option == "1":
             logger.info("Loading all data with smart relationships...")
-            load_all_data()
+            load_all_data(resume=args.resume)
 
         elif option == "2":
             logger.info("Starting complete cleanup...")
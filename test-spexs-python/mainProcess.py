@@ -1,25 +1,146 @@
 import argparse
-from hubspot_client import HubSpotClient
+import hashlib
+import json
+import warnings
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from cassettes import CASSETTE_MODES, configure_cassette, get_cassette
+from checkpoints import Checkpoint
 from config import config
-import pandas as pd
-from pymongo import MongoClient
-from pymongo.operations import UpdateOne
+from lazy_imports import LazyModule
+from mongo_connection import mongo_manager
+from reference_cache import reference_cache
+from run_metrics import metrics
+from pipeline import prefetch
+
+# Heavy dependencies load on first use, so --help and argument errors return at once
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+polars_transforms = LazyModule('polars_transforms')
+snapshot_store = LazyModule('snapshot_store')
+mongo_schema = LazyModule('mongo_schema')
+mongo_ops = LazyModule('pymongo.operations')
 
 
 def get_mongo_client():
+    """Shared pooled client; connected on first use and closed when main() finishes"""
     try:
-        client = MongoClient(config.mongodb_uri)
-        client.admin.command('ping')
-        return client
+        return mongo_manager.client
     except Exception as e:
         print(f"Error connecting to MongoDB: {e}")
         return None
 
 
+# Operations sent per bulk_write call
+UPSERT_CHUNK_SIZE = 1000
+
+UpsertResult = namedtuple(
+    'UpsertResult', ['matched_count', 'modified_count', 'upserted_count', 'skipped_count', 'changes'])
+
+HASH_FIELD = 'content_hash'
+
+# Fields of leads/deals that feed the summary collections
+SUMMARY_SOURCE_FIELDS = {
+    'leads': ('lead_status_id', 'lead_status'),
+    'deals': ('deal_stage', 'amount', 'close_date'),
+}
+
+
+def _column_values(series):
+    """Python-native values of one column, with NaN/NaT replaced by None"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        with warnings.catch_warnings():
+            # pandas 2.x warns that to_pydatetime will return a Series; both work here.
+            # np.array copies: the Series' values are read-only under copy-on-write (pandas 3)
+            warnings.simplefilter('ignore', FutureWarning)
+            values = np.array(series.dt.to_pydatetime(), dtype=object)
+        values[series.isna().to_numpy()] = None
+        return values.tolist()
+    return series.to_numpy(dtype=object, na_value=None).tolist()
+
+
+def dataframe_to_records(df, numeric_columns=()):
+    """Convert a frame into Mongo-ready dicts column by column instead of row by row"""
+    numeric = {
+        column: pd.to_numeric(df[column], errors='coerce').astype('float64')
+        for column in numeric_columns if column in df.columns
+    }
+    if numeric:
+        df = df.assign(**numeric)
+
+    columns = list(df.columns)
+    values = [_column_values(df[column]) for column in columns]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def content_hash(record):
+    """Stable hash of a record's fields, used to detect unchanged documents"""
+    fields = {k: v for k, v in record.items() if k not in (HASH_FIELD, '_id')}
+    payload = json.dumps(fields, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def bulk_upsert_records(collection, records, key="id", chunk_size=UPSERT_CHUNK_SIZE, track_fields=()):
+    """Upsert records whose content hash differs from the stored one; unchanged ones are skipped.
+
+    `changes` in the result pairs the stored values of `track_fields` (None for
+    new documents) with the new record, for every record that was written.
+    """
+    matched = modified = upserted = skipped = 0
+    changes = []
+    projection = {field: 1 for field in (key, HASH_FIELD, *track_fields)}
+    projection["_id"] = 0
+
+    for start in range(0, len(records), chunk_size):
+        # Keep the last version of an id so a change is counted once per chunk
+        chunk = list({
+            record[key]: {**record, HASH_FIELD: content_hash(record)}
+            for record in records[start:start + chunk_size]
+        }.values())
+
+        stored = {
+            doc[key]: doc
+            for doc in collection.find(
+                {key: {"$in": [record[key] for record in chunk]}}, projection)
+        }
+
+        operations = []
+        for record in chunk:
+            before = stored.get(record[key])
+            if before is not None and before.get(HASH_FIELD) == record[HASH_FIELD]:
+                continue
+            operations.append(mongo_ops.UpdateOne({key: record[key]}, {"$set": record}, upsert=True))
+            changes.append((before, record))
+
+        skipped += len(chunk) - len(operations)
+        if not operations:
+            continue
+
+        result = collection.bulk_write(operations, ordered=False)
+        matched += result.matched_count
+        modified += result.modified_count
+        upserted += result.upserted_count
+
+    for name, value in (('matched', matched), ('modified', modified),
+                        ('upserted', upserted), ('skipped', skipped)):
+        metrics.count('mongo_documents_total', value, collection=collection.name, result=name)
+    return UpsertResult(matched, modified, upserted, skipped, changes)
+
+
 def upsert_leads_to_mongo(leads_df):
     if leads_df.empty:
         print("No leads data to upsert")
         return
+    return upsert_lead_records(dataframe_to_records(leads_df))
+
+
+def upsert_lead_records(records):
+    """Upsert already transformed lead records, e.g. from the polars backend"""
+    if not records:
+        print("No leads data to upsert")
+        return
     client = get_mongo_client()
     if not client:
         print("Failed to connect to MongoDB. Skipping upsert.")
@@ -27,34 +148,31 @@ def upsert_leads_to_mongo(leads_df):
     try:
         db = client[config.mongodb_database]
         collection = db.leads
-        bulk_operations = []
-        for _, row in leads_df.iterrows():
-            lead_data = row.to_dict()
-            lead_data = {k: (None if pd.isna(v) else v)
-                         for k, v in lead_data.items()}
-            operation = UpdateOne(
-                {"id": lead_data["id"]},
-                {"$set": lead_data},
-                upsert=True
-            )
-            bulk_operations.append(operation)
-        if bulk_operations:
-            result = collection.bulk_write(bulk_operations)
-            print(f"MongoDB Leads Upsert Results:")
-            print(f"  - Matched: {result.matched_count}")
-            print(f"  - Modified: {result.modified_count}")
-            print(f"  - Upserted: {result.upserted_count}")
+        result = bulk_upsert_records(
+            collection, records, track_fields=SUMMARY_SOURCE_FIELDS['leads'])
+        print(f"MongoDB Leads Upsert Results:")
+        print(f"  - Matched: {result.matched_count}")
+        print(f"  - Modified: {result.modified_count}")
+        print(f"  - Upserted: {result.upserted_count}")
+        print(f"  - Skipped (unchanged): {result.skipped_count}")
+        return result
 
     except Exception as e:
         print(f"Error during leads upsert: {e}")
-    finally:
-        client.close()
 
 
 def upsert_deals_to_mongo(deals_df):
     if deals_df.empty:
         print("No deals data to upsert")
         return
+    return upsert_deal_records(dataframe_to_records(deals_df, numeric_columns=['amount']))
+
+
+def upsert_deal_records(records):
+    """Upsert already transformed deal records, e.g. from the polars backend"""
+    if not records:
+        print("No deals data to upsert")
+        return
 
     client = get_mongo_client()
     if not client:
@@ -64,102 +182,402 @@ def upsert_deals_to_mongo(deals_df):
     try:
         db = client[config.mongodb_database]
         collection = db.deals
-
-        bulk_operations = []
-
-        for _, row in deals_df.iterrows():
-            deal_data = row.to_dict()
-            deal_data = {k: (None if pd.isna(v) else v)
-                         for k, v in deal_data.items()}
-
-            if 'amount' in deal_data and deal_data['amount'] is not None:
-                try:
-                    deal_data['amount'] = float(deal_data['amount'])
-                except (ValueError, TypeError):
-                    deal_data['amount'] = None
-
-            operation = UpdateOne(
-                {"id": deal_data["id"]},
-                {"$set": deal_data},
-                upsert=True
-            )
-            bulk_operations.append(operation)
-
-        if bulk_operations:
-            result = collection.bulk_write(bulk_operations)
-            print(f"MongoDB Deals Upsert Results:")
-            print(f"  - Matched: {result.matched_count}")
-            print(f"  - Modified: {result.modified_count}")
-            print(f"  - Upserted: {result.upserted_count}")
+        result = bulk_upsert_records(
+            collection, records, track_fields=SUMMARY_SOURCE_FIELDS['deals'])
+        print(f"MongoDB Deals Upsert Results:")
+        print(f"  - Matched: {result.matched_count}")
+        print(f"  - Modified: {result.modified_count}")
+        print(f"  - Upserted: {result.upserted_count}")
+        print(f"  - Skipped (unchanged): {result.skipped_count}")
+        return result
 
     except Exception as e:
         print(f"Error during deals upsert: {e}")
-    finally:
-        client.close()
 
 
-def get_lead_status_mapping():
+# Object types whose associations are pulled along with each synced object type
+ASSOCIATED_TYPES = {
+    'deals': ('contacts', 'companies'),
+}
+
+
+def upsert_association_records(from_type, to_type, from_ids, edges):
+    """Make the stored from_type -> to_type edges of `from_ids` exactly `edges` (dicts from iter_associations)"""
+    client = get_mongo_client()
+    if not client:
+        print("Failed to connect to MongoDB. Skipping associations upsert.")
+        return
+
+    try:
+        collection = client[config.mongodb_database].associations
+        # Millisecond precision, as stored by MongoDB, so the $ne below compares equal values
+        now = datetime.now(timezone.utc)
+        synced_at = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        operations = [
+            mongo_ops.UpdateOne(
+                {'from_type': from_type, 'from_id': edge['from_id'], 'to_type': to_type, 'to_id': edge['to_id']},
+                {'$set': {'types': edge['types'], 'synced_at': synced_at}},
+                upsert=True)
+            for edge in edges
+        ]
+        # Edges this sync did not see were removed in HubSpot
+        operations.append(mongo_ops.DeleteMany({'from_type': from_type, 'to_type': to_type,
+                                      'from_id': {'$in': [str(object_id) for object_id in from_ids]},
+                                      'synced_at': {'$ne': synced_at}}))
+        result = collection.bulk_write(operations, ordered=True)
+        for name, value in (('matched', result.matched_count), ('upserted', result.upserted_count),
+                            ('deleted', result.deleted_count)):
+            metrics.count('mongo_documents_total', value, collection=collection.name, result=name)
+        return result
+
+    except Exception as e:
+        print(f"Error during {from_type} -> {to_type} associations upsert: {e}")
+
+
+def sync_associations(from_type, object_ids, client=None):
+    """Pull the associations of `object_ids` into the associations collection; returns whether all were stored"""
+    from hubspot_client import get_hubspot_client
+
+    client = client or get_hubspot_client()
+    stored = True
+    for to_type in ASSOCIATED_TYPES.get(from_type, ()):
+        try:
+            edges = list(client.iter_associations(from_type, to_type, object_ids))
+        except Exception as e:
+            print(f"Error reading {from_type} -> {to_type} associations: {e}")
+            stored = False
+            continue
+        metrics.count('rows_total', len(edges), stage='associations')
+        if upsert_association_records(from_type, to_type, object_ids, edges) is None:
+            stored = False
+    return stored
+
+
+def _load_lead_status_mapping():
     client = get_mongo_client()
+    if not client:
+        raise ConnectionError("MongoDB is not available to load the lead status mapping")
     db = client[config.mongodb_database]
     collection = db.lead_status
-    lead_status_docs = list(collection.find())
+    lead_status_docs = collection.find({}, {"lead_status": 1, "id": 1, "_id": 0})
     mapping = {}
     for doc in lead_status_docs:
         if 'lead_status' in doc and 'id' in doc:
             mapping[doc['lead_status']] = doc['id']
-    client.close()
     return mapping
 
 
-def get_leads_dataframe():
-    client = HubSpotClient()
+def get_lead_status_mapping():
+    """lead_status -> id, cached for REFERENCE_CACHE_TTL seconds across runs in the same process"""
+    return reference_cache.get('lead_status', _load_lead_status_mapping)
+
+
+def invalidate_lead_status_mapping():
+    """Call after changing the lead_status collection so the next lookup reloads it"""
+    reference_cache.invalidate('lead_status')
+
+
+def get_sync_watermark(object_type):
+    client = get_mongo_client()
+    if not client:
+        return None
+    state = client[config.mongodb_database].sync_state.find_one(
+        {"_id": object_type})
+    return state.get("watermark") if state else None
+
 
-    leads_data = client.get_existing_contacts(limit=100)
+def save_sync_watermark(object_type, watermark):
+    client = get_mongo_client()
+    if not client:
+        print(f"Failed to connect to MongoDB. Watermark for {object_type} not saved.")
+        return
+    client[config.mongodb_database].sync_state.update_one(
+        {"_id": object_type},
+        {"$set": {
+            "watermark": watermark,
+            "updated_at": datetime.now(timezone.utc)
+        }},
+        upsert=True
+    )
+    print(f"Saved {object_type} watermark: {watermark}")
 
-    df = pd.DataFrame(leads_data)
 
+def transform_leads_dataframe(df, lead_status_mapping):
     if not df.empty:
         df = df.rename(columns={
             'firstname': 'first_name',
             'lastname': 'last_name',
-            'hs_lead_status': 'lead_status'
+            'hs_lead_status': 'lead_status',
+            'lastmodifieddate': 'last_modified_date'
         })
 
         df['full_name'] = df['first_name'].fillna(
             '') + ' ' + df['last_name'].fillna('')
         df['full_name'] = df['full_name'].str.strip()
 
-        lead_status_mapping = get_lead_status_mapping()
-
         df['lead_status_id'] = df['lead_status'].map(
             lead_status_mapping).fillna(0).astype(int)
 
+        if 'last_modified_date' in df.columns:
+            df['last_modified_date'] = pd.to_datetime(
+                df['last_modified_date'], errors='coerce')
+
     return df
 
 
-def get_deals_dataframe():
-    client = HubSpotClient()
-    deals_data = client.get_existing_deals(limit=100)
-    df = pd.DataFrame(deals_data)
-    
+def transform_deals_dataframe(df):
     if not df.empty:
         df = df.rename(columns={
             'dealtype': 'deal_type',
             'dealstage': 'deal_stage',
             'dealname': 'deal_name',
             'closedate': 'close_date',
-            'createdate': 'create_date'
+            'createdate': 'create_date',
+            'hs_lastmodifieddate': 'last_modified_date'
         })
-        
+
         if 'close_date' in df.columns:
             df['close_date'] = pd.to_datetime(df['close_date'], errors='coerce')
-        
+
         if 'create_date' in df.columns:
             df['create_date'] = pd.to_datetime(df['create_date'], errors='coerce')
-    
+
+        if 'last_modified_date' in df.columns:
+            df['last_modified_date'] = pd.to_datetime(
+                df['last_modified_date'], errors='coerce')
+
     return df
 
 
+def _snapshot_pages(pages, object_type, snapshot_dir):
+    """Pass pages through while writing them to a new snapshot, committed once all were read"""
+    writer = snapshot_store.SnapshotWriter(snapshot_dir, object_type)
+    for page in pages:
+        writer.write_page(page)
+        yield page
+    writer.commit()
+    print(f"Saved {object_type} snapshot {writer.run_id} ({writer.rows} rows) to {writer.path}")
+
+
+def _raw_pages(object_type, page_size, since, snapshot, columns, snapshot_dir, workers=1, resume=None,
+               rate_share=1.0):
+    """Raw pages from HubSpot (lists of records) or, when `snapshot` is given, a local snapshot (Arrow tables).
+
+    With several `workers` the HubSpot pages come from id-partitioned worker processes, in no particular order,
+    sharing `rate_share` of the HubSpot limits, unless the single cursor would be as fast.
+    `resume` is the resume position of a previously loaded page; extraction continues right after it.
+    """
+    snapshot_dir = snapshot_dir or config.snapshot_dir
+
+    if snapshot is not None:
+        if not snapshot_dir:
+            raise ValueError("Set SNAPSHOT_DIR or --snapshot-dir to replay a snapshot")
+        path = snapshot_store.resolve_snapshot(snapshot_dir, object_type, snapshot)
+        print(f"Replaying {object_type} snapshot {path}")
+        yield from _counted_pages(snapshot_store.iter_snapshot_tables(path, columns=columns))
+        return
+
+    from hubspot_client import get_hubspot_client
+    from partitioned_extract import iter_partitioned_pages, plan_extraction
+
+    resume = resume or {}
+    # A resumed run continues the way it started, which its position records
+    windows = resume.get('windows')
+    if workers > 1 and not resume:
+        windows = plan_extraction(object_type, workers, since=since, rate_share=rate_share,
+                                  cursor_page_size=page_size)
+        if windows is None:
+            print(f"A single cursor extracts {object_type} as fast as {workers} search processes here; using it")
+    if windows is not None:
+        print(f"Extracting {object_type} with {workers} worker processes")
+        pages = iter_partitioned_pages(object_type, workers=workers, since=since, windows=windows,
+                                       rate_share=rate_share)
+    elif object_type == 'contacts':
+        client = get_hubspot_client()
+        pages = (client.iter_existing_contacts(page_size=page_size, after=resume.get('after')) if since is None
+                 else client.iter_modified_contacts(resume.get('since') or since, page_size=page_size))
+    else:
+        client = get_hubspot_client()
+        pages = (client.iter_existing_deals(page_size=page_size, after=resume.get('after')) if since is None
+                 else client.iter_modified_deals(resume.get('since') or since, page_size=page_size))
+
+    if snapshot_dir and resume:
+        print("Resumed runs are not written to a snapshot; it would only hold the remaining pages")
+    elif snapshot_dir:
+        pages = _snapshot_pages(pages, object_type, snapshot_dir)
+    yield from _counted_pages(pages)
+
+
+def _counted_pages(pages):
+    """Time each page fetch as the extract stage and count its rows"""
+    for page in metrics.timed_iter(pages, 'extract'):
+        metrics.count('rows_total', len(page), stage='extract')
+        yield page
+
+
+def _extracted_pages(object_type, page_size, since, snapshot, columns, snapshot_dir,
+                     queue_size=0, workers=1, resume=None, positions=None, rate_share=1.0):
+    """Raw pages for the iter_* functions.
+
+    queue_size: fetch pages in a background thread, that many pages ahead.
+    workers: extract with that many id-partitioned processes.
+    rate_share: fraction of the HubSpot limits those processes share (other syncs use the rest).
+    resume: continue after this page position (from a checkpoint).
+    positions: a deque that receives the resume position of every page (None for
+    snapshot pages), in the order the pages are yielded.
+    """
+    pages = _raw_pages(object_type, page_size, since, snapshot, columns, snapshot_dir, workers, resume, rate_share)
+    if positions is not None:
+        pages = _recorded_positions(pages, positions)
+    if queue_size:
+        pages = prefetch(pages, queue_size, name=f'extract-{object_type}')
+    return pages
+
+
+def _recorded_positions(pages, positions):
+    for page in pages:
+        positions.append(getattr(page, 'resume', None))
+        yield page
+
+
+def _page_frame(page):
+    return pd.DataFrame(page) if isinstance(page, list) else page.to_pandas()
+
+
+def _transformed(frame):
+    metrics.count('rows_total', len(frame), stage='transform')
+    return frame
+
+
+def iter_leads_dataframes(page_size=100, since=None, snapshot=None, columns=None, snapshot_dir=None, **extraction):
+    """Transformed lead pages; `extraction` takes the keyword options of _extracted_pages"""
+    lead_status_mapping = None
+
+    for page in _extracted_pages('contacts', page_size, since, snapshot, columns, snapshot_dir, **extraction):
+        if lead_status_mapping is None:
+            lead_status_mapping = get_lead_status_mapping()
+        with metrics.span('transform'):
+            df = transform_leads_dataframe(_page_frame(page), lead_status_mapping)
+        yield _transformed(df)
+
+
+def iter_deals_dataframes(page_size=100, since=None, snapshot=None, columns=None, snapshot_dir=None, **extraction):
+    """Transformed deal pages; `extraction` takes the keyword options of _extracted_pages"""
+    for page in _extracted_pages('deals', page_size, since, snapshot, columns, snapshot_dir, **extraction):
+        with metrics.span('transform'):
+            df = transform_deals_dataframe(_page_frame(page))
+        yield _transformed(df)
+
+
+def iter_leads_polars(page_size=100, since=None, snapshot=None, columns=None, snapshot_dir=None, **extraction):
+    """Like iter_leads_dataframes, transformed with a polars lazy query; yields polars DataFrames"""
+    lead_status_mapping = None
+
+    for page in _extracted_pages('contacts', page_size, since, snapshot, columns, snapshot_dir, **extraction):
+        if lead_status_mapping is None:
+            lead_status_mapping = get_lead_status_mapping()
+        with metrics.span('transform'):
+            df = polars_transforms.leads_frame(page, lead_status_mapping)
+        yield _transformed(df)
+
+
+def iter_deals_polars(page_size=100, since=None, snapshot=None, columns=None, snapshot_dir=None, **extraction):
+    """Like iter_deals_dataframes, transformed with a polars lazy query; yields polars DataFrames"""
+    for page in _extracted_pages('deals', page_size, since, snapshot, columns, snapshot_dir, **extraction):
+        with metrics.span('transform'):
+            df = polars_transforms.deals_frame(page)
+        yield _transformed(df)
+
+
+def _concat_chunks(chunks):
+    chunks = list(chunks)
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True)
+
+
+def get_leads_dataframe(snapshot=None, columns=None, snapshot_dir=None):
+    """All leads from HubSpot, or from a snapshot run ('latest' or a run id) reading only `columns`"""
+    return _concat_chunks(iter_leads_dataframes(
+        snapshot=snapshot, columns=columns, snapshot_dir=snapshot_dir))
+
+
+def get_deals_dataframe(snapshot=None, columns=None, snapshot_dir=None):
+    """All deals from HubSpot, or from a snapshot run ('latest' or a run id) reading only `columns`"""
+    return _concat_chunks(iter_deals_dataframes(
+        snapshot=snapshot, columns=columns, snapshot_dir=snapshot_dir))
+
+
+LEAD_STATUS_SUMMARY_PIPELINE = [
+    {
+        "$group": {
+            "_id": "$lead_status_id",
+            "total": {"$sum": 1},
+            "status": {"$first": "$lead_status"}
+        }
+    },
+    {
+        "$project": {
+            "_id": 0,
+            "id": "$_id",
+            "total": 1,
+            "status": 1
+        }
+    }
+]
+
+
+DEALS_SUMMARY_PIPELINE = [
+    {
+        "$group": {
+            "_id": "$deal_stage",
+            "total": {"$sum": 1},
+            "amount": {"$sum": "$amount"}
+        }
+    },
+    {
+        "$project": {
+            "_id": 0,
+            "id": "$_id",
+            "total": 1,
+            "amount": 1
+        }
+    }
+]
+
+
+DEALS_CLOSE_SUMMARY_PIPELINE = [
+    {
+        "$group": {
+            "_id": {
+                "year": {"$year": "$close_date"},
+                "month": {"$month": "$close_date"},
+                "deal_stage": "$deal_stage"
+            },
+            "count": {"$sum": 1},
+            "amount": {"$sum": "$amount"}
+        }
+    },
+    {
+        "$sort": {
+            "_id.year": 1,
+            "_id.month": 1,
+            "_id.deal_stage": 1
+        }
+    },
+    {
+        "$project": {
+            "_id": 0,
+            "year": "$_id.year",
+            "month": "$_id.month",
+            "deal_stage": "$_id.deal_stage",
+            "count": 1,
+            "amount": 1
+        }
+    }
+]
+
+
 def upsert_lead_status_summary():
     try:
         client = get_mongo_client()
@@ -167,23 +585,7 @@ def upsert_lead_status_summary():
         leads_collection = db['leads']
         summary_collection = db['resume_lead_status']
 
-        pipeline = [
-            {
-                "$group": {
-                    "_id": "$lead_status_id",
-                    "total": {"$sum": 1},
-                    "status": {"$first": "$lead_status"}
-                }
-            },
-            {
-                "$project": {
-                    "_id": 0,
-                    "id": "$_id",
-                    "total": 1,
-                    "status": 1
-                }
-            }
-        ]
+        pipeline = LEAD_STATUS_SUMMARY_PIPELINE
 
         summary_results = list(leads_collection.aggregate(pipeline))
 
@@ -191,7 +593,7 @@ def upsert_lead_status_summary():
             bulk_operations = []
             for result in summary_results:
                 bulk_operations.append(
-                    UpdateOne(
+                    mongo_ops.UpdateOne(
                         {"id": result["id"]},
                         {"$set": result},
                         upsert=True
@@ -215,9 +617,6 @@ def upsert_lead_status_summary():
 
     except Exception as e:
         print(f"Error creating lead status summary: {e}")
-    finally:
-        if 'client' in locals():
-            client.close()
 
 
 def upsert_deals_summary():
@@ -227,23 +626,7 @@ def upsert_deals_summary():
         deals_collection = db['deals']
         summary_collection = db['total_deals']
 
-        pipeline = [
-            {
-                "$group": {
-                    "_id": "$deal_stage",
-                    "total": {"$sum": 1},
-                    "amount": {"$sum": "$amount"}
-                }
-            },
-            {
-                "$project": {
-                    "_id": 0,
-                    "id": "$_id",
-                    "total": 1,
-                    "amount": 1
-                }
-            }
-        ]
+        pipeline = DEALS_SUMMARY_PIPELINE
 
         summary_results = list(deals_collection.aggregate(pipeline))
 
@@ -251,7 +634,7 @@ def upsert_deals_summary():
             bulk_operations = []
             for result in summary_results:
                 bulk_operations.append(
-                    UpdateOne(
+                    mongo_ops.UpdateOne(
                         {"id": result["id"]},
                         {"$set": result},
                         upsert=True
@@ -274,9 +657,6 @@ def upsert_deals_summary():
 
     except Exception as e:
         print(f"Error creating deals summary: {e}")
-    finally:
-        if 'client' in locals():
-            client.close()
 
 
 def upsert_deals_close_summary():
@@ -286,36 +666,7 @@ def upsert_deals_close_summary():
         deals_collection = db['deals']
         summary_collection = db['resume_close_deals']
 
-        pipeline = [
-            {
-                "$group": {
-                    "_id": {
-                        "year": {"$year": "$close_date"},
-                        "month": {"$month": "$close_date"},
-                        "deal_stage": "$deal_stage"
-                    },
-                    "count": {"$sum": 1},
-                    "amount": {"$sum": "$amount"}
-                }
-            },
-            {
-                "$sort": {
-                    "_id.year": 1,
-                    "_id.month": 1,
-                    "_id.deal_stage": 1
-                }
-            },
-            {
-                "$project": {
-                    "_id": 0,
-                    "year": "$_id.year",
-                    "month": "$_id.month",
-                    "deal_stage": "$_id.deal_stage",
-                    "count": 1,
-                    "amount": 1
-                }
-            }
-        ]
+        pipeline = DEALS_CLOSE_SUMMARY_PIPELINE
 
         summary_results = list(deals_collection.aggregate(pipeline))
 
@@ -323,7 +674,7 @@ def upsert_deals_close_summary():
             bulk_operations = []
             for result in summary_results:
                 bulk_operations.append(
-                    UpdateOne(
+                    mongo_ops.UpdateOne(
                         {
                             "year": result["year"],
                             "month": result["month"],
@@ -350,66 +701,526 @@ def upsert_deals_close_summary():
 
     except Exception as e:
         print(f"Error creating deals close summary: {e}")
-    finally:
-        if 'client' in locals():
-            client.close()
 
 
-def main():
-    parser = argparse.ArgumentParser(description='Extract data from HubSpot')
-    parser.add_argument('--type', choices=['leads', 'deals'], default='leads',
-                        help='Type of data to extract: leads or deals (default: leads)')
+def _summary_amount(doc):
+    amount = doc.get('amount')
+    if isinstance(amount, (int, float)) and not isinstance(amount, bool) and amount == amount:
+        return amount
+    return 0
 
-    args = parser.parse_args()
+
+def _lead_status_contribution(doc):
+    return {"id": doc.get('lead_status_id')}, {"total": 1}, {"status": doc.get('lead_status')}
+
+
+def _deal_stage_contribution(doc):
+    return {"id": doc.get('deal_stage')}, {"total": 1, "amount": _summary_amount(doc)}, {}
+
+
+def _deal_close_contribution(doc):
+    close_date = doc.get('close_date')
+    if isinstance(close_date, datetime):
+        if close_date.tzinfo is not None:
+            close_date = close_date.astimezone(timezone.utc)
+        year, month = close_date.year, close_date.month
+    else:
+        year = month = None
+    key = {"year": year, "month": month, "deal_stage": doc.get('deal_stage')}
+    return key, {"count": 1, "amount": _summary_amount(doc)}, {}
+
+
+# summary collection -> (source collection, contribution of one document, count field)
+SUMMARY_CONTRIBUTIONS = {
+    'resume_lead_status': ('leads', _lead_status_contribution, 'total'),
+    'total_deals': ('deals', _deal_stage_contribution, 'total'),
+    'resume_close_deals': ('deals', _deal_close_contribution, 'count'),
+}
+
+SUMMARY_PIPELINES = {
+    'resume_lead_status': (LEAD_STATUS_SUMMARY_PIPELINE, ('id',)),
+    'total_deals': (DEALS_SUMMARY_PIPELINE, ('id',)),
+    'resume_close_deals': (DEALS_CLOSE_SUMMARY_PIPELINE, ('year', 'month', 'deal_stage')),
+}
+
+
+def apply_summary_deltas(source, changes):
+    """Apply the before/after contribution of changed leads or deals to their summaries with $inc"""
+    if not changes:
+        return
+    client = get_mongo_client()
+    if not client:
+        print("Failed to connect to MongoDB. Skipping summary deltas.")
+        return
+
+    db = client[config.mongodb_database]
+    for summary_name, (summary_source, contribution, count_field) in SUMMARY_CONTRIBUTIONS.items():
+        if summary_source != source:
+            continue
+
+        deltas = {}
+        for before, after in changes:
+            for doc, sign in ((before, -1), (after, 1)):
+                if doc is None:
+                    continue
+                key, counters, extra = contribution(doc)
+                entry = deltas.setdefault(tuple(sorted(key.items())), (key, {}, {}))
+                for field, value in counters.items():
+                    entry[1][field] = entry[1].get(field, 0) + sign * value
+                if sign > 0:
+                    entry[2].update(extra)
+
+        operations = []
+        for key, increments, on_insert in deltas.values():
+            if not any(increments.values()):
+                continue
+            update = {"$inc": increments}
+            if on_insert:
+                update["$setOnInsert"] = on_insert
+            operations.append(mongo_ops.UpdateOne(key, update, upsert=True))
+
+        try:
+            if operations:
+                collection = db[summary_name]
+                result = collection.bulk_write(operations, ordered=False)
+                emptied = collection.delete_many({count_field: {"$lte": 0}})
+                print(f"{summary_name}: {len(operations)} groups adjusted "
+                      f"({result.upserted_count} new, {emptied.deleted_count} emptied)")
+        except Exception as e:
+            print(f"Error applying {summary_name} deltas: {e}")
+
+
+def merge_summary(summary_name):
+    """Materialize a summary on the server by ending its pipeline with $merge into the summary collection.
+
+    $merge rejects null `on` values, so the (usually single) group with a null
+    key is written from Python; every other group never leaves the server.
+    """
+    client = get_mongo_client()
+    if not client:
+        print(f"Failed to connect to MongoDB. Skipping {summary_name}.")
+        return None
+
+    source = SUMMARY_CONTRIBUTIONS[summary_name][0]
+    pipeline, key_fields = SUMMARY_PIPELINES[summary_name]
+    db = client[config.mongodb_database]
+    summary_collection = db[summary_name]
 
     try:
-        if args.type == 'leads':
-            data_df = get_leads_dataframe()
+        # $merge needs a unique index on its `on` fields: mongo_schema.INDEXES declares it, and
+        # main() applies those once at startup
+        groups_before = summary_collection.count_documents({})
+
+        has_null_key = {"$or": [{field: None} for field in key_fields]}
+        db[source].aggregate(pipeline + [
+            {"$match": {"$nor": [has_null_key]}},
+            {"$merge": {
+                "into": summary_name,
+                "on": list(key_fields),
+                "whenMatched": "merge",
+                "whenNotMatched": "insert"
+            }}
+        ])
+
+        null_groups = list(db[source].aggregate(pipeline + [{"$match": has_null_key}]))
+        for group in null_groups:
+            summary_collection.update_one(
+                {field: group.get(field) for field in key_fields}, {"$set": group}, upsert=True)
+
+        groups_after = summary_collection.count_documents({})
+        print(f"{summary_name}: merged on the server, {groups_after} groups "
+              f"({groups_after - groups_before} new, {len(null_groups)} with a null key)")
+        return groups_after
+
+    except Exception as e:
+        print(f"Error merging {summary_name}: {e}")
+        return None
+
+
+def _amounts_differ(stored, computed):
+    if isinstance(stored, (int, float)) and isinstance(computed, (int, float)):
+        return abs(stored - computed) > 1e-6 * max(1.0, abs(computed))
+    return stored != computed
+
+
+def verify_summaries(sources=('leads', 'deals'), summaries=None):
+    """Rebuild every summary of `sources` (or just the named `summaries`) from scratch, report drift and repair it"""
+    client = get_mongo_client()
+    if not client:
+        print("Failed to connect to MongoDB. Skipping summary verification.")
+        return None
+
+    db = client[config.mongodb_database]
+    drift = {}
+    for summary_name, (source, _, count_field) in SUMMARY_CONTRIBUTIONS.items():
+        if source not in sources or (summaries is not None and summary_name not in summaries):
+            continue
+        pipeline, key_fields = SUMMARY_PIPELINES[summary_name]
+        try:
+            computed = {
+                tuple(doc.get(field) for field in key_fields): doc
+                for doc in db[source].aggregate(pipeline)
+            }
+            stored = {
+                tuple(doc.get(field) for field in key_fields): doc
+                for doc in db[summary_name].find({}, {"_id": 0})
+            }
+
+            mismatched = [
+                key for key, doc in computed.items()
+                if key not in stored or any(
+                    _amounts_differ(stored[key].get(field), value)
+                    for field, value in doc.items() if field not in key_fields and field != 'status')
+            ]
+            stale = [key for key in stored if key not in computed]
+            drift[summary_name] = len(mismatched) + len(stale)
+
+            if not mismatched and not stale:
+                print(f"{summary_name}: no drift ({len(computed)} groups)")
+                continue
+
+            print(f"{summary_name}: drift in {len(mismatched)} groups, {len(stale)} stale groups; rebuilding")
+            operations = [
+                mongo_ops.UpdateOne(dict(zip(key_fields, key)), {"$set": computed[key]}, upsert=True)
+                for key in mismatched
+            ]
+            if operations:
+                db[summary_name].bulk_write(operations, ordered=False)
+            for key in stale:
+                db[summary_name].delete_one(dict(zip(key_fields, key)))
+
+        except Exception as e:
+            print(f"Error verifying {summary_name}: {e}")
+
+    return drift
+
+
+def delta_fallback_reason(db, kinds):
+    """Why the summaries of `kinds` cannot be maintained with deltas, or None when they can.
+
+    Deltas only keep summaries right that already match their source: none
+    may be missing while the source has records, and every record must carry
+    the content hash that marks it as loaded by this pipeline.
+    """
+    for source in kinds:
+        if db[source].find_one({}, {"_id": 1}) is None:
+            continue
+        for summary_name, (summary_source, _, _) in SUMMARY_CONTRIBUTIONS.items():
+            if summary_source == source and db[summary_name].find_one({}, {"_id": 1}) is None:
+                return f"{summary_name} is empty but {source} has records"
+        if db[source].find_one({HASH_FIELD: {"$exists": False}}, {"_id": 1}) is not None:
+            return f"{source} has records without a {HASH_FIELD}"
+    return None
+
+
+def sync_type(args, kind, rate_share=1.0):
+    """Extract, transform and load one type ('leads' or 'deals') as configured by the parsed `args`.
+
+    Returns whether every page was loaded, or None when the sync failed
+    outright. `rate_share` is the fraction of the HubSpot limits its extraction
+    processes may use, when other syncs run at the same time.
+    """
+    try:
+        object_type = 'contacts' if kind == 'leads' else 'deals'
+        workers = args.workers
+
+        # Progress of HubSpot syncs is checkpointed after every loaded page
+        checkpoint = None if args.from_snapshot else Checkpoint(f"sync-{kind}")
+        resuming = bool(args.resume and checkpoint)
+        if args.resume and not resuming:
+            print(f"No {kind} checkpoint found, starting a new sync")
+        elif checkpoint and not resuming:
+            print(f"Discarding the unfinished {kind} sync checkpointed at {checkpoint.get('updated_at')} "
+                  f"(use --resume to continue it)")
+
+        if resuming:
+            since = checkpoint.get('since')
+            workers = checkpoint.get('workers', 1)
+            print(f"Resuming the {kind} sync checkpointed at {checkpoint.get('updated_at')} "
+                  f"({checkpoint.get('total_records', 0)} records already loaded)")
+        else:
+            since = get_sync_watermark(object_type) if args.incremental and not args.from_snapshot else None
+            if args.incremental and not args.from_snapshot:
+                if since is None:
+                    print(f"No {object_type} watermark found, running a full sync")
+                else:
+                    print(f"Fetching {object_type} modified since {since}")
+            if checkpoint is not None:
+                checkpoint.clear()
+                checkpoint.save(since=since.isoformat() if since else None, workers=workers,
+                                position=None, total_records=0, watermark=None)
+
+        queue_size = args.queue_size if args.pipeline else 0
+        pull_associations = args.associations and kind == 'deals' and not args.from_snapshot
+        positions = deque() if checkpoint is not None else None
+        source = dict(since=since, snapshot=args.from_snapshot, snapshot_dir=args.snapshot_dir,
+                      queue_size=queue_size, workers=workers, positions=positions,
+                      resume=checkpoint.get('position') if resuming else None, rate_share=rate_share)
+        if args.backend == 'polars':
+            to_records = polars_transforms.frame_to_records
+            if kind == 'leads':
+                chunks = iter_leads_polars(**source)
+                upsert = lambda df: upsert_lead_records(to_records(df))
+                data_type = "Leads"
+            else:
+                chunks = iter_deals_polars(**source)
+                upsert = lambda df: upsert_deal_records(to_records(df))
+                data_type = "Deals"
+        elif kind == 'leads':
+            chunks = iter_leads_dataframes(**source)
+            upsert = upsert_leads_to_mongo
             data_type = "Leads"
         else:
-            data_df = get_deals_dataframe()
+            chunks = iter_deals_dataframes(**source)
+            upsert = upsert_deals_to_mongo
             data_type = "Deals"
 
-        print(f"{data_type} from HubSpot:")
-        print("=" * 50)
+        if args.pipeline:
+            # Extract and transform run in their own threads; this loop only loads
+            chunks = prefetch(chunks, queue_size, name=f'transform-{object_type}')
+            print(f"Pipelined run: up to {queue_size} pages queued per stage")
 
-        if args.type == 'deals':
-            key_columns = ['id', 'dealname', 'amount',
-                           'dealstage', 'pipeline', 'closedate']
-            available_columns = [
-                col for col in key_columns if col in data_df.columns]
-            print("Key Deal Information:")
-            print(data_df[available_columns])
-            print("\nAll columns available:", list(data_df.columns))
-        else:
-            print(data_df)
+        total_records = checkpoint.get('total_records', 0) if resuming else 0
+        watermark = pd.Timestamp(checkpoint.get('watermark')) if resuming and checkpoint.get('watermark') else None
+        all_pages_loaded = True
+        for chunk_number, data_df in enumerate(chunks, 1):
+            if chunk_number == 1:
+                print(f"{data_type} from HubSpot (first page):")
+                print("=" * 50)
+                if kind == 'deals':
+                    key_columns = ['id', 'deal_name', 'amount',
+                                   'deal_stage', 'pipeline', 'close_date']
+                    available_columns = [
+                        col for col in key_columns if col in data_df.columns]
+                    print("Key Deal Information:")
+                    print(data_df[available_columns])
+                    print("\nAll columns available:", list(data_df.columns))
+                else:
+                    print(data_df)
+                print("=" * 50)
+                print("Upserting data to MongoDB page by page...")
+                print("=" * 50)
 
-        print("=" * 50)
-        print(f"Total {data_type.lower()}: {len(data_df)}")
+            total_records += len(data_df)
+            print(f"\nPage {chunk_number}: {len(data_df)} {data_type.lower()} (running total: {total_records})")
+            with metrics.span('load'):
+                result = upsert(data_df)
+            if result is None:
+                all_pages_loaded = False
+            else:
+                metrics.count('rows_total', len(data_df), stage='load')
+                if args.summary_mode == 'delta':
+                    with metrics.span('aggregate'):
+                        apply_summary_deltas(kind, result.changes)
+                if pull_associations:
+                    with metrics.span('associations'):
+                        if not sync_associations(object_type, list(data_df['id'])):
+                            all_pages_loaded = False
+
+            if 'last_modified_date' in data_df.columns:
+                page_watermark = data_df['last_modified_date'].max()
+                if pd.notna(page_watermark):
+                    page_watermark = pd.Timestamp(page_watermark)
+                    if watermark is None or page_watermark > watermark:
+                        watermark = page_watermark
+
+            # Once a page has failed, keep the checkpoint before it so --resume retries it
+            position = positions.popleft() if positions is not None else None
+            if position is not None and all_pages_loaded:
+                checkpoint.save(position=position, total_records=total_records,
+                                watermark=watermark.isoformat() if watermark is not None else None)
 
-        print("\n" + "=" * 50)
-        print("Upserting data to MongoDB...")
         print("=" * 50)
+        print(f"Total {data_type.lower()}: {total_records}")
 
-        if args.type == 'leads':
-            upsert_leads_to_mongo(data_df)
-            print("\n" + "=" * 50)
-            print("Creating lead status summary...")
-            print("=" * 50)
-            upsert_lead_status_summary()
-        else:
-            upsert_deals_to_mongo(data_df)
-            print("\n" + "=" * 50)
-            print("Creating deals summary...")
-            print("=" * 50)
-            upsert_deals_summary()
+        if args.from_snapshot:
+            print(f"Replayed a snapshot; keeping the current {object_type} watermark")
+        elif watermark is not None and all_pages_loaded:
+            save_sync_watermark(object_type, watermark.to_pydatetime())
+        elif not all_pages_loaded:
+            print(f"Some pages failed to load; keeping the previous {object_type} watermark")
+
+        if checkpoint is not None and all_pages_loaded:
+            checkpoint.clear()
+        elif checkpoint is not None:
+            print(f"Checkpoint kept in {checkpoint.path}; rerun with --resume to continue from the first failed page")
+
+
+        return all_pages_loaded
+    except Exception as e:
+        print(f"Error syncing {kind}: {e}")
+        return None
+
+
+def summary_tasks(summary_mode, kinds):
+    """(title, function) of every summary computation to run after loading `kinds`"""
+    if summary_mode == 'delta':
+        return []
+    if summary_mode == 'merge':
+        return [(f"Merging {summary_name} on the server...", partial(merge_summary, summary_name))
+                for summary_name, (source, _, _) in SUMMARY_CONTRIBUTIONS.items() if source in kinds]
+    if summary_mode == 'verify':
+        return [(f"Verifying {summary_name}...", partial(verify_summaries, sources=(source,), summaries=(summary_name,)))
+                for summary_name, (source, _, _) in SUMMARY_CONTRIBUTIONS.items() if source in kinds]
+
+    tasks = []
+    if 'leads' in kinds:
+        tasks.append(("Creating lead status summary...", upsert_lead_status_summary))
+    if 'deals' in kinds:
+        tasks.append(("Creating deals summary...", upsert_deals_summary))
+        tasks.append(("Creating deals close summary...", upsert_deals_close_summary))
+    return tasks
+
+
+def run_summaries(summary_mode, kinds):
+    """Run the summary stage; the aggregations write different collections, so they run in parallel"""
+    if summary_mode == 'delta':
+        print("Summaries updated incrementally")
+        return
+
+    tasks = summary_tasks(summary_mode, kinds)
+    with metrics.span('aggregate'), ThreadPoolExecutor(max_workers=max(1, len(tasks))) as executor:
+        futures = []
+        for title, task in tasks:
             print("\n" + "=" * 50)
-            print("Creating deals close summary...")
+            print(title)
             print("=" * 50)
-            upsert_deals_close_summary()
+            futures.append((title, executor.submit(task)))
+        for title, future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Error in summary step '{title}': {e}")
 
-    except Exception as e:
-        print(f"Error: {e}")
+
+def export_run_metrics(json_path=None, textfile_path=None, **labels):
+    """Print the stage timings and write the run report; `{type}` in a path is replaced by labels['type']"""
+    report = metrics.report()
+    print("\n" + "=" * 50)
+    print(f"Run finished in {report['duration_seconds']:.2f}s (success: {report['success']})")
+    for stage, timing in report['stages'].items():
+        throughput = f", {timing['rows_per_sec']:,.0f} rows/s" if timing['rows_per_sec'] else ""
+        print(f"  - {stage}: {timing['seconds']:.2f}s over {timing['calls']} calls{throughput}")
+
+    for path, write in ((json_path, metrics.write_json), (textfile_path, metrics.write_prometheus_textfile)):
+        if not path:
+            continue
+        path = path.format(**labels)
+        try:
+            write(path)
+            print(f"Metrics written to {path}")
+        except OSError as e:
+            print(f"Error writing metrics to {path}: {e}")
+
+
+# Options whose default is a config setting: argument name -> Config attribute
+CONFIG_DEFAULTS = {
+    'queue_size': 'pipeline_queue_size',
+    'workers': 'extract_workers',
+    'associations': 'sync_associations',
+    'cassette': 'hubspot_cassette_mode',
+    'metrics_json': 'metrics_json',
+    'metrics_textfile': 'metrics_textfile',
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract data from HubSpot')
+    parser.add_argument('--type', choices=['leads', 'deals', 'all'], default='leads',
+                        help='Type of data to extract: leads, deals or all (both at once; default: leads)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only fetch records modified since the last successful sync')
+    parser.add_argument('--snapshot-dir', default=None,
+                        help='Write the raw HubSpot pages of this run to a Parquet snapshot under this directory '
+                             '(default: SNAPSHOT_DIR)')
+    parser.add_argument('--from-snapshot', nargs='?', const='latest', default=None, metavar='RUN_ID',
+                        help='Replay a snapshot (the latest one when no run id is given) instead of calling HubSpot')
+    parser.add_argument('--backend', choices=['pandas', 'polars'], default='pandas',
+                        help='Library used for the transform stage (default: pandas)')
+    parser.add_argument('--summary-mode', choices=['full', 'merge', 'delta', 'verify'], default='full',
+                        help='full: recompute summaries with aggregations (default); '
+                             'merge: recompute them on the server with $merge; '
+                             'delta: adjust them with the changes of each page; '
+                             'verify: recompute, report drift and repair')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Fetch, transform and load pages concurrently through bounded queues')
+    parser.add_argument('--queue-size', type=int, default=None,
+                        help='Pages buffered between pipelined stages (default: PIPELINE_QUEUE_SIZE or 2)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes that extract disjoint id ranges in parallel; 1 walks a single cursor '
+                             '(default: EXTRACT_WORKERS or 1)')
+    parser.add_argument('--associations', action='store_true', default=None,
+                        help='With --type deals, also pull the contacts and companies of every synced deal into '
+                             'the associations collection (default: SYNC_ASSOCIATIONS)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue the last interrupted sync of this --type after its last loaded page')
+    parser.add_argument('--cassette', choices=[*CASSETTE_MODES, 'off'], default=None,
+                        help='record: save every HubSpot response to the cassette; replay: answer from it only, '
+                             'offline; auto: replay what it holds and record the rest; off: call HubSpot '
+                             'without a cassette (default: HUBSPOT_CASSETTE_MODE, off)')
+    parser.add_argument('--metrics-json', default=None, metavar='PATH',
+                        help='Write a JSON run report here; {type} is replaced by --type (default: METRICS_JSON)')
+    parser.add_argument('--metrics-textfile', default=None, metavar='PATH',
+                        help='Write the run metrics in Prometheus textfile format here; {type} is replaced '
+                             'by --type (default: METRICS_TEXTFILE)')
+
+    args = parser.parse_args()
+    if args.resume and args.from_snapshot:
+        parser.error('--resume continues a HubSpot sync; snapshot replays simply start over')
+    # Defaults come from the environment, read only now so --help and usage errors never load .env
+    for name, setting in CONFIG_DEFAULTS.items():
+        if getattr(args, name) is None:
+            setattr(args, name, getattr(config, setting))
+    kinds = ['leads', 'deals'] if args.type == 'all' else [args.type]
+    if args.associations and ('deals' not in kinds or args.from_snapshot):
+        print("Associations are only pulled by HubSpot deal syncs; skipping them")
+    try:
+        mode = None if args.cassette == 'off' else args.cassette
+        if mode != config.hubspot_cassette_mode:
+            configure_cassette(mode)
+        cassette = get_cassette()
+    except (OSError, LookupError, ValueError) as e:
+        parser.error(f"Cannot open the cassette: {e}")
+    if cassette is not None:
+        print(f"Using cassette {cassette.path} in {cassette.mode} mode ({len(cassette)} recorded responses)")
+        if args.workers > 1:
+            # Extraction processes would each write their own copy of the cassette
+            print("Extraction processes do not share the cassette; extracting with a single cursor")
+            args.workers = 1
+    metrics.reset(type=args.type)
+    succeeded = False
+
+    # One pooled connection and the process-wide request scheduler serve every stage and sync
+    with mongo_manager:
+        try:
+            client = get_mongo_client()
+            if client:
+                mongo_schema.ensure_indexes(client[config.mongodb_database])
+            if client and args.summary_mode == 'delta':
+                reason = delta_fallback_reason(client[config.mongodb_database], kinds)
+                if reason:
+                    # A verify run rebuilds every summary from scratch; later runs can use deltas
+                    print(f"Cannot apply summary deltas: {reason}. Rebuilding the summaries instead")
+                    args.summary_mode = 'verify'
+
+            if len(kinds) == 1:
+                results = {args.type: sync_type(args, args.type)}
+            else:
+                print(f"Syncing {' and '.join(kinds)} concurrently")
+                with ThreadPoolExecutor(max_workers=len(kinds), thread_name_prefix='sync') as executor:
+                    futures = {kind: executor.submit(sync_type, args, kind, 1 / len(kinds)) for kind in kinds}
+                    results = {kind: future.result() for kind, future in futures.items()}
+
+            # A sync that failed outright leaves its summaries alone
+            run_summaries(args.summary_mode, [kind for kind, loaded in results.items() if loaded is not None])
+            succeeded = all(results.values())
+        except Exception as e:
+            print(f"Error: {e}")
+        finally:
+            if cassette is not None:
+                cassette.save()
+            metrics.finish(succeeded)
+            export_run_metrics(args.metrics_json, args.metrics_textfile, type=args.type)
 
 
 if __name__ == "__main__":
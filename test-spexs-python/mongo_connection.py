@@ -0,0 +1,64 @@
+"""
+Shared, lazily created MongoDB connection reused by every pipeline stage
+"""
+import threading
+
+from config import config
+
+
+class MongoConnectionManager:
+
+    def __init__(self, uri=None, database_name=None, max_pool_size=None):
+        # Unset settings are read from config when the client is first needed
+        self._uri = uri
+        self._database_name = database_name
+        self._max_pool_size = max_pool_size
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def uri(self):
+        return self._uri or config.mongodb_uri
+
+    @property
+    def database_name(self):
+        return self._database_name or config.mongodb_database
+
+    @property
+    def max_pool_size(self):
+        return self._max_pool_size or config.mongo_max_pool_size
+
+    @property
+    def client(self):
+        """The pooled MongoClient, connected and pinged on first use"""
+        from pymongo import MongoClient
+
+        with self._lock:
+            if self._client is None:
+                client = MongoClient(self.uri, maxPoolSize=self.max_pool_size)
+                try:
+                    client.admin.command('ping')
+                except Exception:
+                    client.close()
+                    raise
+                self._client = client
+            return self._client
+
+    @property
+    def database(self):
+        return self.client[self.database_name]
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+mongo_manager = MongoConnectionManager()
@@ -0,0 +1,106 @@
+"""
+Indexes the pipeline relies on, applied idempotently at startup.
+
+Upserts filter on `id` (or year/month/deal_stage for the close summary), so
+without these every UpdateOne is a collection scan. Run this module directly
+to apply the indexes and check with explain() that the upsert filters use them;
+tests/test_mongo_schema.py runs the same check against a throwaway mongod.
+"""
+from pymongo import ASCENDING
+
+# collection -> [(keys, options)]
+INDEXES = {
+    'leads': [
+        ([('id', ASCENDING)], {'unique': True}),
+        ([('lead_status_id', ASCENDING)], {}),
+    ],
+    'deals': [
+        ([('id', ASCENDING)], {'unique': True}),
+        ([('deal_stage', ASCENDING)], {}),
+        ([('close_date', ASCENDING)], {}),
+    ],
+    'resume_lead_status': [
+        ([('id', ASCENDING)], {'unique': True}),
+    ],
+    'total_deals': [
+        ([('id', ASCENDING)], {'unique': True}),
+    ],
+    'resume_close_deals': [
+        ([('year', ASCENDING), ('month', ASCENDING), ('deal_stage', ASCENDING)], {'unique': True}),
+    ],
+    'associations': [
+        ([('from_type', ASCENDING), ('from_id', ASCENDING), ('to_type', ASCENDING), ('to_id', ASCENDING)],
+         {'unique': True}),
+        # Reverse lookups for reporting joins, e.g. the deals of a contact
+        ([('to_type', ASCENDING), ('to_id', ASCENDING)], {}),
+    ],
+}
+
+# A representative filter per collection, shaped like the ones the upserts send
+SAMPLE_FILTERS = {
+    'leads': {'id': '0'},
+    'deals': {'id': '0'},
+    'resume_lead_status': {'id': 0},
+    'total_deals': {'id': ''},
+    'resume_close_deals': {'year': 2024, 'month': 1, 'deal_stage': ''},
+    'associations': {'from_type': 'deals', 'from_id': '0', 'to_type': 'contacts', 'to_id': '0'},
+}
+
+
+def ensure_indexes(db):
+    """Create every declared index; existing ones are left alone. Returns the names that failed"""
+    failed = []
+    for collection_name, indexes in INDEXES.items():
+        for keys, options in indexes:
+            try:
+                db[collection_name].create_index(keys, **options)
+            except Exception as e:
+                name = f"{collection_name}.{'_'.join(field for field, _ in keys)}"
+                print(f"Error creating index {name}: {e}")
+                failed.append(name)
+    return failed
+
+
+def _plan_stages(plan):
+    """Yield every stage of an explain() plan, whatever shape the server version uses"""
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _plan_stages(value)
+
+
+def explain_upsert_filters(db):
+    """Map each collection to the index its upsert filter uses according to explain(), or None for a scan"""
+    used = {}
+    for collection_name, query in SAMPLE_FILTERS.items():
+        explanation = db[collection_name].find(query).explain()
+        winning_plan = explanation.get('queryPlanner', {}).get('winningPlan', {})
+        index_scans = [stage for stage in _plan_stages(winning_plan) if stage['stage'] == 'IXSCAN']
+        used[collection_name] = index_scans[0].get('indexName') if index_scans else None
+    return used
+
+
+def main():
+    from mongo_connection import mongo_manager
+
+    with mongo_manager:
+        db = mongo_manager.database
+        failed = ensure_indexes(db)
+
+        missing = []
+        for collection_name, index_name in explain_upsert_filters(db).items():
+            print(f"  - {collection_name}: {index_name or 'COLLSCAN'}")
+            if index_name is None:
+                missing.append(collection_name)
+
+    if failed or missing:
+        raise SystemExit(f"Index check failed: {', '.join(failed + missing)}")
+    print("All upsert filters use an index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Partitioned extraction of contacts/deals with several worker processes.
+
+The id space is split into disjoint [low, high) windows of hs_object_id.
+Windows are sized from search result counts: any window holding more than
+`window_target` objects is split again in proportion to its count, so each
+one can be walked with a single search query under the result cap. Worker
+processes take windows from a shared task queue and send their pages back
+through a bounded result queue, which the caller merges into one stream of
+pages for the Mongo loader. Every page carries the progress of all windows
+at the time it was yielded, so a run can be resumed from the last page
+that was loaded.
+
+Each worker gets an equal share of the portal's rate limits, so the search
+limit (a few requests per second per portal) stays the throughput ceiling,
+however many workers there are. Search pages hold up to 200 objects against
+100 for the list endpoint the single cursor walks, so partitioning only pays
+off when that cursor is held back by request latency; plan_extraction()
+compares the two with the latency measured while planning and returns no
+windows when the cursor would be as fast.
+"""
+import logging
+import math
+import multiprocessing
+import queue
+
+from hubspot_schema import SEARCH_PAGE_SIZE, SEARCH_RESULT_CAP, Page
+from request_scheduler import SEARCH_REQUESTS_PER_SECOND
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks for dead workers while waiting for pages
+_POLL_INTERVAL = 1.0
+
+
+def plan_windows(client, object_type, since=None, window_target=SEARCH_RESULT_CAP, min_windows=1):
+    """Disjoint (low, high, count) id windows covering every object.
+
+    Each window holds at most `window_target` objects, and at most 1/min_windows
+    of the total so there is work for every worker.
+    """
+    bounds = client.id_bounds(object_type, since=since)
+    if bounds is None:
+        return []
+
+    low, high = bounds[0], bounds[1] + 1
+    total = client.count_in_id_range(object_type, low, high, since=since)
+    window_target = min(window_target, max(1, math.ceil(total / min_windows)))
+
+    windows = []
+    pending = [(low, high, total)]
+    while pending:
+        low, high, count = pending.pop()
+        if not count:
+            continue
+        if count > window_target and high - low > 1:
+            # Assume ids are spread evenly; windows that still come out too big are split again
+            for start, end in _split(low, high, math.ceil(count / window_target)):
+                pending.append((start, end, client.count_in_id_range(object_type, start, end, since=since)))
+        else:
+            windows.append((low, high, count))
+    return sorted(windows)
+
+
+def partitioning_pays_off(workers, latency, rate_share=1.0, cursor_page_size=100, incremental=False):
+    """Whether `workers` search processes would extract faster than the single cursor.
+
+    Both are estimated in records per second from `latency`, the seconds one
+    request takes, and the portal's limits. The cursor lists pages of
+    `cursor_page_size` one request at a time, held by the burst limit; an
+    `incremental` cursor searches, so the search limit holds it instead.
+    """
+    from config import config
+
+    burst_per_second = config.hubspot_requests_per_10s / 10 * rate_share
+    search_per_second = SEARCH_REQUESTS_PER_SECOND * rate_share
+    if not latency:
+        # Nothing measured yet: only the limits can tell them apart
+        latency = 1e-9
+    partitioned = SEARCH_PAGE_SIZE * min(workers / latency, search_per_second, burst_per_second)
+    cursor = cursor_page_size * min(1 / latency, search_per_second if incremental else burst_per_second)
+    return partitioned > cursor
+
+
+def plan_extraction(object_type, workers, since=None, rate_share=1.0, cursor_page_size=100):
+    """[[low, high, low], ...] windows for iter_partitioned_pages(), or None when the single cursor is as fast"""
+    from hubspot_client import get_hubspot_client
+
+    client = get_hubspot_client()
+    windows = plan_windows(client, object_type, since=since, min_windows=workers)
+    latency = client.scheduler.latency
+    if windows and not partitioning_pays_off(min(workers, len(windows)), latency, rate_share, cursor_page_size,
+                                             incremental=since is not None):
+        logger.info(f"Searching {object_type} with {workers} processes would not beat the single cursor "
+                    f"at {latency or 0:.3f}s per request")
+        return None
+    logger.info(f"Planned {len(windows)} id windows for {object_type}")
+    return [[low, high, low] for low, high, _ in windows]
+
+
+def _split(low, high, parts):
+    parts = max(1, min(parts, high - low))
+    edges = [low + (high - low) * i // parts for i in range(parts + 1)]
+    return [(start, end) for start, end in zip(edges, edges[1:]) if start < end]
+
+
+def _walk_windows(object_type, page_size, since, limits, tasks, results):
+    """Worker process: walk windows from `tasks` until a None arrives, sending pages to `results`"""
+    from hubspot_client import HubSpotClient
+    from request_scheduler import configure_scheduler
+
+    configure_scheduler(**limits)
+    client = HubSpotClient()
+    while True:
+        window = tasks.get()
+        if window is None:
+            return
+        low, high = window
+        try:
+            for page in client.iter_id_range(object_type, low, high, since=since, page_size=page_size):
+                results.put(('page', (high, page.resume['low'], list(page))))
+            results.put(('done', high))
+        except Exception as e:
+            results.put(('error', f"{object_type} ids [{low}, {high}): {e}"))
+
+
+def iter_partitioned_pages(object_type, workers=4, page_size=SEARCH_PAGE_SIZE, since=None,
+                           window_target=SEARCH_RESULT_CAP, queue_size=4, windows=None, rate_share=1.0):
+    """Yield every contact/deal Page (modified at or after `since`), extracted by `workers` processes.
+
+    Pages arrive in completion order, not id order. At most `queue_size` pages
+    per worker wait in memory. Each page's resume position is
+    {'windows': [[low, high, next id to read], ...]}; passing those `windows`
+    back continues the walk instead of planning a new one. The workers split
+    `rate_share` of the portal's limits, leaving the rest to other syncs.
+    """
+    from config import config
+    from hubspot_client import get_hubspot_client
+
+    if windows is None:
+        windows = [[low, high, low] for low, high, _ in plan_windows(
+            get_hubspot_client(), object_type, since=since, window_target=window_target, min_windows=workers)]
+        logger.info(f"Planned {len(windows)} id windows for {object_type}")
+    progress = {high: [low, high, next_low] for low, high, next_low in windows}
+    pending = [(next_low, high) for low, high, next_low in windows if next_low < high]
+    if not pending:
+        logger.info(f"No {object_type} to extract")
+        return
+    workers = min(workers, len(pending))
+    logger.info(f"Extracting {object_type} from {len(pending)} of {len(windows)} id windows "
+                f"with {workers} processes")
+
+    # The daily quota needs no share: every process counts against the same usage file
+    share = rate_share / workers
+    limits = dict(
+        requests_per_10s=max(1, int(config.hubspot_requests_per_10s * share)),
+        max_workers=1,
+        search_per_second=SEARCH_REQUESTS_PER_SECOND * share
+    )
+    # spawn: the parent already runs scheduler and Mongo threads, which fork would copy mid-flight
+    context = multiprocessing.get_context('spawn')
+    tasks = context.Queue()
+    results = context.Queue(maxsize=max(1, queue_size * workers))
+    for window in pending:
+        tasks.put(window)
+    for _ in range(workers):
+        tasks.put(None)
+
+    processes = [
+        context.Process(target=_walk_windows, name=f"extract-{object_type}-{number}", daemon=True,
+                        args=(object_type, page_size, since, limits, tasks, results))
+        for number in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    remaining = len(pending)
+    try:
+        while remaining:
+            try:
+                kind, payload = results.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                failed = [p.name for p in processes if p.exitcode not in (None, 0)]
+                if failed:
+                    raise RuntimeError(f"Extraction workers {', '.join(failed)} died with {remaining} windows left")
+                continue
+
+            if kind == 'page':
+                high, next_low, records = payload
+                progress[high][2] = next_low
+                yield Page(records, {'windows': sorted(list(window) for window in progress.values())})
+            elif kind == 'done':
+                progress[payload][2] = payload
+                remaining -= 1
+            else:
+                raise RuntimeError(f"Partitioned extraction failed for {payload}")
+    finally:
+        for process in processes:
+            if remaining and process.is_alive():
+                process.terminate()
+            process.join()
@@ -0,0 +1,66 @@
+"""
+Bounded producer/consumer stages for the sync pipeline.
+
+prefetch() runs an iterator in a background thread and hands its items to
+the consumer through a bounded queue. Chaining it (extract -> transform ->
+load) lets page N+1 be fetched while page N is transformed and page N-1 is
+written; a full queue blocks the producer, so at most `maxsize` items per
+stage wait in memory.
+"""
+import queue
+import threading
+
+# Seconds between checks for a cancelled consumer while waiting on a full queue
+_POLL_INTERVAL = 0.1
+
+_DONE = object()
+
+
+def _put(items, item, stop):
+    """Put `item`, giving up once the consumer has gone away"""
+    while not stop.is_set():
+        try:
+            items.put(item, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def prefetch(iterable, maxsize=2, name='prefetch'):
+    """Yield the items of `iterable`, produced by a background thread up to `maxsize` items ahead.
+
+    Exceptions raised by the producer are re-raised in the consumer. Closing
+    the generator (or an exception in the consumer) stops the producer and
+    closes `iterable`.
+    """
+    items = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+
+    def produce():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if not _put(items, (item, None), stop):
+                    return
+            _put(items, (_DONE, None), stop)
+        except BaseException as e:
+            _put(items, (None, e), stop)
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
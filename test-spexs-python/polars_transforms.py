@@ -0,0 +1,130 @@
+"""
+Polars LazyFrame versions of the lead and deal transforms in mainProcess.
+
+The renames, full_name, lead_status_id mapping, date parsing and numeric
+amount are planned as one lazy query and executed multi-threaded, producing
+the same Mongo-ready records as transform_*_dataframe + dataframe_to_records.
+"""
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    POLARS_AVAILABLE = False
+
+LEAD_RENAMES = {
+    'firstname': 'first_name',
+    'lastname': 'last_name',
+    'hs_lead_status': 'lead_status',
+    'lastmodifieddate': 'last_modified_date'
+}
+
+DEAL_RENAMES = {
+    'dealtype': 'deal_type',
+    'dealstage': 'deal_stage',
+    'dealname': 'deal_name',
+    'closedate': 'close_date',
+    'createdate': 'create_date',
+    'hs_lastmodifieddate': 'last_modified_date'
+}
+
+LEAD_DATE_COLUMNS = ['lastmodifieddate']
+DEAL_DATE_COLUMNS = ['closedate', 'createdate', 'hs_lastmodifieddate']
+
+# HubSpot timestamps look like 2024-01-01T00:00:00.000Z; %.f also accepts no fraction
+ISO_UTC_FORMAT = ('%Y-%m-%dT%H:%M:%S%.fZ', 'UTC')
+
+
+def _require_polars():
+    if not POLARS_AVAILABLE:
+        raise ImportError("polars not available; install it to use the polars backend")
+
+
+def to_lazyframe(page):
+    """LazyFrame over a raw page: a list of HubSpot records or an Arrow table from a snapshot"""
+    _require_polars()
+    if isinstance(page, list):
+        # Every HubSpot property is a string; pinning the type keeps all-null columns parseable
+        columns = list(page[0]) if page else []
+        return pl.DataFrame(page, schema={column: pl.String for column in columns}).lazy()
+    return pl.from_arrow(page).lazy()
+
+
+def _first_value(page, column):
+    if isinstance(page, list):
+        return next((record.get(column) for record in page if record.get(column) is not None), None)
+    if column not in page.column_names:
+        return None
+    values = page.column(column).drop_null()
+    return values[0].as_py() if len(values) else None
+
+
+def _datetime_format(value):
+    """(format, time_zone) for a sample value; like pandas, the first value decides for the column"""
+    if not isinstance(value, str) or len(value) < 10:
+        return ISO_UTC_FORMAT
+    if len(value) == 10:
+        return '%Y-%m-%d', None
+    if value.endswith('Z'):
+        return ISO_UTC_FORMAT
+    if value[-6] in '+-' and value[-3] == ':':
+        return '%Y-%m-%dT%H:%M:%S%.f%:z', None
+    return '%Y-%m-%dT%H:%M:%S%.f', None
+
+
+def infer_datetime_formats(page, columns):
+    """Per-column datetime formats for the raw `columns` of a page, for the lazy transforms"""
+    return {column: _datetime_format(_first_value(page, column)) for column in columns}
+
+
+def _parse_datetime(column, datetime_format):
+    format_string, time_zone = datetime_format or ISO_UTC_FORMAT
+    return pl.col(column).str.to_datetime(format_string, time_zone=time_zone, strict=False)
+
+
+def transform_leads_lazy(lf, lead_status_mapping, datetime_formats=None):
+    columns = lf.collect_schema().names()
+    if not columns:
+        # An empty page has no columns to derive from; pandas leaves it untouched too
+        return lf
+    lf = lf.rename({old: new for old, new in LEAD_RENAMES.items() if old in columns})
+
+    expressions = [
+        pl.concat_str([pl.col('first_name').fill_null(''), pl.col('last_name').fill_null('')],
+                      separator=' ').str.strip_chars().alias('full_name'),
+        pl.col('lead_status').replace_strict(
+            lead_status_mapping, default=0, return_dtype=pl.Int64).alias('lead_status_id')
+    ]
+    if 'lastmodifieddate' in columns:
+        expressions.append(_parse_datetime(
+            'last_modified_date', (datetime_formats or {}).get('lastmodifieddate')))
+    return lf.with_columns(expressions)
+
+
+def transform_deals_lazy(lf, datetime_formats=None):
+    columns = lf.collect_schema().names()
+    lf = lf.rename({old: new for old, new in DEAL_RENAMES.items() if old in columns})
+
+    expressions = [
+        _parse_datetime(DEAL_RENAMES[column], (datetime_formats or {}).get(column))
+        for column in DEAL_DATE_COLUMNS if column in columns
+    ]
+    if 'amount' in columns:
+        expressions.append(pl.col('amount').cast(pl.Float64, strict=False).fill_nan(None))
+    return lf.with_columns(expressions) if expressions else lf
+
+
+def leads_frame(page, lead_status_mapping):
+    """Transformed leads of one raw page as an eager polars DataFrame"""
+    formats = infer_datetime_formats(page, LEAD_DATE_COLUMNS)
+    return transform_leads_lazy(to_lazyframe(page), lead_status_mapping, formats).collect()
+
+
+def deals_frame(page):
+    """Transformed deals of one raw page as an eager polars DataFrame"""
+    formats = infer_datetime_formats(page, DEAL_DATE_COLUMNS)
+    return transform_deals_lazy(to_lazyframe(page), formats).collect()
+
+
+def frame_to_records(df):
+    """Mongo-ready dicts; nulls come out as None and datetimes as datetime objects"""
+    return df.to_dicts()
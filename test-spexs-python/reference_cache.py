@@ -0,0 +1,67 @@
+"""
+Process-wide cache for small reference mappings read from MongoDB.
+
+Entries are loaded on first use and kept for `ttl_seconds`. Once an entry
+has expired, callers keep getting the previous value while a single
+background thread reloads it, so lookups only wait on the database the
+first time (or after an explicit invalidate()).
+"""
+import threading
+import time
+
+from config import config
+
+
+class ReferenceCache:
+
+    def __init__(self, ttl_seconds=None, clock=time.monotonic):
+        # None: REFERENCE_CACHE_TTL, read on first use
+        self._ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    @property
+    def ttl_seconds(self):
+        return config.reference_cache_ttl if self._ttl_seconds is None else self._ttl_seconds
+
+    def get(self, name, loader):
+        """Cached value of `name`, loading it with `loader()` on a miss"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                value, loaded_at = entry
+                if self.clock() - loaded_at >= self.ttl_seconds and name not in self._refreshing:
+                    self._refreshing.add(name)
+                    threading.Thread(target=self._refresh, args=(name, loader),
+                                     name=f"refresh-{name}", daemon=True).start()
+                return value
+
+        value = loader()
+        with self._lock:
+            self._entries[name] = (value, self.clock())
+        return value
+
+    def _refresh(self, name, loader):
+        try:
+            value = loader()
+            with self._lock:
+                if name in self._entries:
+                    self._entries[name] = (value, self.clock())
+        except Exception as e:
+            print(f"Error refreshing cached {name}, keeping the previous value: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(name)
+
+    def invalidate(self, name=None):
+        """Drop one entry (or all of them) so the next get() reloads it synchronously"""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+
+reference_cache = ReferenceCache()
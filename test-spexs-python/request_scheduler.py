@@ -0,0 +1,354 @@
+"""
+Shared scheduler that every HubSpot API call goes through.
+
+Requests are admitted by rolling-window limiters sized to HubSpot's burst
+(per 10 seconds) and search (per second) limits and by a daily quota shared
+across runs, executed on a worker thread pool and retried with backoff on
+429/5xx responses.
+"""
+import asyncio
+import atexit
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    # Windows: usage is still kept across runs, just not locked between processes
+    FCNTL_AVAILABLE = False
+
+from cassettes import get_cassette
+from config import config
+from run_metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# The CRM search endpoints have their own, lower limit
+SEARCH_REQUESTS_PER_SECOND = 4
+
+MAX_BACKOFF_SECONDS = 60
+
+# Daily request count shared by every run, kept next to the sync checkpoints
+DAILY_USAGE_FILE = 'hubspot-daily-usage.json'
+
+
+class RollingWindowLimiter:
+    """Blocking limiter admitting at most `limit` calls in any `window_seconds`.
+
+    Admission times are kept in a deque, so a burst after a cold start or an
+    idle gap never exceeds the limit, as a full token bucket refilling during
+    the same window would. A 429 pauses every caller and halves the allowance,
+    which successes win back gradually.
+    """
+
+    def __init__(self, limit, window_seconds, min_scale=0.1):
+        self.limit = limit
+        self.window = window_seconds
+        self.scale = 1.0
+        self.min_scale = min_scale
+        self.admitted = deque()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _allowance(self):
+        return max(1, math.floor(self.limit * self.scale))
+
+    def try_acquire(self):
+        """Admit one call now and return 0, or return the seconds to wait before trying again"""
+        with self.lock:
+            now = time.monotonic()
+            while self.admitted and self.admitted[0] <= now - self.window:
+                self.admitted.popleft()
+            allowance = self._allowance()
+            if now < self.paused_until:
+                return self.paused_until - now
+            if len(self.admitted) < allowance:
+                self.admitted.append(now)
+                return 0
+            # Wait for enough admissions to leave the window to get under the allowance
+            return self.admitted[len(self.admitted) - allowance] + self.window - now
+
+    def acquire(self):
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """acquire() for coroutines: waiting sleeps on the event loop instead of blocking it"""
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def throttle(self, pause_seconds):
+        """Pause every caller for `pause_seconds` and halve the allowance"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + pause_seconds)
+            self.scale = max(self.min_scale, self.scale / 2)
+
+    def recover(self):
+        with self.lock:
+            if self.scale < 1.0:
+                self.scale = min(1.0, self.scale + 0.05)
+
+
+def _utc_day():
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+class DailyLimitExceeded(RuntimeError):
+    """The portal's daily request limit is used up"""
+
+
+class DailyQuota:
+    """HubSpot's daily request limit, counted across runs and processes.
+
+    Usage is kept per UTC day in a JSON file (DAILY_USAGE_FILE in
+    CHECKPOINT_DIR). Calls are reserved from it `chunk` at a time under an
+    exclusive file lock, so the file is only touched once per chunk;
+    release() hands back what this process did not use, and a process that
+    dies keeps at most one chunk counted. HubSpot resets the limit at midnight
+    in the portal's time zone, so the UTC day is an approximation near that
+    boundary.
+    """
+
+    def __init__(self, limit, path, chunk=100):
+        self.limit = limit
+        self.path = path
+        self.chunk = chunk
+        self.day = None
+        self.reserved = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            day = _utc_day()
+            if day != self.day:
+                self.day, self.reserved = day, 0
+            if not self.reserved:
+                self.reserved = self._update(day, lambda used: max(0, min(self.chunk, self.limit - used)))
+                if not self.reserved:
+                    raise DailyLimitExceeded(
+                        f"The daily limit of {self.limit} HubSpot requests is used up for {day} (UTC)")
+            self.reserved -= 1
+
+    def release(self):
+        with self.lock:
+            if self.reserved:
+                reserved = self.reserved
+                self._update(self.day, lambda used: -reserved)
+                self.reserved = 0
+
+    def used(self):
+        """Requests counted for today by every process, including their unused reservations"""
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                usage = json.load(file)
+        except (OSError, ValueError):
+            return 0
+        return usage.get('calls', 0) if usage.get('day') == _utc_day() else 0
+
+    def _update(self, day, change):
+        """Add change(used) to the count of `day` under the file lock; returns the change"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'a+', encoding='utf-8') as file:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(file, fcntl.LOCK_EX)
+            file.seek(0)
+            try:
+                usage = json.loads(file.read() or '{}')
+            except ValueError:
+                usage = {}
+            if usage.get('day', '') > day:
+                # A reservation from a day that is already over
+                return 0
+            used = usage.get('calls', 0) if usage.get('day') == day else 0
+            delta = change(used)
+            file.seek(0)
+            file.truncate()
+            json.dump({'day': day, 'calls': max(0, used + delta)}, file)
+            file.flush()
+            return delta
+
+
+def _retry_after(error):
+    headers = getattr(error, 'headers', None) or {}
+    value = headers.get('Retry-After') if hasattr(headers, 'get') else None
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _response_bytes(fn):
+    """Body size of the last response seen by the SDK ApiClient behind a bound API method.
+
+    Approximate when several threads share one ApiClient, since only the last
+    response is kept.
+    """
+    api_client = getattr(getattr(fn, '__self__', None), 'api_client', None)
+    response = getattr(api_client, 'last_response', None)
+    data = getattr(response, 'data', None)
+    return len(data) if isinstance(data, (bytes, str)) else 0
+
+
+class RequestScheduler:
+
+    def __init__(self, requests_per_10s=100, daily_limit=250000, max_workers=8, max_retries=5,
+                 search_per_second=SEARCH_REQUESTS_PER_SECOND, rate_limited=True, daily_usage_path=None):
+        self.burst_limiter = RollingWindowLimiter(requests_per_10s, 10)
+        # A window needs room for one whole call; slower rates just get a longer window
+        search_limit = max(1, math.floor(search_per_second))
+        self.search_limiter = RollingWindowLimiter(search_limit, search_limit / search_per_second)
+        self.daily_quota = DailyQuota(
+            daily_limit, daily_usage_path or os.path.join(config.checkpoint_dir, DAILY_USAGE_FILE))
+        atexit.register(self.daily_quota.release)
+        self.max_retries = max_retries
+        self.max_workers = max_workers
+        self.rate_limited = rate_limited
+        # Moving average of successful call durations, limiter waits excluded; None until a call succeeds
+        self.latency = None
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="hubspot")
+
+    def call(self, fn, *args, search=False, **kwargs):
+        """Run one SDK call on the calling thread once the rate limits allow it"""
+        operation = getattr(fn, '__name__', 'call')
+        attempt = 0
+        while True:
+            if self.rate_limited:
+                self.daily_quota.acquire()
+                if search:
+                    self.search_limiter.acquire()
+                self.burst_limiter.acquire()
+
+            metrics.count('api_calls_total', operation=operation)
+            started = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, operation, search)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+
+            self._succeeded(time.monotonic() - started, search)
+            metrics.count('api_response_bytes_total', _response_bytes(fn))
+            return result
+
+    async def call_async(self, send, operation='call', search=False):
+        """call() for a coroutine function `send()` returning the response body (bytes).
+
+        The limits are shared with the threads using call(); waits sleep on the event loop.
+        """
+        attempt = 0
+        while True:
+            if self.rate_limited:
+                self.daily_quota.acquire()
+                if search:
+                    await self.search_limiter.acquire_async()
+                await self.burst_limiter.acquire_async()
+
+            metrics.count('api_calls_total', operation=operation)
+            started = time.monotonic()
+            try:
+                body = await send()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, operation, search)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+
+            self._succeeded(time.monotonic() - started, search)
+            metrics.count('api_response_bytes_total', len(body or b''))
+            return body
+
+    def _retry_delay(self, error, attempt, operation, search):
+        """Seconds to wait before retrying a call that raised `error`, or None when it should be raised"""
+        status = getattr(error, 'status', None)
+        if status not in RETRYABLE_STATUSES or attempt >= self.max_retries:
+            metrics.count('api_errors_total', operation=operation, status=status or 'none')
+            return None
+        metrics.count('api_retries_total', status=status)
+
+        delay = _retry_after(error)
+        if delay is None:
+            delay = min(MAX_BACKOFF_SECONDS, 2 ** attempt) + random.uniform(0, 1)
+        if status == 429:
+            (self.search_limiter if search else self.burst_limiter).throttle(delay)
+        logger.warning(f"HubSpot returned {status}, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+        return delay
+
+    def _succeeded(self, elapsed, search):
+        self.latency = elapsed if self.latency is None else 0.8 * self.latency + 0.2 * elapsed
+        self.burst_limiter.recover()
+        if search:
+            self.search_limiter.recover()
+
+    def submit(self, fn, *args, search=False, **kwargs):
+        """Schedule an SDK call on the worker pool and return its Future"""
+        return self.executor.submit(self.call, fn, *args, search=search, **kwargs)
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+        self.daily_quota.release()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Process-wide scheduler shared by every HubSpotClient"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            # Replayed responses never reach HubSpot, so they are not held to its limits
+            cassette = get_cassette()
+            _scheduler = RequestScheduler(
+                requests_per_10s=config.hubspot_requests_per_10s,
+                daily_limit=config.hubspot_daily_limit,
+                max_workers=config.hubspot_max_workers,
+                max_retries=config.hubspot_max_retries,
+                rate_limited=cassette is None or cassette.mode != 'replay'
+            )
+        return _scheduler
+
+
+def configure_scheduler(**limits):
+    """Replace the process-wide scheduler with one using `limits` over the configured defaults.
+
+    Used by extraction worker processes, which each get a share of the portal's burst and
+    search limits; the daily quota is shared through its usage file.
+    """
+    global _scheduler
+    settings = dict(
+        requests_per_10s=config.hubspot_requests_per_10s,
+        daily_limit=config.hubspot_daily_limit,
+        max_workers=config.hubspot_max_workers,
+        max_retries=config.hubspot_max_retries
+    )
+    settings.update(limits)
+    with _scheduler_lock:
+        if _scheduler is not None:
+            _scheduler.shutdown(wait=False)
+        _scheduler = RequestScheduler(**settings)
+        return _scheduler
@@ -0,0 +1,186 @@
+"""
+Lightweight, thread-safe instrumentation for a sync run.
+
+Stages (extract, transform, load, aggregate) are timed with spans; API
+calls, retries, response bytes, rows and Mongo write results are counted.
+At the end of a run the numbers are exported as a JSON report and/or a
+Prometheus textfile (for node_exporter's textfile collector).
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+METRIC_PREFIX = 'hubspot_sync'
+
+METRIC_HELP = {
+    'api_calls_total': 'HubSpot API calls, including retried attempts',
+    'api_retries_total': 'HubSpot API calls retried after a 429/5xx response',
+    'api_errors_total': 'HubSpot API calls that failed after all retries',
+    'api_response_bytes_total': 'Bytes of HubSpot API response bodies',
+    'cassette_requests_total': 'HubSpot API requests replayed (hit, not_modified) or recorded (recorded, refreshed)',
+    'rows_total': 'Rows handled per stage',
+    'mongo_documents_total': 'MongoDB upsert results per collection',
+    'stage_seconds_total': 'Wall time spent in each stage',
+    'stage_calls_total': 'Timed calls per stage',
+    'stage_max_seconds': 'Slowest single call per stage',
+    'duration_seconds': 'Duration of the last sync run',
+    'success': 'Whether the last sync run finished without failed pages (1) or not (0)',
+    'last_run_timestamp_seconds': 'Unix time the last sync run finished',
+}
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key):
+    if not key:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in key)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + '}'
+
+
+class RunMetrics:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, **run_labels):
+        """Start a new run; `run_labels` (e.g. type='leads') are attached to every exported sample"""
+        with self._lock:
+            self.run_labels = run_labels
+            self.started_at = time.time()
+            self.finished_at = None
+            self.success = None
+            self._counters = {}
+            self._spans = {}
+
+    def count(self, name, value=1, **labels):
+        if not value:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def record_span(self, stage, seconds):
+        with self._lock:
+            calls, total, slowest = self._spans.get(stage, (0, 0.0, 0.0))
+            self._spans[stage] = (calls + 1, total + seconds, max(slowest, seconds))
+
+    @contextmanager
+    def span(self, stage):
+        """Time the enclosed block as one call of `stage`"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_span(stage, time.perf_counter() - started)
+
+    def timed_iter(self, iterable, stage):
+        """Yield from `iterable`, timing each next() as one call of `stage`"""
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.record_span(stage, time.perf_counter() - started)
+                return
+            self.record_span(stage, time.perf_counter() - started)
+            yield item
+
+    def finish(self, success):
+        with self._lock:
+            self.finished_at = time.time()
+            self.success = bool(success)
+
+    def counter_value(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def report(self):
+        """JSON-friendly summary of the run"""
+        with self._lock:
+            finished_at = self.finished_at or time.time()
+            counters = dict(self._counters)
+            spans = dict(self._spans)
+
+        rows = {dict(key).get('stage'): value for (name, key), value in counters.items() if name == 'rows_total'}
+        stages = {}
+        for stage, (calls, total, slowest) in spans.items():
+            stages[stage] = {
+                'calls': calls,
+                'seconds': round(total, 6),
+                'max_seconds': round(slowest, 6),
+                'rows': rows.get(stage),
+                'rows_per_sec': round(rows[stage] / total, 1) if rows.get(stage) and total else None,
+            }
+
+        return {
+            'labels': self.run_labels,
+            'started_at': datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(),
+            'finished_at': datetime.fromtimestamp(finished_at, timezone.utc).isoformat(),
+            'duration_seconds': round(finished_at - self.started_at, 6),
+            'success': self.success,
+            'stages': stages,
+            'counters': [
+                {'name': name, 'labels': dict(key), 'value': value}
+                for (name, key), value in sorted(counters.items())
+            ],
+        }
+
+    def prometheus_text(self):
+        """The run in Prometheus text exposition format"""
+        report = self.report()
+        samples = {}
+
+        def add(name, value, kind, **labels):
+            samples.setdefault((name, kind), []).append(
+                (_label_key({**self.run_labels, **labels}), value))
+
+        with self._lock:
+            counters = dict(self._counters)
+            spans = dict(self._spans)
+        for (name, key), value in counters.items():
+            add(name, value, 'counter', **dict(key))
+        for stage, (calls, total, slowest) in spans.items():
+            add('stage_seconds_total', total, 'counter', stage=stage)
+            add('stage_calls_total', calls, 'counter', stage=stage)
+            add('stage_max_seconds', slowest, 'gauge', stage=stage)
+        add('duration_seconds', report['duration_seconds'], 'gauge')
+        if self.success is not None:
+            add('success', int(self.success), 'gauge')
+        add('last_run_timestamp_seconds', round(self.finished_at or time.time(), 3), 'gauge')
+
+        lines = []
+        for (name, kind), values in sorted(samples.items()):
+            metric = f"{METRIC_PREFIX}_{name}"
+            if name in METRIC_HELP:
+                lines.append(f"# HELP {metric} {METRIC_HELP[name]}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for key, value in values:
+                lines.append(f"{metric}{_format_labels(key)} {value}")
+        return '\n'.join(lines) + '\n'
+
+    def write_json(self, path):
+        _atomic_write(path, json.dumps(self.report(), indent=2, default=str))
+
+    def write_prometheus_textfile(self, path):
+        _atomic_write(path, self.prometheus_text())
+
+
+def _atomic_write(path, content):
+    # The textfile collector may read at any moment; never let it see a partial file
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as file:
+        file.write(content)
+    os.replace(temporary, path)
+
+
+metrics = RunMetrics()
@@ -0,0 +1,95 @@
+"""
+Local Parquet snapshots of the raw HubSpot pages of each extraction run.
+
+Layout: <root>/<object_type>/run=<run_id>/part-<page>.parquet, with a
+_SUCCESS marker once every page of the run was written. Replaying a snapshot
+feeds the transform and load stages without calling the HubSpot API.
+"""
+import os
+from datetime import datetime, timezone
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+SUCCESS_MARKER = '_SUCCESS'
+
+
+def _require_pyarrow():
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow not available; install it to use snapshots")
+
+
+def _run_dir(root, object_type, run_id):
+    return os.path.join(root, object_type, f"run={run_id}")
+
+
+class SnapshotWriter:
+    """Write one Parquet part per extracted page; the run is only replayable once committed"""
+
+    def __init__(self, root, object_type, run_id=None):
+        _require_pyarrow()
+        self.run_id = run_id or datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+        self.path = _run_dir(root, object_type, self.run_id)
+        self.pages = 0
+        self.rows = 0
+        os.makedirs(self.path, exist_ok=True)
+
+    def write_page(self, records):
+        if not records:
+            return
+        # HubSpot returns every property as a string; pin the type so empty columns stay readable
+        columns = list(records[0])
+        table = pa.table({
+            name: pa.array([None if record.get(name) is None else str(record.get(name))
+                            for record in records], type=pa.string())
+            for name in columns
+        })
+        pq.write_table(table, os.path.join(self.path, f"part-{self.pages:05d}.parquet"))
+        self.pages += 1
+        self.rows += len(records)
+
+    def commit(self):
+        with open(os.path.join(self.path, SUCCESS_MARKER), 'w') as marker:
+            marker.write(f"{self.pages} pages, {self.rows} rows\n")
+
+
+def list_snapshots(root, object_type):
+    """Run ids of the committed snapshots of `object_type`, oldest first"""
+    base = os.path.join(root, object_type)
+    if not os.path.isdir(base):
+        return []
+    return sorted(
+        name.split('=', 1)[1] for name in os.listdir(base)
+        if name.startswith('run=') and os.path.exists(os.path.join(base, name, SUCCESS_MARKER))
+    )
+
+
+def resolve_snapshot(root, object_type, run_id=None):
+    """Directory of the given run, or of the latest committed one when `run_id` is None/'latest'"""
+    if run_id in (None, 'latest'):
+        runs = list_snapshots(root, object_type)
+        if not runs:
+            raise FileNotFoundError(f"No committed {object_type} snapshot under {root}")
+        run_id = runs[-1]
+    path = _run_dir(root, object_type, run_id)
+    if not os.path.exists(os.path.join(path, SUCCESS_MARKER)):
+        raise FileNotFoundError(f"{object_type} snapshot {run_id} not found or incomplete under {root}")
+    return path
+
+
+def iter_snapshot_tables(path, columns=None):
+    """Yield one memory-mapped Arrow table per page part, reading only `columns` when given"""
+    _require_pyarrow()
+    for name in sorted(os.listdir(path)):
+        if not name.endswith('.parquet'):
+            continue
+        parquet_file = pq.ParquetFile(os.path.join(path, name), memory_map=True)
+        if columns is not None:
+            available = set(parquet_file.schema_arrow.names)
+            yield parquet_file.read(columns=[column for column in columns if column in available])
+        else:
+            yield parquet_file.read()
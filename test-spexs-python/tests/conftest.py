@@ -0,0 +1,101 @@
+import os
+import shutil
+import socket
+import subprocess
+import uuid
+
+import pytest
+
+import cassettes
+import hubspot_client
+import request_scheduler
+from benchmarks.fake_hubspot import FakeHubSpotServer, FakeHubSpotStore
+from config import get_config
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope='session')
+def mongo_uri(tmp_path_factory):
+    """MONGO_TEST_URI, or the URI of a throwaway mongod started from PATH; skips without either"""
+    pymongo = pytest.importorskip('pymongo')
+
+    uri = os.getenv('MONGO_TEST_URI')
+    process = None
+    if not uri:
+        mongod = shutil.which('mongod')
+        if mongod is None:
+            pytest.skip('No mongod available (put it on PATH or set MONGO_TEST_URI)')
+        port = _free_port()
+        process = subprocess.Popen(
+            [mongod, '--dbpath', str(tmp_path_factory.mktemp('mongod')), '--port', str(port),
+             '--bind_ip', '127.0.0.1', '--quiet'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        uri = f'mongodb://127.0.0.1:{port}/'
+
+    client = pymongo.MongoClient(uri, serverSelectionTimeoutMS=10000 if process else 1000)
+    try:
+        client.admin.command('ping')
+    except pymongo.errors.PyMongoError as e:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        pytest.skip(f'mongod at {uri} is not reachable: {e}')
+    finally:
+        client.close()
+
+    yield uri
+
+    if process is not None:
+        process.terminate()
+        process.wait()
+
+
+@pytest.fixture(scope='session')
+def mongo_client(mongo_uri):
+    """MongoClient for the test mongod"""
+    import pymongo
+
+    client = pymongo.MongoClient(mongo_uri)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def mongo_db(mongo_client):
+    """A fresh database, dropped after the test"""
+    name = f'hubspot_test_{uuid.uuid4().hex[:8]}'
+    yield mongo_client[name]
+    mongo_client.drop_database(name)
+
+
+@pytest.fixture
+def fake_hubspot(monkeypatch, tmp_path):
+    """serve(store=None, **options): start a FakeHubSpotServer and point new HubSpot clients at it.
+
+    The process-wide client, scheduler and cassette are reset, and checkpoints
+    and daily usage go under tmp_path/checkpoints.
+    """
+    servers = []
+
+    def serve(store=None, **options):
+        server = FakeHubSpotServer(store or FakeHubSpotStore(), **options).start()
+        servers.append(server)
+        settings = get_config()
+        monkeypatch.setattr(settings, 'hubspot_base_url', server.base_url)
+        monkeypatch.setattr(settings, 'hubspot_key', 'test-key')
+        monkeypatch.setattr(settings, 'checkpoint_dir', str(tmp_path / 'checkpoints'))
+        monkeypatch.setattr(settings, 'hubspot_cassette_mode', None)
+        monkeypatch.setattr(cassettes, '_cassette', None)
+        monkeypatch.setattr(cassettes, '_cassette_configured', True)
+        monkeypatch.setattr(hubspot_client, '_client', None)
+        monkeypatch.setattr(request_scheduler, '_scheduler', None)
+        return server
+
+    yield serve
+    for server in servers:
+        server.stop()
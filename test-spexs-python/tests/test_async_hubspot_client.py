@@ -0,0 +1,59 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+pytest.importorskip('httpx')
+
+import cassettes
+import request_scheduler
+from async_hubspot_client import AsyncHubSpotClient
+from benchmarks.fake_hubspot import FakeHubSpotStore, make_store
+
+
+async def _run(method, *args, **kwargs):
+    async with AsyncHubSpotClient(max_concurrency=4) as client:
+        return await getattr(client, method)(*args, **kwargs)
+
+
+def test_get_many_walks_every_object_type(fake_hubspot):
+    server = fake_hubspot(make_store(contacts=250, deals=120))
+
+    records = asyncio.run(_run('get_many', 'contacts', 'deals'))
+
+    for object_type in ('contacts', 'deals'):
+        assert sorted(record['id'] for record in records[object_type]) == sorted(server.store.objects[object_type])
+    assert set(records['deals'][0]) >= {'id', 'dealname', 'amount'}
+
+
+def test_batch_create_skips_rejected_rows_and_archive_all_empties_the_store(fake_hubspot):
+    taken = {'contact42@example.com', 'contact170@example.com'}
+    server = fake_hubspot(FakeHubSpotStore(contacts=[{'email': email} for email in sorted(taken)]))
+    rows = [{'email': f'contact{i}@example.com'} for i in range(250)]
+
+    created_ids = asyncio.run(_run('batch_create', 'contacts', rows))
+
+    assert [row['email'] for row, object_id in zip(rows, created_ids) if object_id is None] == \
+        ['contact42@example.com', 'contact170@example.com']
+    emails = Counter(contact['properties']['email'] for contact in server.store.objects['contacts'].values())
+    assert emails == Counter(row['email'] for row in rows)
+
+    assert asyncio.run(_run('archive_all', 'contacts')) == 250
+    assert not server.store.objects['contacts']
+
+
+def test_recorded_walk_replays_without_the_server(fake_hubspot, monkeypatch, tmp_path):
+    server = fake_hubspot(make_store(deals=250))
+    path = tmp_path / 'hubspot.json.gz'
+    recorded = cassettes.configure_cassette('record', path=str(path))
+
+    live = asyncio.run(_run('get_all', 'deals'))
+    recorded.save()
+    server.stop()
+
+    monkeypatch.setattr(request_scheduler, '_scheduler', None)
+    cassettes.configure_cassette('replay', path=str(path))
+    replayed = asyncio.run(_run('get_all', 'deals'))
+
+    assert replayed == live
+    assert len(replayed) == 250
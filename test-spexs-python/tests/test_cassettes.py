@@ -0,0 +1,53 @@
+import sys
+
+import cassettes
+import hubspot_client
+import request_scheduler
+from benchmarks.fake_hubspot import make_store
+from config import get_config
+
+
+def test_recorded_contacts_replay_without_the_server_or_a_key(fake_hubspot, monkeypatch, tmp_path):
+    server = fake_hubspot(make_store(contacts=250))
+    path = tmp_path / 'hubspot.json.gz'
+    cassettes.configure_cassette('record', path=str(path))
+
+    live = [list(page) for page in hubspot_client.HubSpotClient().iter_existing_contacts()]
+    server.stop()
+
+    monkeypatch.setattr(get_config(), 'hubspot_key', None)
+    monkeypatch.setattr(request_scheduler, '_scheduler', None)
+    cassette = cassettes.configure_cassette('replay', path=str(path))
+    replayed = [list(page) for page in hubspot_client.HubSpotClient().iter_existing_contacts()]
+
+    assert replayed == live
+    assert sorted(record['id'] for page in replayed for record in page) == sorted(server.store.objects['contacts'])
+    assert len(cassette) == len(live)
+
+
+def test_cassette_off_overrides_the_environment(fake_hubspot, monkeypatch, tmp_path):
+    import mainProcess
+
+    fake_hubspot()
+    settings = get_config()
+    # A replay cassette that does not exist: opening it would fail the run
+    monkeypatch.setattr(settings, 'hubspot_cassette_mode', 'replay')
+    monkeypatch.setattr(settings, 'hubspot_cassette_dir', str(tmp_path / 'missing'))
+    monkeypatch.setattr(settings, 'metrics_json', None)
+    monkeypatch.setattr(settings, 'metrics_textfile', None)
+    monkeypatch.setattr(cassettes, '_cassette_configured', False)
+
+    cassettes_seen = []
+
+    def sync_type(args, kind, rate_share=1.0):
+        cassettes_seen.append(cassettes.get_cassette())
+        return 0
+
+    monkeypatch.setattr(mainProcess, 'get_mongo_client', lambda: None)
+    monkeypatch.setattr(mainProcess, 'sync_type', sync_type)
+    monkeypatch.setattr(mainProcess, 'run_summaries', lambda mode, kinds: None)
+    monkeypatch.setattr(sys, 'argv', ['mainProcess.py', '--type', 'deals', '--cassette', 'off'])
+    mainProcess.main()
+
+    assert cassettes_seen == [None]
+
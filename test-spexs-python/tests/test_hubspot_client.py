@@ -0,0 +1,58 @@
+import json
+from collections import Counter
+
+import pytest
+
+import hubspot_client
+from benchmarks.fake_hubspot import FakeHubSpotStore, make_store
+
+
+def failing_after(monkeypatch, api_class, pages):
+    """Make `api_class.get_page` fail with a 400 once it has returned `pages` pages"""
+    from hubspot.crm.contacts import ApiException
+
+    get_page = api_class.get_page
+    calls = []
+
+    def flaky(self, *args, **kwargs):
+        calls.append(kwargs.get('after'))
+        if len(calls) > pages:
+            raise ApiException(status=400, reason='Bad Request')
+        return get_page(self, *args, **kwargs)
+
+    monkeypatch.setattr(api_class, 'get_page', flaky)
+
+
+def test_get_existing_keeps_the_records_fetched_before_a_paging_error(fake_hubspot, monkeypatch):
+    from hubspot.crm.contacts import BasicApi
+
+    server = fake_hubspot(make_store(contacts=250))
+    failing_after(monkeypatch, BasicApi, pages=2)
+
+    contacts = hubspot_client.HubSpotClient().get_existing_contacts(limit=None)
+
+    ordered = sorted(server.store.objects['contacts'], key=int)
+    assert [contact['id'] for contact in contacts] == ordered[:200]
+
+
+def test_iterating_pages_still_raises_the_paging_error(fake_hubspot, monkeypatch):
+    from hubspot.crm.contacts import ApiException, BasicApi
+
+    fake_hubspot(make_store(contacts=250))
+    failing_after(monkeypatch, BasicApi, pages=1)
+
+    with pytest.raises(ApiException):
+        list(hubspot_client.HubSpotClient().iter_existing_contacts())
+
+
+def test_batch_rejected_for_one_duplicate_email_still_creates_the_other_rows(fake_hubspot, tmp_path):
+    taken = {'contact42@example.com', 'contact170@example.com'}
+    server = fake_hubspot(FakeHubSpotStore(contacts=[{'email': email} for email in sorted(taken)]))
+    path = tmp_path / 'contacts.json'
+    path.write_text(json.dumps([{'email': f'contact{i}@example.com'} for i in range(250)]))
+
+    created = hubspot_client.HubSpotClient().load_contacts_from_json(str(path))
+
+    assert len(created) == 248
+    emails = Counter(contact['properties']['email'] for contact in server.store.objects['contacts'].values())
+    assert emails == Counter(f'contact{i}@example.com' for i in range(250))
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from json_stream import iter_json_records
+
+CHUNK_SIZES = [1, 2, 3, 5, 7, 64]
+
+VALUES = [
+    {'email': 'ana@example.com', 'tags': ['a', 'b'], 'note': 'comma, bracket ] and brace }'},
+    1e5, -0.5, 0, 12345678901234567890, 2.5e-3, True, False, None, 'text', [], {},
+    {'nested': {'amount': -1200.75, 'closed': None}},
+]
+
+
+def read(tmp_path, text, chunk_size):
+    path = tmp_path / 'records.json'
+    path.write_text(text, encoding='utf-8')
+    return list(iter_json_records(str(path), chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('text', [
+    json.dumps(VALUES),
+    json.dumps(VALUES, indent=2),
+    json.dumps(VALUES, separators=(',', ':')),
+])
+def test_array_elements_straddling_chunk_boundaries(tmp_path, text, chunk_size):
+    assert read(tmp_path, text, chunk_size) == VALUES
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('separator, trailer', [('\n', '\n'), ('\r\n', ''), (' ', '')])
+def test_ndjson_values_straddling_chunk_boundaries(tmp_path, separator, trailer, chunk_size):
+    text = separator.join(json.dumps(value) for value in VALUES) + trailer
+    assert read(tmp_path, text, chunk_size) == VALUES
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('text', ['[]', ' [ ]\n', ''])
+def test_empty_files(tmp_path, text, chunk_size):
+    assert read(tmp_path, text, chunk_size) == []
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('text', [
+    '[1,,2]', '[1 2]', '[,1]', '[1,]', '[1, 2] 3', '[1, 2]]', '[1, 2',
+    '[1x]', '[tru]', '[{"a": 1} {"b": 2}]', '1,2', '{"a": 1}\n]',
+])
+def test_malformed_input_is_rejected(tmp_path, text, chunk_size):
+    with pytest.raises(ValueError):
+        read(tmp_path, text, chunk_size)
@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import pandas as pd
+
+from mainProcess import HASH_FIELD, bulk_upsert_records, dataframe_to_records
+
+
+def test_datetime_columns_with_missing_values_become_none():
+    df = pd.DataFrame({
+        'id': ['1', '2', '3'],
+        'close_date': pd.to_datetime(['2024-03-01T00:00:00', None, '2024-03-02T10:30:00']),
+        'modified': pd.to_datetime(['2024-01-02T03:04:05.678Z', '2024-01-03T00:00:00.000Z', None], utc=True),
+    })
+
+    records = dataframe_to_records(df)
+
+    assert [record['close_date'] for record in records] == [
+        datetime(2024, 3, 1), None, datetime(2024, 3, 2, 10, 30)]
+    assert records[1]['modified'].isoformat() == '2024-01-03T00:00:00+00:00'
+    assert records[2]['modified'] is None
+    assert all(type(record['close_date']) is datetime for record in records if record['close_date'])
+    # The frame itself is left untouched
+    assert df['close_date'].isna().tolist() == [False, True, False]
+
+
+def test_upserting_an_unchanged_frame_writes_nothing(mongo_db):
+    df = pd.DataFrame({
+        'id': [str(i) for i in range(250)],
+        'deal_stage': ['won', 'lost'] * 125,
+        'amount': [float(i) for i in range(250)],
+        'close_date': pd.to_datetime(['2024-03-01'] * 250),
+    })
+
+    first = bulk_upsert_records(mongo_db.deals, dataframe_to_records(df), chunk_size=100)
+    assert (first.upserted_count, first.skipped_count) == (250, 0)
+
+    second = bulk_upsert_records(mongo_db.deals, dataframe_to_records(df), chunk_size=100)
+    assert (second.matched_count, second.modified_count, second.upserted_count) == (0, 0, 0)
+    assert second.skipped_count == 250
+    assert second.changes == []
+
+    hashes = {doc['id']: doc[HASH_FIELD] for doc in mongo_db.deals.find()}
+    df.loc[df['id'] == '42', 'amount'] = 4200.0
+    third = bulk_upsert_records(mongo_db.deals, dataframe_to_records(df), chunk_size=100)
+    assert (third.matched_count, third.modified_count, third.upserted_count) == (1, 1, 0)
+    assert third.skipped_count == 249
+    assert [after['id'] for before, after in third.changes] == ['42']
+    assert mongo_db.deals.find_one({'id': '42'})['amount'] == 4200.0
+    changed = {doc['id'] for doc in mongo_db.deals.find() if doc[HASH_FIELD] != hashes[doc['id']]}
+    assert changed == {'42'}
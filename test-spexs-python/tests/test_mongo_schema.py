@@ -0,0 +1,25 @@
+import mongo_schema
+
+
+def test_every_upsert_filter_uses_an_index(mongo_db):
+    assert mongo_schema.ensure_indexes(mongo_db) == []
+
+    used = mongo_schema.explain_upsert_filters(mongo_db)
+
+    assert set(used) == set(mongo_schema.SAMPLE_FILTERS)
+    assert [name for name, index in used.items() if index is None] == []
+
+
+def test_ensure_indexes_is_idempotent(mongo_db):
+    mongo_schema.ensure_indexes(mongo_db)
+
+    assert mongo_schema.ensure_indexes(mongo_db) == []
+
+
+def test_every_merged_summary_has_a_unique_index_on_its_keys():
+    from mainProcess import SUMMARY_PIPELINES
+
+    for summary_name, (_, key_fields) in SUMMARY_PIPELINES.items():
+        unique_keys = [[field for field, _ in keys] for keys, options in mongo_schema.INDEXES[summary_name]
+                       if options.get('unique')]
+        assert list(key_fields) in unique_keys, summary_name
@@ -0,0 +1,29 @@
+import pytest
+
+from config import config
+from partitioned_extract import partitioning_pays_off
+
+
+@pytest.fixture(autouse=True)
+def burst_limit(monkeypatch):
+    # HubSpot's default burst limit: 100 requests per 10 seconds
+    monkeypatch.setattr(config, 'hubspot_requests_per_10s', 100)
+
+
+@pytest.mark.parametrize('workers, latency, rate_share, incremental, expected', [
+    # Slow requests: 4 searches/s of 200 objects beat one list page of 100 every 200 ms
+    (4, 0.2, 1.0, False, True),
+    # Fast requests: the burst limit lets the cursor list 1,000 objects/s, the search limit allows 800
+    (4, 0.02, 1.0, False, False),
+    # An incremental cursor searches too, 100 objects at a time
+    (4, 0.02, 1.0, True, True),
+    # Sharing the limits with another sync halves the search budget, not the cursor's latency bound
+    (4, 0.2, 0.5, False, False),
+    # One worker cannot overlap anything: it only gains the larger page
+    (1, 0.5, 1.0, False, True),
+    (2, 0.02, 1.0, False, False),
+])
+def test_partitioning_pays_off_only_when_the_search_budget_beats_the_cursor(
+        workers, latency, rate_share, incremental, expected):
+    assert partitioning_pays_off(workers, latency, rate_share, cursor_page_size=100,
+                                 incremental=incremental) is expected
@@ -0,0 +1,91 @@
+import pytest
+
+import request_scheduler
+from request_scheduler import DailyLimitExceeded, DailyQuota, RollingWindowLimiter
+
+
+class FakeClock:
+    """time.monotonic/time.sleep stand-ins where sleeping just moves the clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0.0, seconds)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(request_scheduler.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(request_scheduler.time, 'sleep', clock.sleep)
+    return clock
+
+
+def admissions(limiter, clock, calls):
+    times = []
+    for _ in range(calls):
+        limiter.acquire()
+        times.append(clock.now)
+    return times
+
+
+def test_limiter_never_admits_more_than_its_limit_in_any_window(clock):
+    limiter = RollingWindowLimiter(20, 2.0)
+    times = admissions(limiter, clock, 100)
+
+    # A cold start admits the limit at once, then nothing until the window has passed
+    assert times[:20] == [1000.0] * 20
+    assert times[20] == 1002.0
+    assert all(later - earlier >= 2.0 for earlier, later in zip(times, times[20:]))
+
+
+def test_limiter_does_not_burst_after_an_idle_gap(clock):
+    limiter = RollingWindowLimiter(20, 2.0)
+    admissions(limiter, clock, 10)
+    clock.sleep(1.5)
+    times = admissions(limiter, clock, 30)
+
+    window = [t for t in times if t < 1002.0]
+    assert len(window) == 10
+    assert all(later - earlier >= 2.0 for earlier, later in zip(times, times[20:]))
+
+
+def test_throttle_pauses_and_halves_the_allowance(clock):
+    limiter = RollingWindowLimiter(20, 2.0)
+    limiter.throttle(5.0)
+    times = admissions(limiter, clock, 20)
+
+    assert times[0] == 1005.0
+    assert times.count(1005.0) == 10
+
+
+def test_daily_quota_is_shared_across_runs(tmp_path):
+    path = tmp_path / 'usage.json'
+    first = DailyQuota(250, path, chunk=100)
+    for _ in range(150):
+        first.acquire()
+    first.release()
+    assert first.used() == 150
+
+    second = DailyQuota(250, path, chunk=100)
+    for _ in range(100):
+        second.acquire()
+    with pytest.raises(DailyLimitExceeded):
+        second.acquire()
+    assert second.used() == 250
+
+
+def test_daily_quota_counts_reservations_of_concurrent_processes(tmp_path):
+    path = tmp_path / 'usage.json'
+    first, second = DailyQuota(1000, path, chunk=100), DailyQuota(1000, path, chunk=100)
+    first.acquire()
+    second.acquire()
+    assert first.used() == 200
+
+    # Only the reservation the second process did not use goes back
+    second.release()
+    assert first.used() == 101
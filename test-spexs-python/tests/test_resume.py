@@ -0,0 +1,106 @@
+"""
+Loads interrupted partway through a page and continued with --resume must
+end with every record exactly once.
+"""
+import json
+import sys
+from collections import Counter
+
+import pytest
+
+import hubspot_client
+from benchmarks.fake_hubspot import make_store
+from config import get_config
+
+
+def test_seed_load_resumed_mid_batch_creates_every_contact_once(fake_hubspot, monkeypatch, tmp_path):
+    server = fake_hubspot()
+    files = {
+        'contacts': [{'email': f'contact{i}@example.com', 'firstname': 'Ana'} for i in range(250)],
+        # Leads are created one object at a time, which the fake server does not serve
+        'leads': [],
+        'deals': [{'dealname': f'Deal {i}', 'amount': i} for i in range(120)],
+    }
+    paths = {}
+    for name, rows in files.items():
+        paths[name] = tmp_path / f'{name}.json'
+        paths[name].write_text(json.dumps(rows))
+
+    # Stop reading the contacts halfway through their second batch of 100
+    read_records = hubspot_client.iter_json_records
+
+    def interrupted(path, *args, **kwargs):
+        for number, record in enumerate(read_records(path, *args, **kwargs)):
+            if str(path) == str(paths['contacts']) and number == 150:
+                raise KeyboardInterrupt
+            yield record
+
+    monkeypatch.setattr(hubspot_client, 'iter_json_records', interrupted)
+    client = hubspot_client.HubSpotClient()
+    with pytest.raises(KeyboardInterrupt):
+        client.bulk_load_all_data_with_relationships(
+            str(paths['contacts']), str(paths['leads']), str(paths['deals']))
+
+    monkeypatch.setattr(hubspot_client, 'iter_json_records', read_records)
+    summary = client.bulk_load_all_data_with_relationships(
+        str(paths['contacts']), str(paths['leads']), str(paths['deals']), resume=True)
+
+    emails = Counter(contact['properties']['email'] for contact in server.store.objects['contacts'].values())
+    assert emails == Counter(row['email'] for row in files['contacts'])
+    deal_names = Counter(deal['properties']['dealname'] for deal in server.store.objects['deals'].values())
+    assert deal_names == Counter(row['dealname'] for row in files['deals'])
+    assert summary['contacts_loaded'] == 250
+    assert not (tmp_path / 'checkpoints' / 'seed-load.json').exists()
+
+
+@pytest.mark.parametrize('options', [[], ['--backend', 'polars']])
+def test_sync_resumed_mid_page_loads_every_deal_once(options, fake_hubspot, monkeypatch, tmp_path, mongo_uri,
+                                                     mongo_db):
+    if '--backend' in options:
+        pytest.importorskip('polars')
+    import mainProcess
+
+    store = make_store(deals=250)
+    fake_hubspot(store)
+    settings = get_config()
+    monkeypatch.setattr(settings, 'mongo_uri', mongo_uri)
+    monkeypatch.setattr(settings, 'mongo_db_name', mongo_db.name)
+    monkeypatch.setattr(settings, 'extract_workers', 1)
+    monkeypatch.setattr(settings, 'sync_associations', False)
+    monkeypatch.setattr(settings, 'metrics_json', None)
+    monkeypatch.setattr(settings, 'metrics_textfile', None)
+
+    # Ids written by each upsert; the second page of 100 deals is cut off after half of it reached MongoDB
+    upsert = mainProcess.bulk_upsert_records
+    written = []
+    interrupt = True
+
+    def recorded(collection, records, **kwargs):
+        if len(written) == 1 and interrupt:
+            records = records[:len(records) // 2]
+            upsert(collection, records, **kwargs)
+            written.append([record['id'] for record in records])
+            raise KeyboardInterrupt
+        written.append([record['id'] for record in records])
+        return upsert(collection, records, **kwargs)
+
+    def sync(*arguments):
+        monkeypatch.setattr(sys, 'argv', ['mainProcess.py', '--type', 'deals', *options, *arguments])
+        mainProcess.main()
+
+    monkeypatch.setattr(mainProcess, 'bulk_upsert_records', recorded)
+    with pytest.raises(KeyboardInterrupt):
+        sync()
+    committed = written[0]
+    assert mongo_db.deals.count_documents({}) == 150
+
+    interrupt = False
+    written.clear()
+    sync('--resume')
+
+    # The resumed run starts over at the interrupted page and loads each remaining deal once
+    resumed = [deal_id for page in written for deal_id in page]
+    assert sorted(committed + resumed) == sorted(store.objects['deals'])
+    loaded = [document['id'] for document in mongo_db.deals.find({}, {'id': 1})]
+    assert sorted(loaded) == sorted(store.objects['deals'])
+    assert not (tmp_path / 'checkpoints' / 'sync-deals.json').exists()
@@ -0,0 +1,18 @@
+import pytest
+
+from benchmarks.bench_startup import cli_imports, heavy_imports
+
+
+def test_importing_the_entry_points_loads_no_heavy_library():
+    assert heavy_imports() == []
+
+
+@pytest.mark.parametrize('script, arguments', [
+    ('mainProcess.py', ['--help']),
+    ('main.py', ['--help']),
+    ('mainProcess.py', ['--type', 'bogus']),
+    ('mainProcess.py', ['--resume', '--from-snapshot']),
+    ('main.py', ['--bogus']),
+])
+def test_help_and_usage_errors_load_no_heavy_library(script, arguments):
+    assert cli_imports(script, *arguments) == []
@@ -0,0 +1,93 @@
+from datetime import datetime
+
+import pytest
+
+import mainProcess
+from config import get_config
+from mongo_connection import mongo_manager
+
+
+@pytest.fixture
+def db(mongo_uri, mongo_db, monkeypatch):
+    """mongo_db, as the database mainProcess writes to"""
+    settings = get_config()
+    monkeypatch.setattr(settings, 'mongo_uri', mongo_uri)
+    monkeypatch.setattr(settings, 'mongo_db_name', mongo_db.name)
+    yield mongo_db
+    mongo_manager.close()
+
+
+def deal(id, stage, amount, closed=datetime(2024, 3, 1)):
+    return {'id': id, 'deal_name': f'Deal {id}', 'deal_stage': stage, 'amount': amount, 'close_date': closed}
+
+
+def lead(id, status_id, status):
+    return {'id': id, 'email': f'{id}@example.com', 'lead_status_id': status_id, 'lead_status': status}
+
+
+def load(db, source, records):
+    """Upsert `records` and apply their summary deltas, as a --summary-mode delta page load does"""
+    result = mainProcess.bulk_upsert_records(
+        db[source], records, track_fields=mainProcess.SUMMARY_SOURCE_FIELDS[source])
+    mainProcess.apply_summary_deltas(source, result.changes)
+    return result
+
+
+def stages(db):
+    return {doc['id']: (doc['total'], doc['amount']) for doc in db.total_deals.find()}
+
+
+def close_months(db):
+    return {(doc['year'], doc['month'], doc['deal_stage']): (doc['count'], doc['amount'])
+            for doc in db.resume_close_deals.find()}
+
+
+def test_inserts_add_their_contribution(db):
+    load(db, 'deals', [deal('1', 'won', 100.0), deal('2', 'won', 50.0), deal('3', 'lost', 10.0)])
+    load(db, 'leads', [lead('1', 1, 'NEW'), lead('2', 1, 'NEW'), lead('3', 2, 'OPEN')])
+
+    assert stages(db) == {'won': (2, 150.0), 'lost': (1, 10.0)}
+    assert close_months(db) == {(2024, 3, 'won'): (2, 150.0), (2024, 3, 'lost'): (1, 10.0)}
+    assert {doc['id']: (doc['total'], doc['status']) for doc in db.resume_lead_status.find()} == \
+        {1: (2, 'NEW'), 2: (1, 'OPEN')}
+    assert mainProcess.verify_summaries() == {'resume_lead_status': 0, 'total_deals': 0, 'resume_close_deals': 0}
+
+
+def test_updates_move_records_between_groups_and_drop_empty_ones(db):
+    load(db, 'deals', [deal('1', 'won', 100.0), deal('2', 'won', 50.0), deal('3', 'lost', 10.0)])
+
+    # Deal 3 leaves 'lost', which empties it; deal 2 changes amount and close month
+    load(db, 'deals', [deal('1', 'won', 100.0), deal('2', 'won', 70.0, closed=datetime(2024, 4, 2)),
+                       deal('3', 'open', 10.0)])
+
+    assert stages(db) == {'won': (2, 170.0), 'open': (1, 10.0)}
+    assert close_months(db) == {(2024, 3, 'won'): (1, 100.0), (2024, 4, 'won'): (1, 70.0),
+                                (2024, 3, 'open'): (1, 10.0)}
+    assert mainProcess.verify_summaries(sources=('deals',)) == {'total_deals': 0, 'resume_close_deals': 0}
+
+
+def test_verify_reports_and_repairs_drift(db):
+    load(db, 'deals', [deal('1', 'won', 100.0), deal('2', 'won', 50.0), deal('3', 'lost', 10.0)])
+    db.total_deals.update_one({'id': 'won'}, {'$inc': {'total': 3}})
+    db.total_deals.delete_one({'id': 'lost'})
+    db.total_deals.insert_one({'id': 'gone', 'total': 1, 'amount': 5.0})
+
+    assert mainProcess.verify_summaries(sources=('deals',)) == {'total_deals': 3, 'resume_close_deals': 0}
+    assert stages(db) == {'won': (2, 150.0), 'lost': (1, 10.0)}
+    assert mainProcess.verify_summaries(sources=('deals',)) == {'total_deals': 0, 'resume_close_deals': 0}
+
+
+def test_delta_mode_needs_summaries_built_from_hashed_records(db):
+    # A fresh database: deltas build the summaries from the first inserts
+    assert mainProcess.delta_fallback_reason(db, ['leads', 'deals']) is None
+
+    load(db, 'deals', [deal('1', 'won', 100.0)])
+    assert mainProcess.delta_fallback_reason(db, ['deals']) is None
+
+    db.resume_close_deals.delete_many({})
+    assert 'resume_close_deals is empty' in mainProcess.delta_fallback_reason(db, ['deals'])
+    assert mainProcess.delta_fallback_reason(db, ['leads']) is None
+
+    mainProcess.verify_summaries(sources=('deals',))
+    db.deals.insert_one(deal('2', 'won', 50.0))
+    assert 'without a content_hash' in mainProcess.delta_fallback_reason(db, ['deals'])
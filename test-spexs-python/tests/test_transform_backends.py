@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+from mainProcess import content_hash, dataframe_to_records, transform_deals_dataframe, transform_leads_dataframe
+
+polars_transforms = pytest.importorskip('polars_transforms')
+if not polars_transforms.POLARS_AVAILABLE:
+    pytest.skip('polars is not installed', allow_module_level=True)
+
+LEAD_STATUS_MAPPING = {'NEW': 1, 'OPEN': 2}
+
+
+def pandas_leads(rows):
+    return dataframe_to_records(transform_leads_dataframe(pd.DataFrame(rows), LEAD_STATUS_MAPPING))
+
+
+def polars_leads(rows):
+    return polars_transforms.frame_to_records(polars_transforms.leads_frame(rows, LEAD_STATUS_MAPPING))
+
+
+def pandas_deals(rows):
+    return dataframe_to_records(transform_deals_dataframe(pd.DataFrame(rows)), numeric_columns=['amount'])
+
+
+def polars_deals(rows):
+    return polars_transforms.frame_to_records(polars_transforms.deals_frame(rows))
+
+
+def assert_parity(expected, actual):
+    assert actual == expected
+    assert [content_hash(record) for record in actual] == [content_hash(record) for record in expected]
+
+
+def lead(id, firstname='Ana', lastname='García', status='NEW', modified='2024-01-02T03:04:05.678Z'):
+    return {'id': id, 'email': f'{id}@example.com', 'firstname': firstname, 'lastname': lastname,
+            'hs_lead_status': status, 'lastmodifieddate': modified}
+
+
+def deal(id, amount='1200', closedate='2024-03-01', modified='2024-01-02T03:04:05.678Z'):
+    return {'id': id, 'dealname': f'Deal {id}', 'amount': amount, 'dealstage': 'appointmentscheduled',
+            'pipeline': 'default', 'closedate': closedate, 'dealtype': 'newbusiness',
+            'createdate': '2023-12-01T00:00:00Z', 'hs_lastmodifieddate': modified}
+
+
+LEAD_CASES = {
+    'complete': [lead('1'), lead('2', status='OPEN')],
+    'nulls': [lead('1', firstname=None), lead('2', lastname=None, status=None, modified=None),
+              lead('3', firstname=None, lastname=None, status='UNKNOWN')],
+    'all-null dates': [lead('1', modified=None), lead('2', modified=None)],
+    'missing date column': [{key: value for key, value in lead(str(i)).items() if key != 'lastmodifieddate'}
+                            for i in range(3)],
+}
+
+DEAL_CASES = {
+    'complete': [deal('1'), deal('2', amount='99.5')],
+    'nulls': [deal('1', amount=None, closedate=None), deal('2', amount='', modified=None),
+              deal('3', amount='n/a')],
+    'all-null dates': [deal('1', closedate=None), deal('2', closedate=None)],
+    'missing optional columns': [{key: value for key, value in deal(str(i)).items()
+                                  if key not in ('amount', 'closedate', 'createdate')} for i in range(3)],
+}
+
+
+@pytest.mark.parametrize('rows', LEAD_CASES.values(), ids=LEAD_CASES.keys())
+def test_lead_transforms_match(rows):
+    assert_parity(pandas_leads(rows), polars_leads(rows))
+
+
+@pytest.mark.parametrize('rows', DEAL_CASES.values(), ids=DEAL_CASES.keys())
+def test_deal_transforms_match(rows):
+    assert_parity(pandas_deals(rows), polars_deals(rows))
+
+
+def test_empty_pages_produce_no_records():
+    assert pandas_leads([]) == polars_leads([]) == []
+    assert pandas_deals([]) == polars_deals([]) == []